@@ -0,0 +1,64 @@
+"""
+Measure the memory footprint of pyshotgrid entities.
+
+Compares the compact SGEntity (``__slots__`` and a field value cache that is only
+created when needed) against an SGEntity sub class that is laid out like SGEntity
+was before, with and without holding a field of every entity.
+The numbers include the entity ID and the reference in the list that holds the entities.
+
+Run it with::
+
+    python benchmarks/entity_memory.py [number of entities]
+"""
+
+import gc
+import sys
+import tracemalloc
+import types
+from typing import Any
+
+import pyshotgrid as pysg
+
+
+class DictSGEntity(pysg.SGEntity):
+    """
+    An SGEntity with a __dict__ and an eagerly created field value cache,
+    like every entity had before SGEntity used __slots__.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._field_values = {}
+
+
+def measure(entity_class: Any, count: int, access_field: bool) -> float:
+    """
+    :param entity_class: The entity class to instantiate.
+    :param count: The number of entities to create.
+    :param access_field: Whether to access the "code" field of each entity.
+    :return: The number of bytes per entity.
+    """
+    sg = types.SimpleNamespace(base_url="https://example.shotgunstudio.com")
+    gc.collect()
+    tracemalloc.start()
+    entities = [entity_class(sg, entity_id, "PublishedFile") for entity_id in range(count)]
+    fields = [entity["code"] for entity in entities] if access_field else []
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del entities, fields
+    return size / count
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"Bytes per entity with {count:,} entities:")
+    print(f"{'':24}{'dict':>10}{'slots':>10}")
+    for access_field in (False, True):
+        label = "entity + field" if access_field else "entity"
+        before = measure(DictSGEntity, count, access_field)
+        after = measure(pysg.SGEntity, count, access_field)
+        print(f"{label:24}{before:10.0f}{after:10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+Measure the wall time and the number of round trips of the pyshotgrid hot paths.
+
+The benchmarks run against a mockgun site with thousands of shots and tens of thousands
+of publishes and versions. Every request to the site waits for a configurable latency,
+like a request to a real ShotGrid site does, so the wall times show both the cost of
+the round trips and the work that pyshotgrid does on the client.
+
+Run it with::
+
+    python benchmarks/hot_paths.py [--shots 2000] [--publishes 20000] [--versions 20000]
+                                   [--latency 0.02] [--repeat 3]
+
+Compare the output of two revisions to find regressions. The round trips do not depend
+on the machine, so any change in them is a change of the query pattern.
+"""
+
+import argparse
+import datetime
+import os
+import time
+from typing import Any, Callable, Optional
+
+from shotgun_api3.lib import mockgun
+
+import pyshotgrid as pysg
+
+SCHEMA_DIR = os.path.join(
+    os.path.dirname(__file__), os.pardir, "tests", "resources", "mockgun_schemas"
+)
+
+
+class LatencyShotgun(mockgun.Shotgun):
+    """
+    A mockgun site that counts the requests and waits ``latency`` seconds for every request.
+    Like shotgun_api3, find() needs one request per page when no page is given.
+    It also supports the arguments of find() that mockgun is missing, sorts by multiple
+    fields and counts the publishes per name for summarize().
+    """
+
+    def __init__(self, *args: Any, latency: float = 0.0, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.latency = latency
+        self.round_trips = 0
+        # The query and the sorted rows of the last paged find(). The database does not
+        # change while the benchmark pages through a query, so the rows are reused for
+        # the next pages instead of filtering and sorting them again for every page.
+        self._paged_query: Optional[tuple[str, Any]] = None
+        self._paged_rows: list[dict[str, Any]] = []
+        # Read by config.records_per_page.
+        self.server_info = {"api_max_entities_per_page": 500}
+
+    def _request(self) -> None:
+        self.round_trips += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def find(
+        self,
+        entity_type: str,
+        filters: Any,
+        fields: Optional[list[str]] = None,
+        order: Optional[list[dict[str, str]]] = None,
+        filter_operator: Optional[str] = None,
+        limit: int = 0,
+        retired_only: bool = False,
+        page: int = 0,
+        include_archived_projects: bool = True,
+        additional_filter_presets: Any = None,
+    ) -> list[dict[str, Any]]:
+        self._request()
+        order = order or []
+        query = (entity_type, repr((filters, fields, order, filter_operator, retired_only)))
+        if page > 1 and query == self._paged_query:
+            results = self._paged_rows
+        else:
+            order_fields = [order_entry["field_name"] for order_entry in order]
+            results = super().find(
+                entity_type,
+                filters,
+                (fields or []) + order_fields,
+                filter_operator=filter_operator,
+                retired_only=retired_only,
+            )
+            # Sort by the last order entry first, so the first one has the highest priority.
+            for order_entry in reversed(order):
+                field = order_entry["field_name"]
+                results.sort(
+                    key=lambda row: (row[field] is not None, row[field] or 0),
+                    reverse=order_entry["direction"] == "desc",
+                )
+            if page:
+                self._paged_query, self._paged_rows = query, results
+        if limit:
+            start = max(page - 1, 0) * limit
+            results = results[start : start + limit]
+        if not page:
+            # The first page was already counted.
+            for _ in range(max(len(results) - 1, 0) // self.config.records_per_page):
+                self._request()
+        returned_fields = set(fields or []) | {"type", "id"}
+        return [{key: row[key] for key in returned_fields} for row in results]
+
+    def summarize(
+        self,
+        entity_type: str,
+        filters: Any,
+        summary_fields: list[dict[str, str]],
+        filter_operator: Optional[str] = None,
+        grouping: Optional[list[dict[str, str]]] = None,
+        include_archived_projects: bool = True,
+    ) -> dict[str, Any]:
+        # Only the counts of the publishes per name are implemented.
+        self._request()
+        group_field = (grouping or [{"field": "id"}])[0]["field"]
+        rows = super().find(entity_type, filters, [group_field], filter_operator=filter_operator)
+        counts: dict[Any, int] = {}
+        for row in rows:
+            counts[row[group_field]] = counts.get(row[group_field], 0) + 1
+        return {
+            "summaries": {"id": len(rows)},
+            "groups": [
+                {"group_name": value, "group_value": value, "summaries": {"id": count}}
+                for value, count in sorted(counts.items(), key=lambda item: str(item[0]))
+            ],
+        }
+
+    def schema_read(self, *args: Any, **kwargs: Any) -> Any:
+        self._request()
+        return super().schema_read()
+
+    def schema_entity_read(self, *args: Any, **kwargs: Any) -> Any:
+        self._request()
+        return super().schema_entity_read()
+
+    def schema_field_read(
+        self, entity_type: str, field_name: Optional[str] = None, project_entity: Any = None
+    ) -> Any:
+        self._request()
+        return super().schema_field_read(entity_type, field_name)
+
+
+def add_rows(sg: LatencyShotgun, entity_type: str, rows: list[dict[str, Any]]) -> list[dict]:
+    """
+    Add rows to the mockgun database without the validation of create(), which gets
+    slow for tens of thousands of entities.
+
+    :param sg: The mockgun site.
+    :param entity_type: The entity type of the rows.
+    :param rows: The field values of the rows.
+    :return: The links to the created entities.
+    """
+    table = sg._db[entity_type]
+    links = []
+    for data in rows:
+        row = sg._get_new_row(entity_type)
+        sg._update_row(entity_type, row, data)
+        row["id"] = len(table) + 1
+        table[row["id"]] = row
+        links.append({"type": entity_type, "id": row["id"]})
+    return links
+
+
+def create_site(shots: int, publishes: int, versions: int, latency: float) -> LatencyShotgun:
+    """
+    :param shots: The number of shots of the main project.
+    :param publishes: The number of publishes. Every shot has two publish names
+                      with the same number of versions each.
+    :param versions: The number of versions. They are spread evenly over the shots.
+    :param latency: The number of seconds that every request takes.
+    :return: A mockgun site with the given number of entities.
+    """
+    mockgun.Shotgun.set_schema_paths(
+        os.path.join(SCHEMA_DIR, "schema.db"), os.path.join(SCHEMA_DIR, "entity_schema.db")
+    )
+    sg = LatencyShotgun(
+        base_url="https://benchmark.shotgunstudio.com",
+        script_name="Benchmark",
+        api_key="$ecret",
+        latency=latency,
+    )
+    start = datetime.datetime(2024, 1, 1)
+
+    sg_projects = add_rows(
+        sg,
+        "Project",
+        [
+            {"name": f"Project {index}", "tank_name": f"proj{index}", "is_template": False}
+            for index in range(50)
+        ],
+    )
+    sg_project = sg_projects[0]
+    sg_types = add_rows(sg, "PublishedFileType", [{"code": "Alembic Cache"}, {"code": "Image"}])
+    sg_shots = add_rows(
+        sg,
+        "Shot",
+        [
+            {"code": f"sh{index:05d}", "project": sg_project, "sg_status_list": "ip"}
+            for index in range(shots)
+        ],
+    )
+
+    publish_rows = []
+    chain_length = max(publishes // (shots * 2), 1)
+    for shot_index, sg_shot in enumerate(sg_shots):
+        for type_index, name in enumerate(("model", "comp")):
+            for version_number in range(1, chain_length + 1):
+                publish_rows.append(
+                    {
+                        "code": f"sh{shot_index:05d}_{name}_v{version_number:03d}",
+                        "name": f"sh{shot_index:05d}_{name}",
+                        "project": sg_project,
+                        "entity": sg_shot,
+                        "published_file_type": sg_types[type_index],
+                        "version_number": version_number,
+                        "created_at": start + datetime.timedelta(hours=version_number),
+                    }
+                )
+    add_rows(sg, "PublishedFile", publish_rows[:publishes])
+
+    add_rows(
+        sg,
+        "Version",
+        [
+            {
+                "code": f"version_{index:06d}",
+                "project": sg_project,
+                "entity": sg_shots[index % shots],
+                "created_at": start + datetime.timedelta(minutes=index),
+            }
+            for index in range(versions)
+        ],
+    )
+    return sg
+
+
+def benchmark(sg: LatencyShotgun, func: Callable[[], Any], repeat: int) -> tuple[float, int]:
+    """
+    :param sg: The mockgun site.
+    :param func: The code to measure.
+    :param repeat: How often to run the code.
+    :return: The best wall time and the number of round trips of a single run.
+    """
+    times = []
+    for _ in range(repeat):
+        round_trips = sg.round_trips
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+        round_trips = sg.round_trips - round_trips
+    return min(times), round_trips
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--shots", type=int, default=2000)
+    parser.add_argument("--publishes", type=int, default=20000)
+    parser.add_argument("--versions", type=int, default=20000)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per request")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--field-gets", type=int, default=100, help="entities of the get loop")
+    args = parser.parse_args()
+
+    sg = create_site(args.shots, args.publishes, args.versions, args.latency)
+    sg_site = pysg.new_site(sg)
+    sg_project = pysg.new_entity(sg, 1, "Project")
+    sg_shots = sg_project.shots()
+    sg_publish = pysg.new_entity(sg, args.publishes // 2, "PublishedFile")
+
+    def field_get_loop() -> None:
+        for sg_shot in sg_shots[: args.field_gets]:
+            sg_shot["sg_status_list"].refresh()
+            sg_shot["sg_status_list"].get()
+
+    def get_publish_chain() -> None:
+        sg_publish.get_publish_chain(refresh=True)
+
+    cases: list[tuple[str, Callable[[], Any]]] = [
+        ("SGProject.shots", sg_project.shots),
+        ("SGProject.publishes(latest=True)", lambda: sg_project.publishes(latest=True)),
+        ("SGProject.versions(latest=True)", lambda: sg_project.versions(latest=True)),
+        ("SGPublishedFile.get_publish_chain", get_publish_chain),
+        (f"Field.get loop ({args.field_gets} shots)", field_get_loop),
+        ("SGSite.projects", sg_site.projects),
+    ]
+
+    print(
+        f"{args.shots} shots, {args.publishes} publishes, {args.versions} versions, "
+        f"{args.latency * 1000:.0f} ms latency, best of {args.repeat}"
+    )
+    print(f"{'':<40}{'wall time':>12}{'round trips':>14}")
+    for name, func in cases:
+        seconds, round_trips = benchmark(sg, func, args.repeat)
+        print(f"{name:<40}{seconds * 1000:>9.1f} ms{round_trips:>14}")
+
+
+if __name__ == "__main__":
+    main()
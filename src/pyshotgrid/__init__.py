@@ -9,14 +9,21 @@ Use it like::
 
 from . import sg_default_entities as sde
 from .core import (
+    CompiledFilters,  # noqa: F401
     Field,  # noqa: F401
     FieldSchema,  # noqa: F401
+    Param,  # noqa: F401
+    PooledShotgun,  # noqa: F401
+    SchemaCache,  # noqa: F401
     SGEntity,  # noqa: F401
     SGSite,  # noqa: F401
+    WriteBuffer,  # noqa: F401
+    compile_filters,  # noqa: F401
     new_entity,  # noqa: F401
     new_site,  # noqa: F401
     register_pysg_class,
     register_sg_site_class,  # noqa: F401
+    schema_snapshot_path,  # noqa: F401
 )
 
 #: The pyshotgrid version number as string
@@ -0,0 +1,190 @@
+"""
+This module provides awaitable versions of the pyshotgrid objects for asyncio applications.
+
+Use it like::
+
+    >>> import pyshotgrid as pysg
+    >>> from pyshotgrid.aio import AsyncSGSite
+    >>> sg_site = AsyncSGSite(pysg.new_site(sg))
+    >>> sg_project = await sg_site.project("tp")
+    >>> for sg_shot in await sg_project.shots():
+    ...     print(await sg_shot["code"].get())
+
+Every method and property of the wrapped pyshotgrid object becomes awaitable and runs
+in a bounded pool of threads, where every thread talks to ShotGrid through its own
+connection. Cancelling an awaiting task cancels its call, unless it already runs.
+"""
+
+import asyncio
+import inspect
+from typing import Any, Callable
+
+from .core import Field, SGEntity, SGSite, _rebind_value, _site_state
+
+
+class _AsyncWrapper:
+    """
+    Base class for the awaitable versions of the pyshotgrid objects.
+    """
+
+    #: Attributes that do not talk to ShotGrid and are returned as they are.
+    SYNC_ATTRIBUTES: frozenset[str] = frozenset({"sg"})
+
+    __slots__ = ("_max_workers", "_obj")
+
+    def __init__(self, obj: Any, max_workers: int = 8) -> None:
+        """
+        :param obj: The pyshotgrid object to wrap.
+        :param max_workers: The maximum number of calls that run at the same time.
+        """
+        self._obj = obj
+        self._max_workers = max_workers
+
+    def __str__(self) -> str:
+        return f"Async{self._obj}"
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, _AsyncWrapper):
+            return bool(self._obj == other.sync)
+        return False
+
+    def __hash__(self) -> int:
+        return hash(self._obj)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_") or name in self.SYNC_ATTRIBUTES:
+            return getattr(self._obj, name)
+        if isinstance(inspect.getattr_static(self._obj, name, None), property):
+            return self._run(lambda obj: getattr(obj, name))
+        attribute = getattr(self._obj, name)
+        if not callable(attribute):
+            return attribute
+
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return await self._run(lambda obj: getattr(obj, name)(*args, **kwargs))
+
+        call.__name__ = name
+        call.__doc__ = attribute.__doc__
+        return call
+
+    @property
+    def sync(self) -> Any:
+        """
+        :return: The wrapped pyshotgrid object.
+        """
+        return self._obj
+
+    async def _run(self, func: Callable[[Any], Any]) -> Any:
+        """
+        Run a function with the wrapped object in the worker pool of the site.
+
+        :param func: A function that takes the wrapped object (for the connection of
+                     the worker thread) as its only argument.
+        :return: The result of the function. pyshotgrid objects are wrapped.
+        """
+        sg = self._obj.sg
+        pool = _site_state(sg).worker_pool()
+
+        def work() -> Any:
+            obj = _rebind_value(self._obj, pool.connection())
+            return obj, func(obj)
+
+        (future,) = pool.submit_all([(work, ())], self._max_workers)
+        worker_obj, result = await asyncio.wrap_future(future)
+        # Keep the field values that were cached while running the function.
+        entity = self._obj.entity if isinstance(self._obj, Field) else self._obj
+        worker_entity = worker_obj.entity if isinstance(worker_obj, Field) else worker_obj
+        if isinstance(entity, SGEntity) and entity is not worker_entity:
+            if worker_entity._field_values:
+                if entity._field_values is None:
+                    entity._field_values = {}
+                entity._field_values.update(worker_entity._field_values)
+            if worker_entity._related:
+                if entity._related is None:
+                    entity._related = {}
+                entity._related.update(_rebind_value(worker_entity._related, sg))
+        return _wrap(_rebind_value(result, sg), self._max_workers)
+
+
+class AsyncSGSite(_AsyncWrapper):
+    """
+    The awaitable version of :py:class:`pyshotgrid.core.SGSite`.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, sg_site: SGSite, max_workers: int = 8) -> None:
+        """
+        :param sg_site: The site to wrap.
+        :param max_workers: The maximum number of calls that run at the same time.
+        """
+        super().__init__(sg_site, max_workers)
+
+
+class AsyncSGEntity(_AsyncWrapper):
+    """
+    The awaitable version of :py:class:`pyshotgrid.core.SGEntity` and its sub classes.
+    """
+
+    SYNC_ATTRIBUTES = frozenset({"id", "type", "sg", "url", "to_dict", "DEFAULT_SG_ENTITY_TYPE"})
+
+    __slots__ = ()
+
+    def __init__(self, sg_entity: SGEntity, max_workers: int = 8) -> None:
+        """
+        :param sg_entity: The entity to wrap.
+        :param max_workers: The maximum number of calls that run at the same time.
+        """
+        super().__init__(sg_entity, max_workers)
+
+    def __getitem__(self, field: str) -> "AsyncField":
+        """
+        :param field: The name of the field.
+        :return: The awaitable version of the field.
+        """
+        return AsyncField(self._obj[field], self._max_workers)
+
+
+class AsyncField(_AsyncWrapper):
+    """
+    The awaitable version of :py:class:`pyshotgrid.core.Field`.
+    """
+
+    SYNC_ATTRIBUTES = frozenset({"name", "sg"})
+
+    __slots__ = ()
+
+    def __init__(self, field: Field, max_workers: int = 8) -> None:
+        """
+        :param field: The field to wrap.
+        :param max_workers: The maximum number of calls that run at the same time.
+        """
+        super().__init__(field, max_workers)
+
+    @property
+    def entity(self) -> AsyncSGEntity:
+        """
+        :return: The entity that this field is attached to.
+        """
+        return AsyncSGEntity(self._obj.entity, self._max_workers)
+
+
+def _wrap(value: Any, max_workers: int) -> Any:
+    """
+    :param value: Any value that may contain pyshotgrid objects.
+    :param max_workers: The maximum number of calls that run at the same time.
+    :return: The value with all pyshotgrid objects replaced by their awaitable versions.
+    """
+    if isinstance(value, SGEntity):
+        return AsyncSGEntity(value, max_workers)
+    if isinstance(value, Field):
+        return AsyncField(value, max_workers)
+    if isinstance(value, SGSite):
+        return AsyncSGSite(value, max_workers)
+    if isinstance(value, list):
+        return [_wrap(item, max_workers) for item in value]
+    if isinstance(value, tuple):
+        return tuple(_wrap(item, max_workers) for item in value)
+    if isinstance(value, dict):
+        return {key: _wrap(item, max_workers) for key, item in value.items()}
+    return value
@@ -0,0 +1,420 @@
+"""
+This module returns large find results as one array per field instead of one entity
+(and one dict) per row. This needs a lot less memory and allows vectorized aggregations::
+
+    >>> import pyshotgrid as pysg
+    >>> sg_site = pysg.new_site(sg)
+    >>> columns = sg_site.find_columns("Task", [], ["sg_status_list", "duration"])
+    >>> columns["sg_status_list"].value_counts()
+    {'ip': 5012, 'fin': 80412, 'wtg': 1245}
+    >>> columns["duration"].sum()
+    4803360
+
+The values of every field are converted according to the data type of the field:
+
+================================================== =========================================
+Data type                                          Column
+================================================== =========================================
+number, duration, percent, timecode                ``numpy.ma.MaskedArray`` of int64,
+                                                   empty values are masked.
+float                                              ``numpy.ndarray`` of float64,
+                                                   empty values are NaN.
+checkbox                                           ``numpy.ndarray`` of bool.
+date_time                                          ``numpy.ndarray`` of datetime64[us] in UTC,
+                                                   empty values are NaT.
+date                                               ``numpy.ndarray`` of datetime64[D],
+                                                   empty values are NaT.
+status_list, list, entity_type                     :py:class:`CategoricalColumn`
+entity                                             :py:class:`EntityColumn`
+all other data types                               ``numpy.ndarray`` of Python objects.
+================================================== =========================================
+
+The "id" column is always a ``numpy.ndarray`` of int64.
+
+This module needs `numpy <https://numpy.org>`_. With `pyarrow <https://arrow.apache.org>`_
+installed, the columns can be returned as a ``pyarrow.Table`` as well.
+"""
+
+import datetime
+from typing import Any, Optional
+
+try:
+    import numpy as np
+    import numpy.typing as npt
+except ImportError as error:  # pragma: no cover
+    raise ImportError(
+        'pyshotgrid.columnar needs numpy. Install it with "pip install pyshotgrid[columnar]".'
+    ) from error
+
+import shotgun_api3
+
+from .core import _iter_pages, _site_state
+
+#: The column kinds of the ShotGrid data types. Other data types become object columns.
+DATA_TYPE_KINDS = {
+    "number": "int",
+    "duration": "int",
+    "percent": "int",
+    "timecode": "int",
+    "float": "float",
+    "checkbox": "bool",
+    "date_time": "datetime",
+    "date": "date",
+    "status_list": "categorical",
+    "list": "categorical",
+    "entity_type": "categorical",
+    "entity": "entity",
+}
+
+
+class CategoricalColumn:
+    """
+    Dictionary encoded values, like the values of status list fields. Every row stores
+    the index of its value in the categories or -1 when it has no value.
+    """
+
+    __slots__ = ("categories", "codes")
+
+    def __init__(self, codes: "npt.NDArray[np.int32]", categories: list[Any]) -> None:
+        """
+        :param codes: The index of the value in the categories for every row.
+        :param categories: The distinct values.
+        """
+        self.codes = codes
+        self.categories = categories
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __repr__(self) -> str:
+        return f"CategoricalColumn({self.to_list()!r})"
+
+    def to_list(self) -> list[Any]:
+        """
+        :return: The value of every row.
+        """
+        categories = [*self.categories, None]
+        return [categories[code] for code in self.codes.tolist()]
+
+    def value_counts(self) -> dict[Any, int]:
+        """
+        :return: How often every value occurs. Empty values are not counted.
+        """
+        counts = np.bincount(self.codes[self.codes >= 0], minlength=len(self.categories))
+        return dict(zip(self.categories, counts.tolist()))
+
+
+class EntityColumn:
+    """
+    Links to entities, like the values of entity fields. The IDs are stored in a masked
+    array, where rows without a linked entity are masked, and the types are dictionary encoded.
+    """
+
+    __slots__ = ("ids", "types")
+
+    def __init__(self, ids: "np.ma.MaskedArray[Any, Any]", types: CategoricalColumn) -> None:
+        """
+        :param ids: The IDs of the linked entities.
+        :param types: The types of the linked entities.
+        """
+        self.ids = ids
+        self.types = types
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __repr__(self) -> str:
+        return f"EntityColumn({self.to_list()!r})"
+
+    def to_list(self) -> list[Optional[dict[str, Any]]]:
+        """
+        :return: The linked entity of every row as a dict with the "type" and "id" keys.
+        """
+        return [
+            None if entity_type is None else {"type": entity_type, "id": entity_id}
+            for entity_type, entity_id in zip(self.types.to_list(), self.ids.filled(0).tolist())
+        ]
+
+
+class _ColumnBuilder:
+    """
+    Collects the values of a single field page by page.
+    """
+
+    def __init__(self, kind: str) -> None:
+        """
+        :param kind: The kind of the column. One of the values of DATA_TYPE_KINDS,
+                     "id" or "object".
+        """
+        self.kind = kind
+        self._chunks: list[Any] = []
+        self._categories: dict[Any, int] = {}
+
+    def add(self, values: list[Any]) -> None:
+        """
+        :param values: The values of the next rows.
+        """
+        count = len(values)
+        if self.kind == "id":
+            self._chunks.append(np.fromiter(values, np.int64, count))
+        elif self.kind == "int":
+            self._chunks.append(
+                (
+                    np.fromiter(
+                        (0 if value is None else value for value in values), np.int64, count
+                    ),
+                    np.fromiter((value is None for value in values), np.bool_, count),
+                )
+            )
+        elif self.kind == "float":
+            self._chunks.append(
+                np.fromiter(
+                    (np.nan if value is None else value for value in values), np.float64, count
+                )
+            )
+        elif self.kind == "bool":
+            self._chunks.append(np.fromiter((bool(value) for value in values), np.bool_, count))
+        elif self.kind == "datetime":
+            self._chunks.append(
+                np.array([_to_utc(value) for value in values], dtype="datetime64[us]")
+            )
+        elif self.kind == "date":
+            self._chunks.append(
+                np.array(["NaT" if value is None else value for value in values], "datetime64[D]")
+            )
+        elif self.kind == "categorical":
+            self._chunks.append(self._encode(values))
+        elif self.kind == "entity":
+            self._chunks.append(
+                (
+                    np.fromiter(
+                        (0 if value is None else value["id"] for value in values), np.int64, count
+                    ),
+                    np.fromiter((value is None for value in values), np.bool_, count),
+                    self._encode([None if value is None else value["type"] for value in values]),
+                )
+            )
+        else:
+            chunk = np.empty(count, dtype=object)
+            for index, value in enumerate(values):
+                chunk[index] = value
+            self._chunks.append(chunk)
+
+    def build(self) -> Any:
+        """
+        :return: The column with the values of all the added rows.
+        """
+        if self.kind == "int":
+            return np.ma.MaskedArray(
+                _concatenate([chunk[0] for chunk in self._chunks], np.int64),
+                mask=_concatenate([chunk[1] for chunk in self._chunks], np.bool_),
+            )
+        if self.kind == "categorical":
+            return CategoricalColumn(_concatenate(self._chunks, np.int32), list(self._categories))
+        if self.kind == "entity":
+            return EntityColumn(
+                np.ma.MaskedArray(
+                    _concatenate([chunk[0] for chunk in self._chunks], np.int64),
+                    mask=_concatenate([chunk[1] for chunk in self._chunks], np.bool_),
+                ),
+                CategoricalColumn(
+                    _concatenate([chunk[2] for chunk in self._chunks], np.int32),
+                    list(self._categories),
+                ),
+            )
+        dtypes = {
+            "id": np.int64,
+            "float": np.float64,
+            "bool": np.bool_,
+            "datetime": "datetime64[us]",
+            "date": "datetime64[D]",
+        }
+        return _concatenate(self._chunks, dtypes.get(self.kind, object))
+
+    def _encode(self, values: list[Any]) -> "npt.NDArray[np.int32]":
+        """
+        :param values: Values to dictionary encode.
+        :return: The index of every value in the categories of this column or -1 for None.
+        """
+        categories = self._categories
+        return np.fromiter(
+            (
+                -1 if value is None else categories.setdefault(value, len(categories))
+                for value in values
+            ),
+            np.int32,
+            len(values),
+        )
+
+
+def find_columns(
+    sg: shotgun_api3.shotgun.Shotgun,
+    entity_type: str,
+    filters: list[Any],
+    fields: list[str],
+    order: Optional[list[dict[str, str]]] = None,
+    filter_operator: Optional[str] = None,
+    limit: int = 0,
+    retired_only: bool = False,
+    include_archived_projects: bool = True,
+    additional_filter_presets: Optional[str] = None,
+    page_size: int = 500,
+    prefetch: bool = False,
+    output: str = "numpy",
+) -> Any:
+    """
+    Find entities and return the values of their fields as columns.
+    Only a single page of entity dicts is kept in memory at a time.
+
+    See :py:meth:`SGSite.iter_find <pyshotgrid.core.SGSite.iter_find>` for the parameters
+    that are not documented here.
+
+    :param sg: A fully initialized instance of shotgun_api3.Shotgun.
+    :param entity_type:
+    :param filters:
+    :param fields: The fields to return. Dotted field paths are supported as well.
+    :param order:
+    :param filter_operator:
+    :param limit:
+    :param retired_only:
+    :param include_archived_projects:
+    :param additional_filter_presets:
+    :param page_size:
+    :param prefetch:
+    :param output: "numpy" for a dict with the "id" column and a column for every field
+                   or "arrow" for a pyarrow.Table with the same columns.
+    :return: The columns.
+    :raises ValueError: When the output is unknown.
+    """
+    if output not in ("numpy", "arrow"):
+        raise ValueError(f'Unknown output "{output}". Use "numpy" or "arrow".')
+    builders = _column_builders(sg, entity_type, fields)
+    for sg_entities in _iter_pages(
+        sg,
+        entity_type,
+        filters,
+        fields=fields,
+        order=order,
+        filter_operator=filter_operator,
+        limit=limit,
+        retired_only=retired_only,
+        include_archived_projects=include_archived_projects,
+        additional_filter_presets=additional_filter_presets,
+        page_size=page_size,
+        prefetch=prefetch,
+    ):
+        for field, builder in builders.items():
+            builder.add([sg_entity.get(field) for sg_entity in sg_entities])
+    columns = {field: builder.build() for field, builder in builders.items()}
+    if output == "arrow":
+        return to_arrow(columns)
+    return columns
+
+
+def _column_builders(
+    sg: shotgun_api3.shotgun.Shotgun, entity_type: str, fields: list[str]
+) -> dict[str, _ColumnBuilder]:
+    """
+    :param sg: A fully initialized instance of shotgun_api3.Shotgun.
+    :param entity_type: The entity type that the fields belong to.
+    :param fields: The fields and dotted field paths.
+    :return: An empty column builder for the "id" column and every field.
+    """
+    builders = {"id": _ColumnBuilder("id")}
+    for field in fields:
+        if field != "id":
+            builders[field] = _ColumnBuilder(
+                DATA_TYPE_KINDS.get(field_data_type(sg, entity_type, field) or "", "object")
+            )
+    return builders
+
+
+def field_data_type(
+    sg: shotgun_api3.shotgun.Shotgun, entity_type: str, field: str
+) -> Optional[str]:
+    """
+    :param sg: A fully initialized instance of shotgun_api3.Shotgun.
+    :param entity_type: The entity type that the field belongs to.
+    :param field: The name of the field or a dotted field path,
+                  like ``entity.Shot.sg_sequence.Sequence.code``.
+    :return: The data type of the (last) field or None when the field does not exist.
+    """
+    parts = field.split(".")
+    # A dotted field path alternates fields and entity types and ends with a field.
+    entity_types = [entity_type, *parts[1::2]]
+    field_schema = (
+        _site_state(sg).schema_cache.field_schemas(entity_types[-1]).get(parts[-1])
+        if len(parts) % 2
+        else None
+    )
+    if field_schema is None:
+        return None
+    return str(field_schema["data_type"]["value"])
+
+
+def to_arrow(columns: dict[str, Any]) -> Any:
+    """
+    Convert columns as returned by :py:func:`find_columns` to a pyarrow.Table.
+    Categorical columns become dictionary arrays and entity columns become struct
+    arrays with the "type" and "id" fields. Empty values become nulls.
+
+    :param columns: The columns.
+    :return: The pyarrow.Table.
+    """
+    import pyarrow as pa
+
+    return pa.table({name: _arrow_array(column) for name, column in columns.items()})
+
+
+def _arrow_array(column: Any) -> Any:
+    """
+    :param column: A column as returned by :py:func:`find_columns`.
+    :return: The column as pyarrow.Array.
+    """
+    import pyarrow as pa
+
+    if isinstance(column, CategoricalColumn):
+        return pa.DictionaryArray.from_arrays(
+            pa.array(column.codes, mask=column.codes < 0), pa.array(column.categories)
+        )
+    if isinstance(column, EntityColumn):
+        return pa.StructArray.from_arrays(
+            [_arrow_array(column.types), pa.array(column.ids.filled(0))],
+            names=["type", "id"],
+            mask=pa.array(np.ma.getmaskarray(column.ids)),
+        )
+    if isinstance(column, np.ma.MaskedArray):
+        return pa.array(column.filled(0), mask=np.ma.getmaskarray(column))
+    if column.dtype == object:
+        return pa.array(column.tolist())
+    if np.issubdtype(column.dtype, np.datetime64):
+        array = pa.array(column, mask=np.isnat(column))
+        if column.dtype == np.dtype("datetime64[D]"):
+            return array.cast(pa.date32())
+        return array.cast(pa.timestamp("us", tz="UTC"))
+    if np.issubdtype(column.dtype, np.floating):
+        return pa.array(column, mask=np.isnan(column))
+    return pa.array(column)
+
+
+def _to_utc(value: Optional[datetime.datetime]) -> Any:
+    """
+    :param value: A datetime with or without time zone or None.
+    :return: The datetime in UTC without time zone or "NaT" for None.
+    """
+    if value is None:
+        return "NaT"
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _concatenate(chunks: list[Any], dtype: Any) -> Any:
+    """
+    :param chunks: Arrays with the same dtype.
+    :param dtype: The dtype of the arrays.
+    :return: The concatenated array, which is empty when there are no arrays.
+    """
+    if not chunks:
+        return np.empty(0, dtype=dtype)
+    return np.concatenate(chunks)
@@ -1,17 +1,48 @@
+import contextlib
+import datetime
+import functools
 import http.cookiejar
+import json
+import logging
 import os
+import queue
+import re
+import socket
+import ssl
 import sys
+import threading
+import time
+import urllib.error
 import urllib.parse
 import urllib.request
-from typing import Any, Optional, Type, Union
+import weakref
+import xmlrpc.client
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Optional, Type, Union
+
+_LOGGER = logging.getLogger(__name__)
+
+#: Errors of the connection to ShotGrid after which a request can be tried again.
+#: Other OSErrors, like a missing or unreadable local file, are not.
+_TRANSPORT_ERRORS = (
+    xmlrpc.client.ProtocolError,
+    ConnectionError,
+    socket.timeout,
+    socket.gaierror,
+    ssl.SSLError,
+    urllib.error.URLError,
+)
 
 __SG_CLASSES = []
+__MOCKGUN_CLASSES = []
 try:
     import tank_vendor
     import tank_vendor.shotgun_api3 as shotgun_api3
     import tank_vendor.shotgun_api3.lib.mockgun
 
     __SG_CLASSES += [tank_vendor.shotgun_api3.Shotgun, tank_vendor.shotgun_api3.lib.mockgun.Shotgun]
+    __MOCKGUN_CLASSES += [tank_vendor.shotgun_api3.lib.mockgun.Shotgun]
 except ImportError:
     pass
 
@@ -20,10 +51,26 @@ try:
     import shotgun_api3.lib.mockgun
 
     __SG_CLASSES += [shotgun_api3.Shotgun, shotgun_api3.lib.mockgun.Shotgun]
+    __MOCKGUN_CLASSES += [shotgun_api3.lib.mockgun.Shotgun]
 except ImportError:
     pass
 
 
+def _sg_classes() -> list[type]:
+    """
+    :return: The Shotgun classes of shotgun_api3 and tk-core that pyshotgrid works with,
+             including their mockgun classes.
+    """
+    return list(dict.fromkeys(__SG_CLASSES))
+
+
+if TYPE_CHECKING:
+    from .instrumentation import QueryBudget
+
+#: The number of bytes that are written to disk at a time when a file is downloaded.
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
 class SGEntity:
     """
     An instance of this class represents a single entity in ShotGrid.
@@ -42,6 +89,10 @@ class SGEntity:
     #: class should represent.
     DEFAULT_SG_ENTITY_TYPE: Optional[str] = None
 
+    # Applications can hold a lot of entities, so they are kept as small as possible.
+    # Sub classes should define __slots__ as well.
+    __slots__ = ("__weakref__", "_field_values", "_id", "_related", "_sg", "_type")
+
     def __init__(
         self, sg: shotgun_api3.shotgun.Shotgun, entity_id: int, entity_type: Optional[str] = None
     ):
@@ -61,7 +112,12 @@ class SGEntity:
                 )
             else:
                 entity_type = self.DEFAULT_SG_ENTITY_TYPE
-        self._type = entity_type
+        self._type = sys.intern(entity_type)
+        # Maps field names to (timestamp, raw field value, explicitly loaded).
+        # Created on first use.
+        self._field_values: Optional[dict[str, tuple[float, Any, bool]]] = None
+        # Maps relationships to (timestamp, prefetched entities). Created on first use.
+        self._related: Optional[dict[str, tuple[float, list[SGEntity]]]] = None
 
     def __str__(self) -> str:
         return f"{self.__class__.__name__} - Type: {self._type} - ID: {self._id} - URL: {self.url}"
@@ -114,16 +170,26 @@ class SGEntity:
         :raises:
             :RuntimeError: When the current entity does not have a "name" or "code" field.
         """
-        sg_entity = self._sg.find_one(self._type, [["id", "is", self._id]], ["name", "code"])
-        if "name" in sg_entity and sg_entity["name"] is not None:
-            return self["name"]
-        elif "code" in sg_entity and sg_entity["code"] is not None:
-            return self["code"]
-        else:
+        # The schema tells us which fields exist, so only entity types
+        # that have both fields need a look at the values.
+        name_fields = _site_state(self._sg).schema_cache.name_fields(self._type)
+        if not name_fields:
             raise RuntimeError(
                 f"Cannot find a field for the name. "
                 f'"{self._type}" entities have neither a "name" nor a "code" field.'
             )
+        if len(name_fields) == 1:
+            return self[name_fields[0]]
+        values = self.get(name_fields, raw_values=True)
+        # Keep the values for the get() call on the returned field, even without a value TTL.
+        self._cache_values(values, explicit_fields=name_fields)
+        for field in name_fields:
+            if values[field] is not None:
+                return self[field]
+        raise RuntimeError(
+            f"Cannot find a field for the name. "
+            f'Neither the "name" nor the "code" field of {self._type} {self._id} has a value.'
+        )
 
     @property
     def thumbnail(self) -> "Field":
@@ -151,6 +217,8 @@ class SGEntity:
         :param other: The other python object to compare to.
         :return: Whether the 2 instances represent the same entity in ShotGrid.
         """
+        if self is other:
+            return True
         return isinstance(other, SGEntity) and all(
             (
                 self._id == other.id,
@@ -159,6 +227,20 @@ class SGEntity:
             )
         )
 
+    def __hash__(self) -> int:
+        """
+        The hash is based on the same values as :py:meth:`__eq__`, so entities can be used
+        in sets and as dict keys.
+
+        .. Note::
+
+            Entities that are created inside a :py:meth:`SGSite.batch` block change their
+            ID (and hash) when the block ends. Do not put them in sets before that.
+
+        :return: The hash of the entity.
+        """
+        return hash((self._sg.base_url, self._type, self._id))
+
     def __getitem__(self, field: str) -> "Field":
         """
         Enabling dict notation to query fields of the entity from ShotGrid.
@@ -177,13 +259,12 @@ class SGEntity:
         :return: All fields from this entity. If a project entity is given
                  only fields that are visible to the project are returned.
         """
-        if project_entity is not None and not isinstance(project_entity, dict):
-            project_entity = project_entity.to_dict()
-
-        sg_entity_fields = self.sg.schema_field_read(self._type, project_entity=project_entity)
+        sg_entity_fields = _site_state(self._sg).schema_cache.field_schemas(
+            self._type, project_entity=project_entity
+        )
         fields = [field for field, schema in sg_entity_fields.items() if schema["visible"]["value"]]
 
-        return [Field(name=field, entity=self) for field in fields]
+        return [self[field] for field in fields]
 
     def all_field_values(
         self,
@@ -196,12 +277,12 @@ class SGEntity:
         :return: All fields and values from this entity in a dict. If a project entity is given
                  only fields that are visible to the project are returned.
         """
-        if project_entity is not None and not isinstance(project_entity, dict):
-            project_entity = project_entity.to_dict()
-
-        sg_entity_fields = self.sg.schema_field_read(self._type, project_entity=project_entity)
+        sg_entity_fields = _site_state(self._sg).schema_cache.field_schemas(
+            self._type, project_entity=project_entity
+        )
         fields = [field for field, schema in sg_entity_fields.items() if schema["visible"]["value"]]
         all_fields = self.sg.find_one(self._type, [["id", "is", self._id]], fields)
+        self._cache_values(all_fields)
 
         if raw_values:
             return all_fields
@@ -249,45 +330,252 @@ class SGEntity:
             ::
 
                 multi_entity_update_modes={"shots": "add", "assets": "remove"}
+
+        Inside a :py:meth:`SGSite.batch` block the update is queued instead.
         """
+        write_buffer = _site_state(self._sg).write_buffer
+        if write_buffer is not None:
+            write_buffer.update(self, data, multi_entity_update_modes)
+            return
+
+        sg_data = convert_fields_to_dicts(data)
         self.sg.update(
             self._type,
             self._id,
-            data=convert_fields_to_dicts(data),
+            data=sg_data,
             multi_entity_update_modes=multi_entity_update_modes,
         )
+        self._updated(sg_data, multi_entity_update_modes)
+
+    def _updated(
+        self, sg_data: dict[str, Any], multi_entity_update_modes: Optional[dict[str, Any]] = None
+    ) -> None:
+        """
+        Update the cached field values after this entity was updated in ShotGrid.
+        Cached field paths through the updated fields are forgotten.
+
+        :param sg_data: The data that was sent to ShotGrid.
+        :param multi_entity_update_modes: The update modes that were sent to ShotGrid.
+        """
+        modes = multi_entity_update_modes or {}
+        self._cache_values(
+            {field: value for field, value in sg_data.items() if modes.get(field, "set") == "set"}
+        )
+        self.clear_cache([field for field, mode in modes.items() if mode != "set"])
+        self._clear_field_paths(list(sg_data))
+        _outdate_prefetched(self._sg, self._type, sg_data)
 
     def get(self, fields: list[str], raw_values: bool = False) -> dict[str, Any]:
         """
         Query many fields at once on this entity.
+        Fields that were loaded with :py:meth:`SGSite.find` or :py:meth:`SGSite.load_fields`
+        are not queried again. The same goes for all cached fields, as long as
+        :py:attr:`SGSite.value_cache_ttl` is set and they did not expire.
+
+        Fields can be dotted paths through linked entities, like
+        ``entity.Shot.sg_sequence.Sequence.code``. Paths through fields with a single
+        entity are resolved by ShotGrid within the same query. Paths through multi-entity
+        fields, like ``versions.Version.code``, return a list with one value per linked
+        entity and need one more query per multi-entity field. The values are cached on
+        the linked entities as well::
+
+            >>> sg_playlist.get(["versions.Version.code"])
+            {'versions.Version.code': ['sh010_comp_v001', 'sh020_comp_v003']}
+            >>> sg_site.value_cache_ttl = 60
+            >>> sg_playlist["versions"].get()[0]["code"].get()  # no further query needed
+            'sh010_comp_v001'
 
         :param fields: A list of fields to query from this entity.
         :param raw_values: Any entities will be converted to pyshotgrid instances.
                                 If you set this parameter to True you can turn this behaviour off.
         :return: A dict with the fields and their corresponding values.
         """
-        sg_fields = self.sg.find_one(self._type, [["id", "is", self._id]], fields)
+        sg_fields = {}
+        missing_fields = []
+        for field in fields:
+            value = self._cached_value(field)
+            if value is _MISSING:
+                missing_fields.append(field)
+            else:
+                sg_fields[field] = value
 
-        del sg_fields["id"]
-        del sg_fields["type"]
+        if missing_fields:
+            query_fields, multi_entity_paths = _split_field_paths(
+                self.sg, self._type, missing_fields
+            )
+            sg_result = self.sg.find_one(self._type, [["id", "is", self._id]], query_fields)
+            if sg_result is not None and multi_entity_paths:
+                _resolve_multi_entity_paths(self.sg, [sg_result], multi_entity_paths)
+            self._cache_values(sg_result)
+            for field in missing_fields:
+                sg_fields[field] = sg_result.get(field)
 
         if raw_values:
             return sg_fields
 
         else:
-            result = {}
-            for field_name, value in sg_fields.items():
-                if isinstance(value, dict) and "link_type" in value:
-                    link_type = value["link_type"]
-                    if link_type == "upload":
-                        result[field_name] = value
-                    elif link_type == "web":
-                        result[field_name] = value["url"]
-                    else:  # link_type == "local":
-                        result[field_name] = value["local_path"]
-                else:
-                    result[field_name] = convert_value_to_pysg(self.sg, value)
-            return result
+            return {
+                field_name: convert_field_value_to_pysg(self.sg, value)
+                for field_name, value in sg_fields.items()
+            }
+
+    def refresh(self, fields: Optional[list[str]] = None) -> None:
+        """
+        Query the values of cached fields again from ShotGrid.
+
+        :param fields: The fields to query again. If this is None all cached fields
+                       are queried again.
+        """
+        if fields is None:
+            fields = list(self._field_values or ())
+        self.clear_cache(fields)
+        if fields:
+            self.get(fields, raw_values=True)
+
+    def clear_cache(self, fields: Optional[list[str]] = None) -> None:
+        """
+        Forget cached field values, so they are queried from ShotGrid on the next access.
+
+        :param fields: The fields to forget, including the cached field paths through them.
+                       If this is None all cached fields and prefetched relationships
+                       are forgotten.
+        """
+        if fields is None:
+            self._related = None
+        if self._field_values is None:
+            return
+        if fields is None:
+            self._field_values.clear()
+        else:
+            for field in fields:
+                self._field_values.pop(field, None)
+            self._clear_field_paths(fields)
+
+    def _clear_field_paths(self, fields: list[str]) -> None:
+        """
+        Forget the cached field paths through the given fields,
+        like ``entity.Shot.code`` for the field ``entity``.
+
+        :param fields: The names of the fields.
+        """
+        if not self._field_values or not fields:
+            return
+        prefixes = tuple(f"{field}." for field in fields)
+        for path in [path for path in self._field_values if path.startswith(prefixes)]:
+            del self._field_values[path]
+
+    def _cache_values(
+        self, sg_fields: Optional[dict[str, Any]], explicit_fields: Optional[list[str]] = None
+    ) -> None:
+        """
+        Remember field values that were queried from (or written to) ShotGrid.
+
+        :param sg_fields: A dict with raw field values, like it is returned by
+                          shotgun_api3.Shotgun.find().
+        :param explicit_fields: The fields that were explicitly loaded, for example with
+                                :py:meth:`SGSite.find` or :py:meth:`SGSite.load_fields`.
+                                Only their values are used without a query when
+                                :py:attr:`SGSite.value_cache_ttl` is None.
+        """
+        if not sg_fields:
+            return
+        if self._field_values is None:
+            self._field_values = {}
+        now = time.monotonic()
+        explicit = set(explicit_fields or ())
+        for field, value in sg_fields.items():
+            if field not in ("type", "id"):
+                self._field_values[field] = (now, value, field in explicit)
+
+    def _cached_value(self, field: str) -> Any:
+        """
+        :param field: The name of the field.
+        :return: The cached raw value of the field or _MISSING when the field is not cached
+                 or the cached value is outdated.
+        """
+        if self._field_values is None:
+            return _MISSING
+        cached = self._field_values.get(field)
+        if cached is None:
+            return _MISSING
+        timestamp, value, explicit = cached
+        ttl = _site_state(self._sg).value_cache_ttl
+        if ttl is None:
+            return value if explicit else _MISSING
+        if time.monotonic() - timestamp >= ttl:
+            del self._field_values[field]
+            return _MISSING
+        return value
+
+    def _cache_related(self, relationship: str, entities: list["SGEntity"]) -> None:
+        """
+        Remember the prefetched entities of a relationship.
+
+        :param relationship: The name of the relationship, like "tasks".
+        :param entities: The related entities.
+        """
+        if self._related is None:
+            self._related = {}
+        self._related[relationship] = (time.monotonic(), entities)
+
+    def _cached_related(self, relationship: str) -> Any:
+        """
+        :param relationship: The name of the relationship, like "tasks".
+        :return: The prefetched entities of the relationship or _MISSING when the
+                 relationship was not prefetched or the prefetched entities are outdated.
+        """
+        if self._related is None:
+            return _MISSING
+        cached = self._related.get(relationship)
+        if cached is None:
+            return _MISSING
+        timestamp, entities = cached
+        site_state = _site_state(self._sg)
+        ttl = site_state.value_cache_ttl
+        changed = site_state.related_changes.get(_RELATIONSHIPS[relationship][0])
+        if (ttl is not None and time.monotonic() - timestamp >= ttl) or (
+            changed is not None and timestamp <= changed
+        ):
+            del self._related[relationship]
+            return _MISSING
+        return entities
+
+    def _relationship(
+        self,
+        relationship: str,
+        find: Callable[[list[str]], list[dict[str, Any]]],
+        fields: Optional[list[str]] = None,
+        prefetch: Optional[dict[str, Any]] = None,
+        use_prefetched: bool = True,
+    ) -> list["SGEntity"]:
+        """
+        Base for the relationship methods of the sub classes, like "tasks".
+
+        :param relationship: The name of the relationship.
+        :param find: A function that queries the related entities with the given fields.
+        :param fields: More fields to load for the related entities.
+        :param prefetch: The relationships to prefetch for the related entities.
+                         See :py:meth:`SGSite.prefetch`.
+        :param use_prefetched: Whether the prefetched entities of the relationship can be
+                               returned. This is only the case when the method call asks
+                               for all related entities.
+        :return: The related entities.
+        """
+        prefetched: Any = self._cached_related(relationship) if use_prefetched else _MISSING
+        if prefetched is _MISSING:
+            default_fields = _RELATIONSHIPS[relationship][2]
+            query_fields = list(dict.fromkeys([*default_fields, *(fields or [])]))
+            entities = [
+                convert_result_to_pysg(self._sg, sg_entity, fields)
+                for sg_entity in find(query_fields)
+            ]
+        else:
+            entities = list(prefetched)
+            if fields:
+                self.site.load_fields(entities, fields)
+        if prefetch:
+            _prefetch_related(self._sg, entities, prefetch)
+        return entities
 
     def delete(self) -> bool:
         """
@@ -298,9 +586,19 @@ class SGEntity:
             The python object that represents this entity does not make sense any more after you
             ran this method and will create errors if you keep calling functions on it.
 
+        Inside a :py:meth:`SGSite.batch` block the deletion is queued instead and
+        this method always returns True.
+
         :return: Whether the entity was successfully deleted.
         """
-        return self._sg.delete(self._type, self._id)
+        self.clear_cache()
+        write_buffer = _site_state(self._sg).write_buffer
+        if write_buffer is not None:
+            write_buffer.delete(self)
+            return True
+        deleted = self._sg.delete(self._type, self._id)
+        _outdate_prefetched(self._sg, self._type)
+        return deleted
 
     @property
     def entity_display_name(self) -> str:
@@ -313,7 +611,7 @@ class SGEntity:
         """
         :return: The schema for the current entity.
         """
-        return self.sg.schema_entity_read()[self._type]
+        return _site_state(self._sg).schema_cache.entity_schemas()[self._type]
 
     def field_schemas(self) -> dict[str, "FieldSchema"]:
         """
@@ -321,7 +619,7 @@ class SGEntity:
         """
         return {
             field: FieldSchema(self._sg, self._type, field)
-            for field in self.sg.schema_field_read(self._type)
+            for field in _site_state(self._sg).schema_cache.field_schemas(self._type)
         }
 
     def _publishes(
@@ -329,6 +627,8 @@ class SGEntity:
         base_filter: Optional[list[Any]] = None,
         pub_types: Optional[Union[str, list[str]]] = None,
         latest: bool = False,
+        fields: Optional[list[str]] = None,
+        prefetch: Optional[dict[str, Any]] = None,
     ) -> list["SGEntity"]:
         """
         This function is meant as a base for a "publishes" function on a sub class. Publishes
@@ -344,6 +644,9 @@ class SGEntity:
                         - from these get the publishes with the highest "version_number" field
                         - if there are publishes with the same "name" and "version_number" the
                           newest one wins.
+        :param fields: More fields to load for the publishes.
+        :param prefetch: The relationships to prefetch for the publishes.
+                         See :py:meth:`SGSite.prefetch`.
         :return: All published files from this shot.
         """
         result_filter = base_filter or []
@@ -364,31 +667,18 @@ class SGEntity:
                 ]
             result_filter.append(pub_types_filter)
 
-        sg_publishes = self.sg.find(
-            "PublishedFile", result_filter, ["name", "version_number", "created_at"]
+        def find(query_fields: list[str]) -> list[dict[str, Any]]:
+            if latest:
+                return _find_latest_publishes(self.sg, result_filter, query_fields)
+            return self.sg.find("PublishedFile", result_filter, query_fields)
+
+        return self._relationship(
+            "publishes",
+            find,
+            fields=fields,
+            prefetch=prefetch,
+            use_prefetched=pub_types is None and not latest,
         )
-        if latest:
-            # group publishes by "name"
-            tmp = {}  # type: dict[str,list[dict[str,Any]]]
-            for sg_publish in sg_publishes:
-                if sg_publish["name"] in tmp:
-                    tmp[sg_publish["name"]].append(sg_publish)
-                else:
-                    tmp[sg_publish["name"]] = [sg_publish]
-
-            # sort them by date and than by version_number which sorts the latest publish to the
-            # last position.
-            result = []
-            for publishes in tmp.values():
-                publishes.sort(key=lambda pub: (pub["created_at"], pub["version_number"]))
-                result.append(publishes[-1])
-
-            # Sort one more time by name.
-            result.sort(key=lambda pub: pub["name"])
-
-            sg_publishes = result
-
-        return [new_entity(self._sg, sg_publish) for sg_publish in sg_publishes]
 
     def _tasks(
         self,
@@ -396,6 +686,8 @@ class SGEntity:
         entity: Optional[Union[dict[str, Any], "SGEntity"]] = None,
         assignee: Optional[Union[dict[str, Any], "SGEntity"]] = None,
         pipeline_step: Optional[Union[str, dict[str, Any], "SGEntity"]] = None,
+        fields: Optional[list[str]] = None,
+        prefetch: Optional[dict[str, Any]] = None,
     ) -> list["SGEntity"]:
         """
         This function is meant as a base for a "tasks" function on a sub class.
@@ -405,6 +697,9 @@ class SGEntity:
         :param entity: entity to filter by eg. (Shot, Asset, Project,...).
         :param assignee: The assignee of the Tasks to return.
         :param pipeline_step: Name, short name or entity object or the Pipeline Step to filter by.
+        :param fields: More fields to load for the Tasks.
+        :param prefetch: The relationships to prefetch for the Tasks.
+                         See :py:meth:`SGSite.prefetch`.
         :returns: A list of Tasks
         """
         sg_filter: list[Union[list[Any], dict[str, Any]]] = []
@@ -471,7 +766,18 @@ class SGEntity:
                     "type str, dict, SGEntity or None."
                 )
 
-        return [new_entity(self._sg, sg_task) for sg_task in self._sg.find("Task", sg_filter)]
+        return self._relationship(
+            "tasks",
+            lambda query_fields: self._sg.find("Task", sg_filter, query_fields),
+            fields=fields,
+            prefetch=prefetch,
+            use_prefetched=(
+                names is None
+                and assignee is None
+                and pipeline_step is None
+                and _is_link_to(entity, self)
+            ),
+        )
 
     def _versions(
         self,
@@ -479,6 +785,8 @@ class SGEntity:
         user: Optional[Union[dict[str, Any], "SGEntity"]] = None,
         pipeline_step: Optional[Union[str, dict[str, Any], "SGEntity"]] = None,
         latest: bool = False,
+        fields: Optional[list[str]] = None,
+        prefetch: Optional[dict[str, Any]] = None,
     ) -> list["SGEntity"]:
         """
         This function is meant as a base for a "versions" function on a sub class.
@@ -488,6 +796,9 @@ class SGEntity:
         :param user: The artist assigned to the Versions.
         :param pipeline_step: Name, short name or entity object or the Pipeline Step to filter by.
         :param latest: Whether to return only the latest Version per link/entity.
+        :param fields: More fields to load for the Versions.
+        :param prefetch: The relationships to prefetch for the Versions.
+                         See :py:meth:`SGSite.prefetch`.
         :returns: A list of Versions
         """
         sg_filter: list[Union[list[Any], dict[str, Any]]] = []
@@ -535,31 +846,33 @@ class SGEntity:
                     "type str, dict, SGEntity or None."
                 )
 
-        sg_versions = self._sg.find(
-            "Version",
-            sg_filter,
-            ["entity", "created_at"],
+        def find(query_fields: list[str]) -> list[dict[str, Any]]:
+            sg_versions = _sort_versions(self._sg.find("Version", sg_filter, query_fields))
+            if latest:
+                tmp_list = []
+                last_entity: dict[str, Any] = {}
+                for sg_version in sg_versions:
+                    if sg_version["entity"] == last_entity:
+                        continue
+                    else:
+                        last_entity = sg_version["entity"]
+                        tmp_list.append(sg_version)
+                sg_versions = tmp_list
+            return sg_versions
+
+        return self._relationship(
+            "versions",
+            find,
+            fields=fields,
+            prefetch=prefetch,
+            use_prefetched=(
+                pipeline_step is None
+                and not latest
+                # Only the Versions of this entity or of this user.
+                and _is_link_to(entity if user is None else user if entity is None else None, self)
+            ),
         )
 
-        # Sort one more time by name.
-        sg_versions.sort(key=lambda pub: (pub["entity"] or {}).get("id", 10000000000))
-        # sort them by date and than by version_number which sorts the latest publish to the
-        # last position.
-        sg_versions.sort(key=lambda pub: pub["created_at"], reverse=True)
-
-        if latest:
-            tmp_list = []
-            last_entity: dict[str, Any] = {}
-            for sg_version in sg_versions:
-                if sg_version["entity"] == last_entity:
-                    continue
-                else:
-                    last_entity = sg_version["entity"]
-                    tmp_list.append(sg_version)
-            sg_versions = tmp_list
-
-        return [new_entity(self._sg, sg_version) for sg_version in sg_versions]
-
 
 class SGSite:
     """
@@ -586,6 +899,61 @@ class SGSite:
         """
         return self._sg
 
+    @property
+    def publish_chains(self) -> "_LRUCache":
+        """
+        :return: The publish chains that were loaded with
+                 :py:func:`load_publish_chains <pyshotgrid.sg_default_entities.load_publish_chains>`
+                 by the ID of their publishes. Only the most recently used chains are kept.
+        """
+        return _site_state(self._sg).publish_chains
+
+    @property
+    def schema_cache(self) -> "SchemaCache":
+        """
+        :return: The schema cache of this site. It is shared by all pysg objects
+                 that use the same Shotgun instance.
+        """
+        return _site_state(self._sg).schema_cache
+
+    @property
+    def value_cache_ttl(self) -> Optional[float]:
+        """
+        :return: The time in seconds after which field values that are cached on the entities
+                 of this site are queried again from ShotGrid. None means that only the
+                 values that were loaded with :py:meth:`find` or :py:meth:`load_fields` are
+                 used without a query and that they never expire. You can always query
+                 values again with :py:meth:`SGEntity.refresh` or :py:meth:`Field.refresh`.
+        """
+        return _site_state(self._sg).value_cache_ttl
+
+    @value_cache_ttl.setter
+    def value_cache_ttl(self, value: Optional[float]) -> None:
+        _site_state(self._sg).value_cache_ttl = value
+
+    @property
+    def use_identity_map(self) -> bool:
+        """
+        :return: Whether :py:func:`new_entity` returns the same python object every time it is
+                 called for the same entity of this site. This way all references to an entity
+                 share their cached field values and can be compared by identity::
+
+                     >>> sg_site.use_identity_map = True
+                     >>> sg_site.find_one("Shot", [["id", "is", 1]]) is new_entity(sg, 1, "Shot")
+                     True
+
+                 The objects are only kept alive as long as they are referenced somewhere else.
+        """
+        return _site_state(self._sg).identity_map is not None
+
+    @use_identity_map.setter
+    def use_identity_map(self, value: bool) -> None:
+        state = _site_state(self._sg)
+        if not value:
+            state.identity_map = None
+        elif state.identity_map is None:
+            state.identity_map = weakref.WeakValueDictionary()
+
     def __eq__(self, other: Any) -> bool:
         """
         Compare SGSites against each other.
@@ -604,20 +972,53 @@ class SGSite:
         :py:meth:`Shotgun.create <shotgun_api3:shotgun_api3.shotgun.Shotgun.create>`,
         but it accepts and returns a pyshotgrid object.
 
+        Inside a :py:meth:`batch` block the creation is queued instead. The returned entity
+        gets its real ID when the queue is sent to ShotGrid.
+
         :param entity_type: The type of the entity to create.
         :param data: dict of fields and values to set on creation.
                      The values can contain pysg objects.
         :return: The new created entity.
         """
-        # noinspection PyTypeChecker
-        return new_entity(
-            self._sg,
-            self._sg.create(
-                entity_type=entity_type,
-                data=convert_fields_to_dicts(data),
-                return_fields=None,
-            ),
+        write_buffer = _site_state(self._sg).write_buffer
+        if write_buffer is not None:
+            return write_buffer.create(entity_type, data)
+
+        sg_entity = self._sg.create(
+            entity_type=entity_type,
+            data=convert_fields_to_dicts(data),
+            return_fields=None,
         )
+        _outdate_prefetched(self._sg, entity_type, data)
+        # noinspection PyTypeChecker
+        return convert_result_to_pysg(self._sg, sg_entity)
+
+    def batch(self, chunk_size: int = 100) -> "WriteBuffer":
+        """
+        Queue all create, update and delete calls of pysg objects and send them to ShotGrid
+        with as few requests as possible::
+
+            >>> with sg_site.batch():
+            ...     for sg_shot in sg_project.shots():
+            ...         sg_shot["sg_status_list"].set("ip")
+            ...     sg_asset = sg_site.create("Asset", {"code": "Tree"})
+            >>> sg_asset.id  # the real ID is available after the block
+            42
+
+        Updates of the same entity are merged into a single request and all requests are
+        sent in chunks with :py:meth:`Shotgun.batch
+        <shotgun_api3:shotgun_api3.shotgun.Shotgun.batch>` at the end of the block.
+        Nothing is sent when the block raises an exception.
+
+        .. Note::
+
+            Only calls from the current thread are queued. Nested blocks add their calls
+            to the outermost block.
+
+        :param chunk_size: The maximum number of requests per batch call.
+        :return: A context manager that queues all write operations.
+        """
+        return WriteBuffer(self._sg, chunk_size=chunk_size)
 
     def find(
         self,
@@ -630,6 +1031,7 @@ class SGSite:
         page: int = 0,
         include_archived_projects: bool = True,
         additional_filter_presets: Optional[str] = None,
+        fields: Optional[list[str]] = None,
     ) -> list[SGEntity]:
         """
         The same function as
@@ -645,15 +1047,17 @@ class SGSite:
         :param page:
         :param include_archived_projects:
         :param additional_filter_presets:
+        :param fields: Fields to query alongside. Their values are cached on the returned
+                       entities, so reading them later does not need another query.
         :return:
         """
         # noinspection PyTypeChecker
         return [
-            new_entity(self._sg, sg_entity)
+            convert_result_to_pysg(self._sg, sg_entity, fields)
             for sg_entity in self._sg.find(
                 entity_type=entity_type,
                 filters=convert_filters_to_dict(filters),
-                fields=None,
+                fields=fields,
                 order=order,
                 filter_operator=filter_operator,
                 limit=limit,
@@ -675,6 +1079,7 @@ class SGSite:
         page: int = 0,
         include_archived_projects: bool = True,
         additional_filter_presets: Optional[str] = None,
+        fields: Optional[list[str]] = None,
     ) -> Optional[SGEntity]:
         """
         The same function as
@@ -691,17 +1096,561 @@ class SGSite:
             page=page,
             include_archived_projects=include_archived_projects,
             additional_filter_presets=additional_filter_presets,
+            fields=fields,
         )
         if result:
             return result[0]
         return None
 
+    def iter_find(
+        self,
+        entity_type: str,
+        filters: list[list[Any]],
+        order: Optional[list[dict[str, str]]] = None,
+        filter_operator: Optional[str] = None,
+        limit: int = 0,
+        retired_only: bool = False,
+        include_archived_projects: bool = True,
+        additional_filter_presets: Optional[str] = None,
+        fields: Optional[list[str]] = None,
+        page_size: int = 500,
+        prefetch: bool = False,
+    ) -> Iterator[SGEntity]:
+        """
+        Like :py:meth:`find`, but it queries the entities page by page and yields them
+        as soon as a page arrives. Only one page (two with ``prefetch``) is kept in memory,
+        so this is the better choice for very large result sets::
+
+            >>> for sg_publish in sg_site.iter_find("PublishedFile", [], fields=["code"]):
+            ...     print(sg_publish["code"].get())
+
+        The results are always ordered by ID last, so that the pages do not
+        overlap when they are queried one after another.
+
+        :param entity_type:
+        :param filters:
+        :param order:
+        :param filter_operator:
+        :param limit: The maximum number of entities to yield. 0 means no limit.
+        :param retired_only:
+        :param include_archived_projects:
+        :param additional_filter_presets:
+        :param fields: Fields to query alongside. Their values are cached on the returned
+                       entities, so reading them later does not need another query.
+        :param page_size: The number of entities to query per request. Larger values are
+                          limited to the maximum page size of the server (usually 500).
+        :param prefetch: Query the next page in a background thread while the
+                         current page is processed.
+        :return: An iterator over the found entities.
+        """
+        for sg_entities in _iter_pages(
+            self._sg,
+            entity_type,
+            filters,
+            fields=fields,
+            order=order,
+            filter_operator=filter_operator,
+            limit=limit,
+            retired_only=retired_only,
+            include_archived_projects=include_archived_projects,
+            additional_filter_presets=additional_filter_presets,
+            page_size=page_size,
+            prefetch=prefetch,
+        ):
+            for sg_entity in sg_entities:
+                yield convert_result_to_pysg(self._sg, sg_entity, fields)
+
+    def find_columns(
+        self,
+        entity_type: str,
+        filters: list[list[Any]],
+        fields: list[str],
+        order: Optional[list[dict[str, str]]] = None,
+        filter_operator: Optional[str] = None,
+        limit: int = 0,
+        retired_only: bool = False,
+        include_archived_projects: bool = True,
+        additional_filter_presets: Optional[str] = None,
+        page_size: int = 500,
+        prefetch: bool = False,
+        output: str = "numpy",
+    ) -> Any:
+        """
+        Like :py:meth:`iter_find`, but it returns one array per field instead of one
+        entity per row. This needs a lot less memory for large result sets and the
+        columns can be aggregated without looping over the rows in Python::
+
+            >>> columns = sg_site.find_columns("Task", [], ["sg_status_list", "duration"])
+            >>> columns["sg_status_list"].value_counts()
+            {'ip': 5012, 'fin': 80412, 'wtg': 1245}
+            >>> columns["duration"].sum()
+            4803360
+
+        This needs numpy and for the "arrow" output pyarrow.
+        See :py:mod:`pyshotgrid.columnar` for the column types of the field data types.
+
+        :param entity_type:
+        :param filters:
+        :param fields: The fields to return. Dotted field paths are supported as well.
+        :param order:
+        :param filter_operator:
+        :param limit: The maximum number of rows to return. 0 means no limit.
+        :param retired_only:
+        :param include_archived_projects:
+        :param additional_filter_presets:
+        :param page_size: The number of entities to query per request. Larger values are
+                          limited to the maximum page size of the server (usually 500).
+        :param prefetch: Query the next page in a background thread while the
+                         current page is converted.
+        :param output: "numpy" for a dict with the "id" column and a column for every field
+                       or "arrow" for a pyarrow.Table with the same columns.
+        :return: The columns.
+        """
+        from .columnar import find_columns
+
+        return find_columns(
+            self._sg,
+            entity_type,
+            filters,
+            fields,
+            order=order,
+            filter_operator=filter_operator,
+            limit=limit,
+            retired_only=retired_only,
+            include_archived_projects=include_archived_projects,
+            additional_filter_presets=additional_filter_presets,
+            page_size=page_size,
+            prefetch=prefetch,
+            output=output,
+        )
+
+    def export(
+        self,
+        entity_type: str,
+        path: Union[str, "os.PathLike[str]"],
+        fields: Optional[list[str]] = None,
+        filters: Optional[list[Any]] = None,
+        file_format: Optional[str] = None,
+        page_size: int = 500,
+        row_group_size: int = 100_000,
+        include_archived_projects: bool = True,
+    ) -> int:
+        """
+        Export entities to a Parquet or NDJSON file without keeping them all in memory::
+
+            >>> sg_site.export("Shot", "/dumps/Shot.parquet", fields=["code", "sg_status_list"])
+            2000
+
+        Parquet files need pyarrow. See :py:mod:`pyshotgrid.export` for the column types
+        of the field data types and the command line interface.
+
+        :param entity_type: The type of the entities to export.
+        :param path: The file to write.
+        :param fields: The fields to export. The "id" is always exported.
+                       When this is None all fields of the entity type are exported.
+        :param filters: The filters for the entities to export. All entities are exported
+                        when this is None.
+        :param file_format: "parquet" or "ndjson". When this is None the format is derived
+                            from the extension of the path (".parquet", ".ndjson" or ".jsonl").
+        :param page_size: The number of entities to query per request. Larger values are
+                          limited to the maximum page size of the server (usually 500).
+        :param row_group_size: The maximum number of rows per Parquet row group.
+                               The rows of a row group are kept in memory until it is
+                               written, so at most ``max(row_group_size, page_size)`` rows
+                               plus the next page that is queried in the background are
+                               kept in memory.
+        :param include_archived_projects: Whether to export the entities of archived projects.
+        :return: The number of exported entities.
+        """
+        from .export import export_entities
+
+        return export_entities(
+            self._sg,
+            entity_type,
+            path,
+            fields=fields,
+            filters=filters,
+            file_format=file_format,
+            page_size=page_size,
+            row_group_size=row_group_size,
+            include_archived_projects=include_archived_projects,
+        )
+
+    def load_fields(
+        self,
+        entities: list[SGEntity],
+        fields: list[str],
+        raw_values: bool = False,
+        chunk_size: int = 500,
+    ) -> list[dict[str, Any]]:
+        """
+        Query the same fields for many entities at once. This needs one query per entity type
+        (and per ``chunk_size`` entities) instead of one query per entity::
+
+            >>> shots = sg_project.shots()
+            >>> sg_site.load_fields(shots, ["sg_status_list", "description"])
+            >>> shots[0]["sg_status_list"].get()  # no further query needed
+
+        The values are cached on the given entities. Entities that already have all
+        fields cached are not queried again. Like with :py:meth:`SGEntity.get`, the fields
+        can be dotted paths through linked entities.
+
+        :param entities: The entities to query the fields for. They can be of different types.
+        :param fields: The fields to query.
+        :param raw_values: Whether to return the raw values or the values converted to
+                           pyshotgrid objects.
+        :param chunk_size: The maximum number of entities to query with a single request.
+        :return: A dict with the fields and their values for every given entity
+                 in the same order as the entities.
+        """
+        entities_by_type: dict[str, dict[int, list[SGEntity]]] = {}
+        for entity in entities:
+            if any(entity._cached_value(field) is _MISSING for field in fields):
+                entities_by_type.setdefault(entity.type, {}).setdefault(entity.id, []).append(
+                    entity
+                )
+
+        for entity_type, entities_by_id in entities_by_type.items():
+            entity_ids = list(entities_by_id)
+            for start in range(0, len(entity_ids), chunk_size):
+                sg_entities = _find_field_paths(
+                    self._sg, entity_type, entity_ids[start : start + chunk_size], fields
+                )
+                for sg_entity in sg_entities:
+                    for entity in entities_by_id[sg_entity["id"]]:
+                        entity._cache_values(sg_entity, explicit_fields=fields)
+
+        return [entity.get(fields, raw_values=raw_values) for entity in entities]
+
+    def prefetch(
+        self, entities: list[SGEntity], prefetch: dict[str, Any], chunk_size: int = 500
+    ) -> None:
+        """
+        Query the related entities of many entities at once. This needs one query per
+        relationship (and per ``chunk_size`` entities) instead of one query per entity::
+
+            >>> shots = sg_project.shots()
+            >>> sg_site.prefetch(shots, {"tasks": ["sg_status_list"]})
+            >>> for sg_shot in shots:
+            ...     for sg_task in sg_shot.tasks():  # no further query needed
+            ...         print(sg_task["sg_status_list"].get())  # no further query needed
+
+        The relationship methods, like ``tasks()``, accept the same ``prefetch`` argument
+        to prefetch the relationships of the entities that they return::
+
+            >>> sg_project.shots(fields=["code"], prefetch={"tasks": ["content"]})
+
+        The related entities are attached to the given entities and are returned by the
+        relationship methods when they are called without any filter arguments.
+        They are forgotten with :py:meth:`SGEntity.clear_cache` and as soon as pyshotgrid
+        creates or deletes an entity of the related type or changes the field that links it
+        to its parent, like the ``entity`` field of a Task.
+
+        :param entities: The entities to prefetch the relationships for.
+                         They can be of different types.
+        :param prefetch: Maps the names of the relationships (``shots``, ``assets``,
+                         ``tasks``, ``versions`` or ``publishes``) to the fields to load for
+                         the related entities. To prefetch the relationships of the related
+                         entities as well, use a dict with the ``fields`` and ``prefetch``
+                         keys instead of the fields, like
+                         ``{"tasks": {"fields": ["content"], "prefetch": {"versions": []}}}``.
+        :param chunk_size: The maximum number of entities to query with a single request.
+        :raises ValueError: When a relationship can not be prefetched for the entities.
+        """
+        _prefetch_related(self._sg, entities, prefetch, chunk_size)
+
+    def close(self) -> None:
+        """
+        Stop the worker threads that :py:meth:`parallel`, :py:meth:`download` and
+        :py:meth:`upload` share for this site and forget the openers of :py:meth:`download`.
+        Calls that did not start yet are cancelled. The site can still be used afterward.
+        The threads are started again when they are needed.
+        """
+        _site_state(self._sg).close()
+
+    def parallel(
+        self,
+        calls: list[Union[Callable[..., Any], tuple[Any, ...]]],
+        max_workers: int = 8,
+        timeout: Optional[float] = None,
+    ) -> list[Any]:
+        """
+        Run independent queries at the same time in a pool of threads::
+
+            >>> results = sg_site.parallel(
+            ...     [sg_shot.tasks for sg_shot in sg_shots]
+            ...     + [(sg_site.find, "Asset", [["code", "contains", "Car"]])]
+            ...     + [functools.partial(sg_shot.versions, latest=True) for sg_shot in sg_shots]
+            ... )
+
+        Every thread talks to ShotGrid through its own connection, because Shotgun instances
+        are not thread safe. Methods of pyshotgrid objects of this site are run on the
+        connection of the thread and all pyshotgrid objects in the results are returned
+        for the connection of this site. All calls of a site share the same threads,
+        see :py:meth:`close`.
+
+        :param calls: The calls to run. A call is either a callable without arguments
+                      (like a bound method or a :py:func:`functools.partial`) or a tuple
+                      of a callable and its positional arguments.
+        :param max_workers: The maximum number of calls that run at the same time.
+        :param timeout: The maximum number of seconds that each call may run.
+        :return: The results of the calls in the same order as the calls.
+        :raises:
+            :concurrent.futures.TimeoutError: When a call takes longer than ``timeout``.
+                The calls that did not start yet are cancelled.
+            :Exception: The first exception that is raised by any of the calls.
+        """
+        pool = _site_state(self._sg).worker_pool()
+        started: list[Optional[float]] = [None] * len(calls)
+        start_events = [threading.Event() for _ in calls]
+
+        def run(index: int, call: Any) -> Any:
+            started[index] = time.monotonic()
+            start_events[index].set()
+            func, args = (call[0], call[1:]) if isinstance(call, tuple) else (call, ())
+            return _bind_call(func, pool.connection(timeout))(*args)
+
+        futures = pool.submit_all(
+            [(run, (index, call)) for index, call in enumerate(calls)], max_workers
+        )
+
+        results = []
+        try:
+            for index, future in enumerate(futures):
+                if timeout is None:
+                    result = future.result()
+                else:
+                    start_events[index].wait()
+                    start = started[index]
+                    remaining = 0.0 if start is None else start + timeout - time.monotonic()
+                    result = future.result(timeout=max(remaining, 0.0))
+                results.append(_rebind_value(result, self._sg))
+        finally:
+            for future in futures:
+                future.cancel()
+        return results
+
+    def download(
+        self,
+        downloads: list[tuple["Field", str]],
+        max_workers: int = 8,
+        create_folders: bool = True,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+    ) -> list[str]:
+        """
+        Download the files of many fields at the same time::
+
+            >>> sg_site.download(
+            ...     [(sg_version.thumbnail, "/path/to/contact_sheet") for sg_version in sg_versions]
+            ... )
+
+        The values of the fields are queried with as few queries as possible before the files
+        are downloaded in a pool of threads. Files of "image" fields are streamed to disk
+        through one opener for this site. Files that already exist with the right size are
+        not downloaded again and interrupted downloads are resumed.
+
+        :param downloads: Pairs of the field to download from and the path to download to.
+                          See :py:meth:`Field.download` for the meaning of the path.
+        :param max_workers: The maximum number of files that are downloaded at the same time.
+        :param create_folders: Create any folders from the paths that do not exist.
+        :param chunk_size: The number of bytes that are written to disk at a time.
+        :return: The full paths of the downloaded files in the same order as the downloads.
+        :raises:
+            :RuntimeError: When a field is not a "url" or "image" field.
+            :RuntimeError: When nothing was uploaded to a field.
+            :RuntimeError: The first error of any of the downloads.
+        """
+        state = _site_state(self._sg)
+        entities_by_fields: dict[tuple[str, tuple[str, ...]], list[SGEntity]] = {}
+        for field, _ in downloads:
+            fields = [field.name]
+            if field.data_type == "image":
+                # The name of the entity is part of the file name when only a folder is given.
+                fields += state.schema_cache.name_fields(field.entity.type)
+            key = (field.entity.type, tuple(fields))
+            entities_by_fields.setdefault(key, []).append(field.entity)
+        for (_, field_names), entities in entities_by_fields.items():
+            self.load_fields(entities, list(field_names), raw_values=True)
+
+        targets = [field._download_target(path, create_folders) for field, path in downloads]
+        # The openers are built here, because building them might talk to ShotGrid.
+        openers = [
+            state.url_opener(pay_load) if field_type == "image" else None
+            for field_type, pay_load, _, _ in targets
+        ]
+        pool = state.worker_pool()
+        timeout = self._sg.config.timeout_secs
+
+        def run(
+            opener: Optional[urllib.request.OpenerDirector],
+            pay_load: Any,
+            location: str,
+            use_url_extension: bool,
+        ) -> str:
+            if opener is None:
+                pool.connection().download_attachment(attachment=pay_load, file_path=location)
+                return location
+            return _stream_url(
+                opener,
+                pay_load,
+                location,
+                use_url_extension=use_url_extension,
+                chunk_size=chunk_size,
+                timeout=timeout,
+                renew_session=state.renew_session_cookie,
+            )
+
+        futures = pool.submit_all(
+            [
+                (run, (opener, pay_load, location, use_url_extension))
+                for opener, (_, pay_load, location, use_url_extension) in zip(openers, targets)
+            ],
+            max_workers,
+        )
+        try:
+            return [future.result() for future in futures]
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def upload(
+        self,
+        uploads: list[tuple[Any, ...]],
+        max_workers: int = 4,
+        retries: int = 3,
+        backoff: float = 1.0,
+        progress: Optional[Callable[[dict[str, Any]], None]] = None,
+    ) -> list[SGEntity]:
+        """
+        Upload many files at the same time::
+
+            >>> sg_site.upload(
+            ...     [(sg_version, "sg_uploaded_movie", path) for sg_version, path in movies]
+            ...     + [(sg_version, "image", path) for sg_version, path in thumbnails],
+            ...     progress=lambda status: print(status["done"], "/", status["total"]),
+            ... )
+
+        The files are uploaded in a pool of threads where every thread talks to ShotGrid
+        through its own connection. An upload that failed because of the connection
+        (for example a timeout or a dropped connection) is tried again after ``backoff``
+        seconds, which are doubled with every further attempt. Other errors, like errors
+        of the ShotGrid server, are raised right away. The cached values of the uploaded
+        fields are forgotten.
+
+        :param uploads: The uploads as tuples of the entity, the name of the field and the path
+                        of the file to upload. An optional fourth item is the display name.
+        :param max_workers: The maximum number of files that are uploaded at the same time.
+        :param retries: How often an upload that failed because of the connection is
+                        tried again.
+        :param backoff: The number of seconds to wait before the first retry.
+        :param progress: A function that is called after every finished upload with a dict:
+
+                         - index: The index of the upload.
+                         - attachment: The Attachment entity that was created.
+                         - attempts: The number of attempts that the upload needed.
+                         - bytes: The size of the uploaded file.
+                         - seconds: The number of seconds that the upload took.
+                         - done: The number of finished uploads.
+                         - total: The number of uploads.
+                         - bytes_per_second: The throughput of all uploads so far.
+
+                         It is called from the thread that called this method.
+        :return: The Attachment entities that were created in the same order as the uploads.
+        :raises:
+            :ValueError: When a file does not exist.
+            :Exception: The error of the first upload that still fails after all retries.
+                The uploads that did not start yet are cancelled.
+        """
+        for upload in uploads:
+            if not os.path.isfile(upload[2]):
+                raise ValueError(f'Cannot upload "{upload[2]}", because the file does not exist.')
+
+        pool = _site_state(self._sg).worker_pool()
+
+        def run(entity: SGEntity, field: str, path: str, display_name: Optional[str] = None) -> Any:
+            attempt = 1
+            while True:
+                start = time.monotonic()
+                try:
+                    sg_attachment_id = pool.connection().upload(
+                        entity_type=entity.type,
+                        entity_id=entity.id,
+                        path=path,
+                        field_name=field,
+                        display_name=display_name,
+                    )
+                    return sg_attachment_id, attempt, time.monotonic() - start
+                except _TRANSPORT_ERRORS:
+                    if attempt > retries:
+                        raise
+                    time.sleep(backoff * 2 ** (attempt - 1))
+                    attempt += 1
+
+        start = time.monotonic()
+        futures = {
+            future: index
+            for index, future in enumerate(
+                pool.submit_all([(run, tuple(upload)) for upload in uploads], max_workers)
+            )
+        }
+        attachments: dict[int, SGEntity] = {}
+        uploaded_bytes = 0
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                index = futures[future]
+                sg_attachment_id, attempts, seconds = future.result()
+                uploads[index][0].clear_cache([uploads[index][1]])
+                attachments[index] = new_entity(self._sg, sg_attachment_id, "Attachment")
+                size = os.path.getsize(uploads[index][2])
+                uploaded_bytes += size
+                if progress is not None:
+                    progress(
+                        {
+                            "index": index,
+                            "attachment": attachments[index],
+                            "attempts": attempts,
+                            "bytes": size,
+                            "seconds": seconds,
+                            "done": done,
+                            "total": len(uploads),
+                            "bytes_per_second": uploaded_bytes
+                            / max(time.monotonic() - start, 1e-9),
+                        }
+                    )
+        finally:
+            for future in futures:
+                future.cancel()
+        return [attachments[index] for index in range(len(uploads))]
+
+    def query_budget(self, max_repeats: int = 10, action: str = "raise") -> "QueryBudget":
+        """
+        Detect code that sends the same query over and over again, like a loop that
+        calls :py:meth:`Field.get` for one entity after another::
+
+            >>> with sg_site.query_budget(max_repeats=5):
+            ...     run_my_tool()
+
+        When a query shape (the API method, the entity type, the structure of the filters
+        and the fields) runs more than ``max_repeats`` times within the block, the lines
+        that sent it are reported together with a bulk alternative.
+        All calls to the ShotGrid API from all threads are counted, not only those of
+        this site. This works with mockgun as well, so query budgets can be enforced in tests.
+
+        :param max_repeats: How often the same query shape may run.
+        :param action: Either "raise" to raise a RuntimeError or "warn" to issue a warning
+                       when the budget is exceeded.
+        :return: A :py:class:`pyshotgrid.instrumentation.QueryBudget` to use as context manager.
+        """
+        from .instrumentation import QueryBudget
+
+        return QueryBudget(max_repeats=max_repeats, action=action)
+
     def entity_field_schemas(self) -> dict[str, dict[str, "FieldSchema"]]:
         """
         :return: The field schemas for all entities of the current ShotGrid Site.
         """
         result = {}
-        for entity, field_schemas in self._sg.schema_read().items():
+        for entity, field_schemas in self.schema_cache.site_schema().items():
             result[entity] = {
                 field_name: FieldSchema(self._sg, entity, field_name)
                 for field_name in field_schemas.keys()
@@ -715,10 +1664,12 @@ class SGSite:
                            or the "name" field.
         :return: The found SG project or None.
         """
-        sg_projects = self.projects(names_or_ids=[name_or_id], include_archived=True)
-        if sg_projects:
-            return sg_projects[0]
-        return None
+        # Launchers look up their project all the time, so the projects of the site are
+        # kept in an index that is updated with the projects that changed since.
+        sg_project = _site_state(self._sg).project_index.lookup(name_or_id)
+        if sg_project is None:
+            return None
+        return convert_result_to_pysg(self._sg, sg_project)
 
     def projects(
         self,
@@ -734,29 +1685,29 @@ class SGSite:
         :param template_projects: Whether to return template projects or not.
         :return: A list of SG projects.
         """
+        sg_filter: list[Any] = [["is_template", "is", template_projects]]
+        if names_or_ids is not None:
+            ids = [name_or_id for name_or_id in names_or_ids if isinstance(name_or_id, int)]
+            names = [name_or_id for name_or_id in names_or_ids if isinstance(name_or_id, str)]
+            names_or_ids_filters: list[Any] = []
+            if ids:
+                names_or_ids_filters.append(["id", "in", ids])
+            if names:
+                names_or_ids_filters.append(["tank_name", "in", names])
+                names_or_ids_filters.append(["name", "in", names])
+            if not names_or_ids_filters:
+                # An empty "any" filter would match all projects.
+                return []
+            sg_filter.append({"filter_operator": "any", "filters": names_or_ids_filters})
+
         sg_projects = self._sg.find(
             "Project",
-            [["is_template", "is", template_projects]],
+            sg_filter,
             ["tank_name", "name"],
             include_archived_projects=include_archived,
         )
 
-        if names_or_ids is not None:
-            if isinstance(names_or_ids[0], int):
-                sg_projects = [
-                    sg_project for sg_project in sg_projects if sg_project["id"] in names_or_ids
-                ]
-            else:
-                sg_projects = [
-                    sg_project
-                    for sg_project in sg_projects
-                    if (
-                        sg_project["tank_name"] in names_or_ids
-                        or sg_project["name"] in names_or_ids
-                    )
-                ]
-
-        return [new_entity(self._sg, sg_project) for sg_project in sg_projects]
+        return [convert_result_to_pysg(self._sg, sg_project) for sg_project in sg_projects]
 
     def pipeline_configuration(
         self,
@@ -813,6 +1764,8 @@ class FieldSchema:
     This class represents the schema of a field.
     """
 
+    __slots__ = ("_entity_type", "_name", "_sg")
+
     def __init__(self, sg: shotgun_api3.shotgun.Shotgun, entity_type: str, name: str) -> None:
         """
         :param sg: The current Shotgun instance this instance uses.
@@ -878,7 +1831,7 @@ class FieldSchema:
                       'unique': {'editable': False, 'value': False},
                       'visible': {'editable': True, 'value': True}}
         """
-        return self.sg.schema_field_read(self._entity_type, self._name)[self._name]
+        return _site_state(self._sg).schema_cache.field_schema(self._entity_type, self._name)
 
     def _update_schema(
         self,
@@ -888,15 +1841,18 @@ class FieldSchema:
     ) -> bool:
         """
         Update a property of the field.
+        The cached schema of the entity type is invalidated afterwards.
 
         :return: True when the update succeeded.
         """
-        return self.sg.schema_field_update(
+        result = self.sg.schema_field_update(
             self._entity_type,
             self._name,
             {prop: value},
             project_entity=convert_value_to_dict(project_entity),
         )
+        _site_state(self._sg).schema_cache.invalidate(self._entity_type)
+        return result
 
     @property
     def data_type(self) -> str:
@@ -977,12 +1933,17 @@ class Field(FieldSchema):
     # The naming convention of this class intentionally leaves out the "SG" in front,
     # since there is a ShotGrid entity that is called "Field".
 
+    __slots__ = ("_entity",)
+
     def __init__(self, name: str, entity: SGEntity) -> None:
         """
         :param name: The name of the field.
         :param entity: The entity that this field is attached to.
         """
-        super().__init__(sg=entity.sg, entity_type=entity.type, name=name)
+        # Fields are created very often, so we skip calling FieldSchema.__init__.
+        self._sg = entity.sg
+        self._entity_type = entity.type
+        self._name = name
         self._entity = entity
 
     def __str__(self) -> str:
@@ -1014,37 +1975,26 @@ class Field(FieldSchema):
                  * Link to a URL:
                     Will return the URL.
         """
-        value = self.sg.find_one(
-            entity_type=self._entity.type,
-            filters=[["id", "is", self._entity.id]],
-            fields=[self._name],
-        ).get(self._name)
+        value = self._entity.get([self._name], raw_values=True)[self._name]
 
         if raw_values:
             return value
 
-        if isinstance(value, dict) and "link_type" in value:
-            link_type = value["link_type"]
-            if link_type == "upload":
-                return value
-            elif link_type == "web":
-                return value["url"]
-            else:  # link_type == "local":
-                return value["local_path"]
-        else:
-            return convert_value_to_pysg(self.sg, value)
+        return convert_field_value_to_pysg(self.sg, value)
 
-    def set(self, value: Any) -> None:
+    def refresh(self) -> None:
+        """
+        Query the value of this field again from ShotGrid.
+        """
+        self._entity.refresh([self._name])
+
+    def set(self, value: Any) -> None:
         """
         Set the field to the given value in ShotGrid.
 
         :param value: The value to set the field to.
         """
-        self.sg.update(
-            self._entity.type,
-            self._entity.id,
-            data={self._name: convert_value_to_dict(value)},
-        )
+        self._entity.set({self._name: value})
 
     def add(self, values: list[Any]) -> None:
         """
@@ -1052,12 +2002,7 @@ class Field(FieldSchema):
 
         :param values: The value to add to this field.
         """
-        self.sg.update(
-            self._entity.type,
-            self._entity.id,
-            data={self._name: convert_value_to_dict(values)},
-            multi_entity_update_modes={self._name: "add"},
-        )
+        self._entity.set({self._name: values}, multi_entity_update_modes={self._name: "add"})
 
     def remove(self, values: list[Any]) -> None:
         """
@@ -1065,18 +2010,15 @@ class Field(FieldSchema):
 
         :param values: The values to remove from this field.
         """
-        self.sg.update(
-            self._entity.type,
-            self._entity.id,
-            data={self._name: convert_value_to_dict(values)},
-            multi_entity_update_modes={self._name: "remove"},
-        )
+        self._entity.set({self._name: values}, multi_entity_update_modes={self._name: "remove"})
 
-    # This function was shamelessly stolen from sgtk.util.download_url
-    # This also the reason why we exclude it from test coverage.
     def _download_url(
-        self, url: str, location: str, use_url_extension: bool = False
-    ) -> str:  # pragma: no cover
+        self,
+        url: str,
+        location: str,
+        use_url_extension: bool = False,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+    ) -> str:
         """
         Convenience method that downloads a file from a given url.
         This method will take into account any proxy settings which have
@@ -1102,103 +2044,28 @@ class Field(FieldSchema):
                                        to construct the full path name to the downloaded
                                        contents. The newly constructed full path name
                                        will be returned.
+        :param chunk_size: The number of bytes that are written to disk at a time.
 
         :returns: Full filepath to the downloaded file. This may have been altered from
                   the input ``location`` if ``use_url_extension`` is True and a file extension
                   could be determined from the resolved url.
         :raises: :class:`RuntimeError` on failure.
         """
-        sg = self.sg
-        # We only need to set the auth cookie for downloads from Shotgun server,
-        # input URLs like: https://my-site.shotgunstudio.com/thumbnail/full/Asset/1227
-        if sg.config.server in url:
-            # this method also handles proxy server settings from the shotgun API
-            self._setup_sg_auth_and_proxy()
-        elif sg.config.proxy_handler:
-            # These input URLs have generally already been authenticated and are
-            # in the form: https://sg-media-staging-usor-01.s3.amazonaws.com/9d93f...
-            # %3D&response-content-disposition=filename%3D%22jackpot_icon.png%22.
-            # Grab proxy server settings from the shotgun API
-            opener = urllib.request.build_opener(sg.config.proxy_handler)
-
-            urllib.request.install_opener(opener)
-
-        # inherit the timeout value from the sg API
-        timeout = sg.config.timeout_secs
-
-        # download the given url
-        try:
-            request = urllib.request.Request(url)
-            if timeout and sys.version_info >= (2, 6):
-                # timeout parameter only available in python 2.6+
-                response = urllib.request.urlopen(request, timeout=timeout)
-            else:
-                # use system default
-                response = urllib.request.urlopen(request)
-
-            if use_url_extension:
-                # Make sure the disk location has the same extension as the url path.
-                # Would be nice to see this functionality moved to back into Shotgun
-                # API and removed from here.
-                url_ext = os.path.splitext(urllib.parse.urlparse(response.geturl()).path)[-1]
-                if url_ext:
-                    location = f"{location}{url_ext}"
-
-            f = open(location, "wb")
-            try:
-                f.write(response.read())
-            finally:
-                f.close()
-        except Exception as e:
-            raise RuntimeError(
-                f"Could not download contents of url '{url}'. Error reported: {e}"
-            ) from e
-
-        return location
-
-    # This function was shamelessly stolen from sgtk.util.download_url
-    # This also the reason why we exclude it from test coverage.
-    def _setup_sg_auth_and_proxy(self) -> None:  # pragma: no cover
-        """
-        Borrowed from the Shotgun Python API, setup urllib2 with a cookie for authentication on
-        Shotgun instance.
-
-        Looks up session token and sets that in a cookie in the :mod:`urllib2` handler. This is
-        used internally for downloading attachments from the Shotgun server.
-        """
-        sg = self.sg
-
-        sid = sg.get_session_token()
-        cj = http.cookiejar.LWPCookieJar()
-        c = http.cookiejar.Cookie(
-            0,
-            "_session_id",
-            sid,
-            None,
-            False,
-            sg.config.server,
-            False,
-            False,
-            "/",
-            True,
-            False,
-            None,
-            True,
-            None,
-            None,
-            {},
+        state = _site_state(self.sg)
+        return _stream_url(
+            state.url_opener(url),
+            url,
+            location,
+            use_url_extension=use_url_extension,
+            chunk_size=chunk_size,
+            timeout=self.sg.config.timeout_secs,
+            renew_session=state.renew_session_cookie,
         )
-        cj.set_cookie(c)
-        cookie_handler = urllib.request.HTTPCookieProcessor(cj)
-        if sg.config.proxy_handler:
-            opener = urllib.request.build_opener(sg.config.proxy_handler, cookie_handler)
-        else:
-            opener = urllib.request.build_opener(cookie_handler)
-        urllib.request.install_opener(opener)
 
     def upload(self, path: str, display_name: Optional[str] = None) -> SGEntity:
         """
         Upload a file to this field.
+        To upload many files at once use :py:meth:`SGSite.upload`.
 
         :param path: The path to the file to upload.
         :param display_name: The display name of the file in ShotGrid.
@@ -1211,20 +2078,53 @@ class Field(FieldSchema):
             field_name=self._name,
             display_name=display_name,
         )
+        self._entity.clear_cache([self._name])
         return new_entity(self.sg, sg_attachment_id, "Attachment")
 
-    def download(self, path: str, create_folders: bool = True) -> str:
+    def download(
+        self, path: str, create_folders: bool = True, chunk_size: int = DOWNLOAD_CHUNK_SIZE
+    ) -> str:
         """
         Download a file from a field.
 
+        Files of "image" fields are streamed to disk. A file that already exists with the
+        size of the image is not downloaded again and an interrupted download is resumed.
+        To download many files at once use :py:meth:`SGSite.download`.
+
         :param path: The path to download to. If you only provide a folder a file name will be
                      auto-generated.
         :param create_folders: Create any folders from "path" that do not exist.
+        :param chunk_size: The number of bytes that are written to disk at a time.
         :raises:
             :RuntimeError: When the field is not a "url" or "image" field.
             :RuntimeError: When nothing was uploaded to this field.
         :returns: The full path of the downloaded file.
         """
+        field_type, pay_load, local_file_path, use_url_extension = self._download_target(
+            path, create_folders
+        )
+        if field_type == "url":
+            self.sg.download_attachment(attachment=pay_load, file_path=local_file_path)
+            return local_file_path
+        return self._download_url(
+            pay_load,
+            location=local_file_path,
+            use_url_extension=use_url_extension,
+            chunk_size=chunk_size,
+        )
+
+    def _download_target(self, path: str, create_folders: bool) -> tuple[str, Any, str, bool]:
+        """
+        :param path: The path to download to. If you only provide a folder a file name will be
+                     auto-generated.
+        :param create_folders: Create any folders from "path" that do not exist.
+        :raises:
+            :RuntimeError: When the field is not a "url" or "image" field.
+            :RuntimeError: When nothing was uploaded to this field.
+        :returns: The data type of the field, the raw value of the field, the full path to
+                  download to and whether the file extension of the url should be appended
+                  to that path.
+        """
         field_type = self.data_type
 
         if field_type not in ["url", "image"]:
@@ -1233,9 +2133,7 @@ class Field(FieldSchema):
                 f"Nothing can be downloaded from it."
             )
 
-        pay_load = self.sg.find_one(
-            self._entity.type, [["id", "is", self._entity.id]], [self._name]
-        )[self._name]
+        pay_load = self.get(raw_values=True)
 
         if pay_load is None:
             raise RuntimeError(
@@ -1251,34 +2149,27 @@ class Field(FieldSchema):
             _, ext = os.path.splitext(path)
             if ext:
                 if create_folders and not os.path.exists(os.path.dirname(path)):
-                    os.makedirs(os.path.dirname(path))
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
 
                 local_file_path = path
             else:
                 if create_folders and not os.path.exists(path):
-                    os.makedirs(path)
+                    os.makedirs(path, exist_ok=True)
 
                 local_file_path = os.path.join(path, pay_load["name"])
-
-            self.sg.download_attachment(attachment=pay_load, file_path=local_file_path)
-            downloaded_file_path = local_file_path
         else:  # field_type == "image"
             _, ext = os.path.splitext(path)
             if ext:  # file path with filename and extension
                 if create_folders and not os.path.exists(os.path.dirname(path)):
-                    os.makedirs(os.path.dirname(path))
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
 
                 local_file_path = path
             else:  # only an output folder
                 if create_folders and not os.path.exists(path):
-                    os.makedirs(path)
+                    os.makedirs(path, exist_ok=True)
 
                 local_file_path = os.path.join(path, self._entity.name.get() + "_" + self._name)
-
-            downloaded_file_path = self._download_url(
-                pay_load, location=local_file_path, use_url_extension=not bool(ext)
-            )
-        return downloaded_file_path
+        return field_type, pay_load, local_file_path, not bool(ext)
 
     @property
     def schema(self) -> FieldSchema:
@@ -1302,6 +2193,1780 @@ class Field(FieldSchema):
         }
 
 
+class SchemaCache:
+    """
+    This class caches the schema of a ShotGrid site.
+
+    Every schema is read from ShotGrid only once per entity type and is then shared by all
+    :py:class:`FieldSchema`, :py:class:`Field`, :py:class:`SGEntity` and :py:class:`SGSite`
+    instances that use the same Shotgun instance. You usually do not create instances of
+    this class yourself, but access it via :py:attr:`SGSite.schema_cache`::
+
+        >>> sg_site = new_site(sg)
+        >>> sg_site.schema_cache.ttl = 3600  # re-read the schema after one hour
+        >>> sg_site.schema_cache.invalidate("Shot")  # forget everything about the Shot schema
+    """
+
+    def __init__(self, sg: shotgun_api3.shotgun.Shotgun, ttl: Optional[float] = None) -> None:
+        """
+        :param sg: A fully initialized instance of shotgun_api3.Shotgun.
+        :param ttl: The time in seconds after which a cached schema is read again from
+                    ShotGrid. None means that cached schemas never expire.
+        """
+        self._sg = sg
+        self._ttl = ttl
+        self._lock = threading.RLock()
+        # Maps (entity_type, project_id) to (timestamp, {field_name: field_schema}).
+        self._field_schemas: dict[tuple[str, Optional[int]], tuple[float, dict[str, Any]]] = {}
+        self._entity_schemas: Optional[tuple[float, dict[str, Any]]] = None
+        self._site_schema_time: Optional[float] = None
+        self._refresh_error: Optional[Exception] = None
+        # Worker threads of the site read schemas through their own connection.
+        self._local = threading.local()
+
+    @property
+    def sg(self) -> shotgun_api3.shotgun.Shotgun:
+        """
+        :return: The Shotgun instance that the schema is read from.
+        """
+        return self._sg
+
+    @property
+    def ttl(self) -> Optional[float]:
+        """
+        :return: The time in seconds after which a cached schema is read again from ShotGrid.
+                 None means that cached schemas never expire.
+        """
+        return self._ttl
+
+    @ttl.setter
+    def ttl(self, value: Optional[float]) -> None:
+        self._ttl = value
+
+    @property
+    def refresh_error(self) -> Optional[Exception]:
+        """
+        :return: The error of the last :py:meth:`refresh_in_background` call or None
+                 when it succeeded (or did not run yet).
+        """
+        return self._refresh_error
+
+    def _connection(self) -> shotgun_api3.shotgun.Shotgun:
+        """
+        :return: The connection to read schemas with in the current thread.
+        """
+        return getattr(self._local, "sg", None) or self._sg
+
+    def _use_connection(self, sg: shotgun_api3.shotgun.Shotgun) -> None:
+        """
+        Read schemas through the given connection in the current thread,
+        because Shotgun instances are not thread safe.
+
+        :param sg: A connection to the same site.
+        """
+        self._local.sg = sg
+
+    def _is_valid(self, timestamp: float) -> bool:
+        """
+        :param timestamp: The time when a cache entry was stored.
+        :return: Whether a cache entry that was stored at the given time can still be used.
+        """
+        return self._ttl is None or time.monotonic() - timestamp < self._ttl
+
+    def field_schemas(
+        self,
+        entity_type: str,
+        project_entity: Optional[Union[dict[str, Any], "SGEntity"]] = None,
+    ) -> dict[str, dict[str, Any]]:
+        """
+        :param entity_type: The entity type to get the field schemas for.
+        :param project_entity: A project entity to get the project specific schema for.
+        :return: The schemas of all fields of the given entity type as returned by
+                 :py:meth:`Shotgun.schema_field_read
+                 <shotgun_api3:shotgun_api3.shotgun.Shotgun.schema_field_read>`.
+        """
+        project_dict = (
+            project_entity.to_dict() if isinstance(project_entity, SGEntity) else project_entity
+        )
+        key = (entity_type, project_dict["id"] if project_dict else None)
+        with self._lock:
+            cached = self._field_schemas.get(key)
+            if cached is not None and self._is_valid(cached[0]):
+                return cached[1]
+
+            if project_dict:
+                schemas = self._connection().schema_field_read(
+                    entity_type, project_entity=project_dict
+                )
+            else:
+                schemas = self._connection().schema_field_read(entity_type)
+            self._field_schemas[key] = (time.monotonic(), schemas)
+            return schemas
+
+    def field_schema(self, entity_type: str, field_name: str) -> dict[str, Any]:
+        """
+        :param entity_type: The entity type that the field belongs to.
+        :param field_name: The name of the field.
+        :return: The schema of a single field.
+        :raises:
+            :KeyError: When the entity type has no field with the given name.
+        """
+        return self.field_schemas(entity_type)[field_name]
+
+    def name_fields(self, entity_type: str) -> list[str]:
+        """
+        :param entity_type: The entity type to get the name fields for.
+        :return: The fields that can hold the name of an entity of the given type.
+                 These are the "name" and the "code" field (in this order), if the
+                 entity type has them.
+        """
+        field_schemas = self.field_schemas(entity_type)
+        return [field for field in ("name", "code") if field in field_schemas]
+
+    def entity_schemas(self) -> dict[str, dict[str, Any]]:
+        """
+        :return: The schemas of all entity types as returned by
+                 :py:meth:`Shotgun.schema_entity_read
+                 <shotgun_api3:shotgun_api3.shotgun.Shotgun.schema_entity_read>`.
+        """
+        with self._lock:
+            if self._entity_schemas is None or not self._is_valid(self._entity_schemas[0]):
+                self._entity_schemas = (time.monotonic(), self._connection().schema_entity_read())
+            return self._entity_schemas[1]
+
+    def site_schema(self) -> dict[str, dict[str, dict[str, Any]]]:
+        """
+        :return: The field schemas of all entity types as returned by
+                 :py:meth:`Shotgun.schema_read
+                 <shotgun_api3:shotgun_api3.shotgun.Shotgun.schema_read>`.
+        """
+        with self._lock:
+            if self._site_schema_time is None or not self._is_valid(self._site_schema_time):
+                now = time.monotonic()
+                for entity_type, schemas in self._connection().schema_read().items():
+                    self._field_schemas[(entity_type, None)] = (now, schemas)
+                self._site_schema_time = now
+
+            return {
+                entity_type: schemas
+                for (entity_type, project_id), (_, schemas) in self._field_schemas.items()
+                if project_id is None
+            }
+
+    def invalidate(self, entity_type: Optional[str] = None) -> None:
+        """
+        Forget cached schemas, so they are read again from ShotGrid on the next access.
+
+        :param entity_type: The entity type to forget the schema for.
+                            If this is None the whole cache is cleared.
+        """
+        with self._lock:
+            self._site_schema_time = None
+            if entity_type is None:
+                self._field_schemas.clear()
+                self._entity_schemas = None
+            else:
+                for key in [key for key in self._field_schemas if key[0] == entity_type]:
+                    del self._field_schemas[key]
+
+    def _server_version(self) -> Optional[list[int]]:
+        """
+        :return: The full version of the ShotGrid server. This is a cheap check to detect
+                 whether a schema snapshot might be outdated.
+        """
+        server_info = getattr(self._sg, "server_info", None) or {}
+        return server_info.get("full_version")
+
+    @staticmethod
+    def _signature(site_schema: dict[str, Any]) -> dict[str, int]:
+        """
+        :param site_schema: The field schemas of all entity types.
+        :return: A cheap signature of the site schema: the number of fields per entity type.
+        """
+        return {entity_type: len(schemas) for entity_type, schemas in site_schema.items()}
+
+    def _fill(self, site_schema: dict[str, Any], entity_schemas: dict[str, Any]) -> None:
+        """
+        Replace the whole content of the cache.
+
+        :param site_schema: The field schemas of all entity types.
+        :param entity_schemas: The schemas of all entity types.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._field_schemas = {
+                (entity_type, None): (now, schemas) for entity_type, schemas in site_schema.items()
+            }
+            self._entity_schemas = (now, entity_schemas)
+            self._site_schema_time = now
+
+    def save(self, path: str) -> None:
+        """
+        Write a snapshot of the whole site schema to a JSON file.
+        The schema is read from ShotGrid first, if it is not cached yet.
+
+        :param path: The file path to write the snapshot to.
+        """
+        site_schema = self.site_schema()
+        snapshot = {
+            "base_url": self._sg.base_url,
+            "server_version": self._server_version(),
+            "signature": self._signature(site_schema),
+            "entity_schemas": self.entity_schemas(),
+            "site_schema": site_schema,
+        }
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder, exist_ok=True)
+        # Write to a temporary file first, so concurrent processes never read half
+        # written snapshots.
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f, default=str)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> bool:
+        """
+        Fill the cache from a snapshot that was written with :py:meth:`save`.
+        The snapshot is only used when it belongs to the same site, the ShotGrid
+        server version did not change since it was written and the site still has the
+        same entity types. The entity schemas are read again from ShotGrid for this check.
+
+        :param path: The file path of the snapshot.
+        :return: Whether the snapshot was loaded.
+        """
+        try:
+            with open(path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if (
+            snapshot.get("base_url") != self._sg.base_url
+            or snapshot.get("server_version") != self._server_version()
+            or snapshot.get("signature") != self._signature(snapshot.get("site_schema", {}))
+        ):
+            return False
+
+        entity_schemas = self._connection().schema_entity_read()
+        if sorted(entity_schemas) != sorted(snapshot["signature"]):
+            return False
+
+        self._fill(snapshot["site_schema"], entity_schemas)
+        return True
+
+    def refresh(self, path: Optional[str] = None) -> None:
+        """
+        Read the whole site schema again from ShotGrid and replace the cached schemas with it.
+        The schema is read with a separate connection, so this can safely run in a
+        background thread.
+
+        :param path: Optional file path to write a fresh snapshot to.
+        """
+        sg = _clone_connection(self._sg)
+        self._fill(sg.schema_read(), sg.schema_entity_read())
+        if path is not None:
+            self.save(path)
+
+    def refresh_in_background(self, path: Optional[str] = None) -> threading.Thread:
+        """
+        Run :py:meth:`refresh` in a background thread.
+        Errors of the refresh are logged and stored in :py:attr:`refresh_error`.
+        The cached schemas stay untouched in this case.
+
+        :param path: Optional file path to write a fresh snapshot to.
+        :return: The (already started) thread that refreshes the schema.
+        """
+
+        def run() -> None:
+            try:
+                self.refresh(path)
+            except Exception as e:
+                _LOGGER.exception("Refreshing the schema of %s failed.", self._sg.base_url)
+                self._refresh_error = e
+            else:
+                self._refresh_error = None
+
+        thread = threading.Thread(target=run, name="pysg-schema-refresh", daemon=True)
+        thread.start()
+        return thread
+
+
+class WriteBuffer:
+    """
+    Queues create, update and delete calls of pysg objects and sends them to ShotGrid
+    in batches. Use :py:meth:`SGSite.batch` to create one.
+    """
+
+    def __init__(self, sg: shotgun_api3.shotgun.Shotgun, chunk_size: int = 100) -> None:
+        """
+        :param sg: A fully initialized instance of shotgun_api3.Shotgun.
+        :param chunk_size: The maximum number of requests per batch call.
+        """
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size needs to be at least 1. Got {chunk_size}.")
+        self._sg = sg
+        self._chunk_size = chunk_size
+        self._requests: list[dict[str, Any]] = []
+        # Maps (entity type, entity id) to the index of the last request for that entity.
+        self._last_requests: dict[tuple[str, int], int] = {}
+        # Maps the python IDs of the created entities to the index of their create request.
+        self._create_requests: dict[int, int] = {}
+        self._temp_id = 0
+        self._owner = False
+
+    def __enter__(self) -> "WriteBuffer":
+        state = _site_state(self._sg)
+        if state.write_buffer is not None:
+            return state.write_buffer
+        state.write_buffer = self
+        self._owner = True
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        if not self._owner:
+            return
+        _site_state(self._sg).write_buffer = None
+        self._owner = False
+        if exc_type is None:
+            self.flush()
+        else:
+            self.clear()
+
+    def __len__(self) -> int:
+        return len(self._requests)
+
+    @property
+    def chunk_size(self) -> int:
+        """
+        :return: The maximum number of requests per batch call.
+        """
+        return self._chunk_size
+
+    def create(self, entity_type: str, data: dict[str, Any]) -> SGEntity:
+        """
+        Queue the creation of a new entity.
+
+        :param entity_type: The type of the entity to create.
+        :param data: dict of fields and values to set on creation.
+                     The values can contain pysg objects.
+        :return: The new entity. It has a temporary negative ID until the queue was sent.
+        """
+        self._temp_id -= 1
+        sg_entity = new_entity(self._sg, self._temp_id, entity_type)
+        self._append({"request_type": "create", "entity": sg_entity, "data": dict(data)})
+        return sg_entity
+
+    def update(
+        self,
+        sg_entity: SGEntity,
+        data: dict[str, Any],
+        multi_entity_update_modes: Optional[dict[str, Any]] = None,
+    ) -> None:
+        """
+        Queue an update of the given entity. Updates that only set fields get merged
+        into the previous request for the same entity.
+
+        :param sg_entity: The entity to update.
+        :param data: The data to update. The values can contain pysg objects.
+        :param multi_entity_update_modes: Optional dict indicating what update mode
+                                          to use when updating a multi-entity link field.
+        """
+        modes = dict(multi_entity_update_modes or {})
+        index = self._last_requests.get((sg_entity.type, sg_entity.id))
+        if index is not None and self._merge(index, data, modes):
+            return
+        self._append(
+            {"request_type": "update", "entity": sg_entity, "data": dict(data), "modes": modes}
+        )
+
+    def delete(self, sg_entity: SGEntity) -> None:
+        """
+        Queue the deletion of the given entity.
+
+        :param sg_entity: The entity to delete.
+        """
+        self._append({"request_type": "delete", "entity": sg_entity})
+
+    def clear(self) -> None:
+        """
+        Discard all queued requests.
+        """
+        self._requests = []
+        self._last_requests = {}
+        self._create_requests = {}
+
+    def flush(self) -> list[Any]:
+        """
+        Send all queued requests to ShotGrid. Entities that were created get their real IDs
+        and the cached field values of all updated entities are updated.
+
+        :return: The results of all requests in the order they were queued.
+        """
+        requests = self._requests
+        self.clear()
+        results: list[Any] = []
+        chunk: list[dict[str, Any]] = []
+        created: set[int] = set()
+        for request in requests:
+            if len(chunk) >= self._chunk_size or created & self._pending_ids(request):
+                results.extend(self._send(chunk))
+                chunk, created = [], set()
+            chunk.append(request)
+            if request["request_type"] == "create":
+                created.add(id(request["entity"]))
+        if chunk:
+            results.extend(self._send(chunk))
+        return results
+
+    def _append(self, request: dict[str, Any]) -> None:
+        """
+        :param request: The request to add to the queue.
+        """
+        sg_entity = request["entity"]
+        self._last_requests[(sg_entity.type, sg_entity.id)] = len(self._requests)
+        if request["request_type"] == "create":
+            self._create_requests[id(sg_entity)] = len(self._requests)
+        self._requests.append(request)
+
+    def _merge(self, index: int, data: dict[str, Any], modes: dict[str, Any]) -> bool:
+        """
+        Merge an update into an already queued request of the same entity.
+        Updates that link to entities which are created after the queued request
+        can not be merged, because these entities do not exist yet when it is sent.
+
+        :param index: The index of the queued request.
+        :param data: The data of the update.
+        :param modes: The multi entity update modes of the update.
+        :return: Whether the update could be merged.
+        """
+        request = self._requests[index]
+        for pending_id in self._pending_ids({"entity": request["entity"], "data": data}):
+            if self._create_requests.get(pending_id, index) > index:
+                return False
+        if request["request_type"] == "create":
+            if modes:
+                return False
+            request["data"].update(data)
+            return True
+        if request["request_type"] != "update":
+            return False
+        for field in data:
+            if field in request["data"] and (
+                modes.get(field, "set") != "set" or request["modes"].get(field, "set") != "set"
+            ):
+                return False
+        request["data"].update(data)
+        request["modes"].update(modes)
+        return True
+
+    @staticmethod
+    def _pending_ids(request: dict[str, Any]) -> set[int]:
+        """
+        :param request: A queued request.
+        :return: The python IDs of all not yet created entities that the request refers to.
+        """
+        values = [request["entity"], *request.get("data", {}).values()]
+        pending = set()
+        while values:
+            value = values.pop()
+            if isinstance(value, SGEntity):
+                if value.id < 0:
+                    pending.add(id(value))
+            elif isinstance(value, (list, tuple)):
+                values.extend(value)
+        return pending
+
+    def _send(self, chunk: list[dict[str, Any]]) -> list[Any]:
+        """
+        Send the given requests to ShotGrid in a single batch call.
+
+        :param chunk: The requests to send.
+        :return: The results of the batch call.
+        """
+        sg_requests = []
+        for request in chunk:
+            sg_request = {
+                "request_type": request["request_type"],
+                "entity_type": request["entity"].type,
+            }
+            if request["request_type"] != "create":
+                sg_request["entity_id"] = request["entity"].id
+            if request["request_type"] != "delete":
+                request["sg_data"] = convert_fields_to_dicts(request["data"])
+                sg_request["data"] = request["sg_data"]
+            if request.get("modes"):
+                sg_request["multi_entity_update_modes"] = request["modes"]
+            sg_requests.append(sg_request)
+
+        results = self._sg.batch(sg_requests)
+        for request, result in zip(chunk, results):
+            sg_entity = request["entity"]
+            if request["request_type"] == "create":
+                identity_map = _site_state(self._sg).identity_map
+                if identity_map is not None:
+                    identity_map.pop((sg_entity.type, sg_entity.id), None)
+                    identity_map[(sg_entity.type, result["id"])] = sg_entity
+                sg_entity._id = result["id"]
+                sg_entity._updated(request["sg_data"])
+            elif request["request_type"] == "update":
+                sg_entity._updated(request["sg_data"], request["modes"])
+            else:
+                _outdate_prefetched(self._sg, sg_entity.type)
+        return results
+
+
+class _ProjectIndex:
+    """
+    Looks up the projects of a site by ID, "tank_name" or "name". All projects are queried
+    once and afterward only the projects that were updated since the last query.
+    Deleted projects do not show up as updated, so the IDs of all projects are
+    queried as well every :py:attr:`MAX_AGE` seconds to forget them.
+    """
+
+    #: The time in seconds after which found projects are checked for updates again.
+    MAX_AGE = 60.0
+
+    def __init__(self, sg: shotgun_api3.shotgun.Shotgun) -> None:
+        """
+        :param sg: A fully initialized instance of shotgun_api3.Shotgun.
+        """
+        self._sg = sg
+        self._lock = threading.Lock()
+        self._projects: dict[int, dict[str, Any]] = {}
+        # Maps the "tank_name" and "name" of the projects to their IDs.
+        self._ids: dict[str, int] = {}
+        self._last_update: Optional[Any] = None
+        self._update_time: Optional[float] = None
+
+    def lookup(self, name_or_id: Union[str, int]) -> Optional[dict[str, Any]]:
+        """
+        :param name_or_id: The ID, "tank_name" or "name" of a project.
+        :return: The project (that is not a template project) or None.
+        """
+        with self._lock:
+            updated = False
+            if self._update_time is None or time.monotonic() - self._update_time > self.MAX_AGE:
+                self._update(forget_deleted=True)
+                updated = True
+            sg_project = self._find(name_or_id)
+            if sg_project is None and not updated:
+                # The project might have been created since the last update.
+                self._update()
+                sg_project = self._find(name_or_id)
+            return sg_project
+
+    def _find(self, name_or_id: Union[str, int]) -> Optional[dict[str, Any]]:
+        """
+        :param name_or_id: The ID, "tank_name" or "name" of a project.
+        :return: The indexed project or None.
+        """
+        if isinstance(name_or_id, str):
+            sg_project = self._projects.get(self._ids.get(name_or_id, 0))
+        else:
+            sg_project = self._projects.get(name_or_id)
+        if sg_project is None or sg_project["is_template"]:
+            return None
+        return sg_project
+
+    def _update(self, forget_deleted: bool = False) -> None:
+        """
+        Query the projects that were updated since the last update.
+        When the update times are not known, all projects are queried.
+
+        :param forget_deleted: Whether to query the IDs of all projects as well
+                               to forget the projects that were deleted.
+        """
+        fields = ["tank_name", "name", "is_template", "updated_at"]
+        deleted_ids: set[int] = set()
+        if self._last_update is None:
+            sg_projects = self._sg.find("Project", [], fields)
+            self._projects = {}
+        else:
+            # Update times only have a precision of seconds, so we query
+            # the last second again to not miss any updates.
+            since = self._last_update - datetime.timedelta(seconds=1)
+            sg_projects = self._sg.find("Project", [["updated_at", "greater_than", since]], fields)
+            if forget_deleted:
+                deleted_ids = self._projects.keys() - {
+                    sg_project["id"] for sg_project in self._sg.find("Project", [], ["id"])
+                }
+        self._update_time = time.monotonic()
+        if not sg_projects and not deleted_ids:
+            return
+
+        for project_id in deleted_ids:
+            del self._projects[project_id]
+
+        for sg_project in sg_projects:
+            self._projects[sg_project["id"]] = sg_project
+        update_times = [sg_project["updated_at"] for sg_project in self._projects.values()]
+        self._last_update = None if None in update_times else max(update_times, default=None)
+        self._ids = {}
+        for project_id in sorted(self._projects):
+            sg_project = self._projects[project_id]
+            if sg_project["is_template"]:
+                continue
+            for field in ("tank_name", "name"):
+                if sg_project[field] is not None:
+                    self._ids.setdefault(sg_project[field], project_id)
+
+
+class _WorkerPool:
+    """
+    A pool of threads where every thread talks to ShotGrid through its own connection.
+    Every site has a single pool. It grows to the largest number of workers that any call
+    asks for, but every call only runs as many functions at the same time as it asks for.
+    """
+
+    def __init__(self, sg: shotgun_api3.shotgun.Shotgun) -> None:
+        """
+        :param sg: The Shotgun instance to clone the connections from.
+        """
+        self._sg = sg
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._max_workers = 0
+        self._local = threading.local()
+
+    @property
+    def max_workers(self) -> int:
+        """
+        :return: The number of threads of the pool.
+        """
+        return self._max_workers
+
+    def connection(self, timeout: Optional[float] = None) -> shotgun_api3.shotgun.Shotgun:
+        """
+        :param timeout: The timeout in seconds for the requests of the connection.
+                        None means the timeout of the Shotgun instance of the site.
+        :return: The connection of the current worker thread.
+        """
+        sg = getattr(self._local, "sg", None)
+        if sg is None:
+            sg = self._local.sg = _clone_connection(self._sg)
+            if sg is not self._sg:
+                # The worker connections share the schema cache of the site, but read
+                # missing schemas through their own connection.
+                schema_cache = _site_state(self._sg).schema_cache
+                _site_state(sg).schema_cache = schema_cache
+                schema_cache._use_connection(sg)
+        if sg is not self._sg:
+            sg.config.timeout_secs = self._sg.config.timeout_secs if timeout is None else timeout
+        return sg
+
+    def submit_all(
+        self, calls: list[tuple[Callable[..., Any], tuple[Any, ...]]], max_workers: int
+    ) -> list["Future[Any]"]:
+        """
+        Run functions in the worker threads, but at most ``max_workers`` of them at the
+        same time. The next function starts when one of the running functions is done.
+
+        :param calls: The functions to run together with their arguments.
+        :param max_workers: The maximum number of functions that run at the same time.
+        :return: The futures of the results of the functions in the same order as the calls.
+        """
+        if max_workers < 1:
+            raise ValueError(f"max_workers needs to be at least 1. Got {max_workers}.")
+        with self._lock:
+            if self._executor is None or max_workers > self._max_workers:
+                if self._executor is not None:
+                    # The threads of the old executor finish their work and stop.
+                    self._executor.shutdown(wait=False)
+                self._max_workers = max(max_workers, self._max_workers)
+                self._executor = ThreadPoolExecutor(
+                    self._max_workers, thread_name_prefix="pysg-worker"
+                )
+
+        futures: list[Future[Any]] = [Future() for _ in calls]
+        indices = iter(range(len(calls)))
+        indices_lock = threading.Lock()
+
+        def run(index: int) -> None:
+            future = futures[index]
+            try:
+                if future.set_running_or_notify_cancel():
+                    func, args = calls[index]
+                    try:
+                        result = func(*args)
+                    except BaseException as e:
+                        future.set_exception(e)
+                    else:
+                        future.set_result(result)
+            finally:
+                start_next()
+
+        def start_next() -> None:
+            with indices_lock:
+                index = next(indices, None)
+            if index is None:
+                return
+            with self._lock:
+                executor = self._executor
+            try:
+                if executor is None:
+                    raise RuntimeError("The worker pool of the site was shut down.")
+                executor.submit(run, index)
+            except RuntimeError as e:
+                for future in futures[index:]:
+                    if future.set_running_or_notify_cancel():
+                        future.set_exception(e)
+
+        for _ in range(min(max_workers, len(calls))):
+            start_next()
+        return futures
+
+    def shutdown(self) -> None:
+        """
+        Stop the threads of the pool once they finished their current work.
+        Functions that did not start yet are cancelled.
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._max_workers = 0
+
+
+def _bind_call(func: Callable[..., Any], sg: shotgun_api3.shotgun.Shotgun) -> Callable[..., Any]:
+    """
+    :param func: A callable. Methods of pyshotgrid objects can be wrapped in functools.partial.
+    :param sg: The Shotgun instance to run the callable with.
+    :return: The callable for the given Shotgun instance.
+    """
+    if isinstance(func, functools.partial):
+        return functools.partial(_bind_call(func.func, sg), *func.args, **func.keywords)
+    owner = getattr(func, "__self__", None)
+    if isinstance(owner, (SGEntity, SGSite, Field)) and owner.sg is not sg:
+        return getattr(_rebind_value(owner, sg), func.__name__)
+    return func
+
+
+def _iter_pages(
+    sg: shotgun_api3.shotgun.Shotgun,
+    entity_type: str,
+    filters: list[Any],
+    fields: Optional[list[str]] = None,
+    order: Optional[list[dict[str, str]]] = None,
+    filter_operator: Optional[str] = None,
+    limit: int = 0,
+    retired_only: bool = False,
+    include_archived_projects: bool = True,
+    additional_filter_presets: Optional[str] = None,
+    page_size: int = 500,
+    prefetch: bool = False,
+) -> Iterator[list[dict[str, Any]]]:
+    """
+    Query the entity dicts page by page. See :py:meth:`SGSite.iter_find` for the parameters.
+
+    :return: An iterator over the pages of entity dicts.
+    """
+    if page_size < 1:
+        raise ValueError(f"page_size needs to be at least 1. Got {page_size}.")
+    # shotgun_api3 ignores larger limits for paged queries and returns pages of this size.
+    page_size = min(page_size, _records_per_page(sg))
+    order = list(order or [])
+    if not any(order_entry.get("field_name") == "id" for order_entry in order):
+        order.append({"field_name": "id", "direction": "asc"})
+    filters = convert_filters_to_dict(filters)
+
+    def find_page(sg: shotgun_api3.shotgun.Shotgun, page: int) -> list[dict[str, Any]]:
+        return sg.find(
+            entity_type=entity_type,
+            filters=filters,
+            fields=fields,
+            order=order,
+            filter_operator=filter_operator,
+            limit=page_size,
+            retired_only=retired_only,
+            page=page,
+            include_archived_projects=include_archived_projects,
+            additional_filter_presets=additional_filter_presets,
+        )
+
+    executor = None
+    if prefetch:
+        # Shotgun instances are not thread safe, so the background thread
+        # does all the queries with its own connection.
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pysg-iter-find")
+        prefetch_sg = _clone_connection(sg)
+        next_page = executor.submit(find_page, prefetch_sg, 1)
+    count = 0
+    page = 1
+    try:
+        while True:
+            if executor is not None:
+                sg_entities = next_page.result()
+            else:
+                sg_entities = find_page(sg, page)
+            is_last_page = len(sg_entities) < page_size or (
+                limit and count + len(sg_entities) >= limit
+            )
+            if executor is not None and not is_last_page:
+                next_page = executor.submit(find_page, prefetch_sg, page + 1)
+            if limit:
+                sg_entities = sg_entities[: limit - count]
+            count += len(sg_entities)
+            if sg_entities:
+                yield sg_entities
+            if is_last_page:
+                return
+            page += 1
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _records_per_page(sg: shotgun_api3.shotgun.Shotgun) -> int:
+    """
+    :param sg: A fully initialized instance of shotgun_api3.Shotgun.
+    :return: The maximum number of entities that the server returns per page.
+    """
+    try:
+        return sg.config.records_per_page
+    except AttributeError:
+        # mockgun has no server info to read it from.
+        return 500
+
+
+def _rebind_value(value: Any, sg: shotgun_api3.shotgun.Shotgun) -> Any:
+    """
+    :param value: Any value that may contain pyshotgrid objects.
+    :param sg: The Shotgun instance that the pyshotgrid objects should use.
+    :return: The value where all pyshotgrid objects use the given Shotgun instance.
+             Cached field values are kept.
+    """
+    if isinstance(value, SGEntity):
+        if value.sg is sg:
+            return value
+        sg_entity = new_entity(sg, value.id, value.type)
+        if value._field_values:
+            if sg_entity._field_values is None:
+                sg_entity._field_values = {}
+            sg_entity._field_values.update(value._field_values)
+        if value._related:
+            if sg_entity._related is None:
+                sg_entity._related = {}
+            for relationship, (timestamp, entities) in value._related.items():
+                sg_entity._related[relationship] = (timestamp, _rebind_value(entities, sg))
+        return sg_entity
+    if isinstance(value, Field):
+        return _rebind_value(value.entity, sg)[value.name]
+    if isinstance(value, SGSite):
+        return value if value.sg is sg else new_site(sg)
+    if isinstance(value, list):
+        return [_rebind_value(item, sg) for item in value]
+    if isinstance(value, tuple):
+        return tuple(_rebind_value(item, sg) for item in value)
+    if isinstance(value, dict):
+        return {key: _rebind_value(item, sg) for key, item in value.items()}
+    return value
+
+
+def _stream_url(
+    opener: urllib.request.OpenerDirector,
+    url: str,
+    location: str,
+    use_url_extension: bool = False,
+    chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+    timeout: Optional[float] = None,
+    renew_session: Optional[Callable[[str], bool]] = None,
+) -> str:
+    """
+    Stream the content of a url to a file.
+
+    The content is written to ``<location>.part`` in chunks of ``chunk_size`` bytes and
+    renamed to ``location`` once it is complete. The rest of a ``.part`` file that was left
+    by an interrupted download is requested with a range request. A file that already
+    exists with the size that the server reports is not downloaded again.
+
+    :param opener: The opener to open the url with.
+    :param url: The url to download.
+    :param location: The path on disk where the content should be written.
+    :param use_url_extension: Append the file extension of the resolved url to ``location``.
+    :param chunk_size: The number of bytes that are written to disk at a time.
+    :param timeout: The timeout in seconds for the request.
+    :param renew_session: A function that renews the session cookie of the opener for
+                          the given url. It returns whether a rejected request can be
+                          tried again. See :py:func:`_open_url`.
+    :returns: The path of the downloaded file.
+    :raises: :class:`RuntimeError` on failure.
+    """
+    try:
+        offset = 0 if use_url_extension else _file_size(f"{location}.part") or 0
+        response = _open_url(opener, url, offset, timeout, renew_session)
+        try:
+            if use_url_extension:
+                # The extension is only known from the resolved url,
+                # so a partial file is resumed with a second request.
+                url_ext = os.path.splitext(urllib.parse.urlparse(response.geturl()).path)[-1]
+                if url_ext:
+                    location = f"{location}{url_ext}"
+                offset = _file_size(f"{location}.part") or 0
+                if offset and response.headers.get("Accept-Ranges") == "bytes":
+                    response.close()
+                    response = _open_url(opener, response.geturl(), offset, timeout, renew_session)
+
+            # A server that ignores the range request sends the whole content again.
+            content_range = re.match(
+                r"bytes (\d+)-\d+/(\d+|\*)", response.headers.get("Content-Range") or ""
+            )
+            if response.status == 206 and content_range and int(content_range[1]) == offset:
+                total = None if content_range[2] == "*" else int(content_range[2])
+            else:
+                offset = 0
+                content_length = response.headers.get("Content-Length")
+                total = None if content_length is None else int(content_length)
+
+            if total is not None and _file_size(location) == total:
+                return location
+
+            part_location = f"{location}.part"
+            with open(part_location, "ab" if offset else "wb") as f:
+                while True:
+                    chunk = response.read(chunk_size)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+        finally:
+            response.close()
+
+        if total is not None and _file_size(part_location) != total:
+            raise RuntimeError(
+                f"Received {_file_size(part_location)} of {total} bytes. "
+                f'The partial download is kept in "{part_location}".'
+            )
+        os.replace(part_location, location)
+    except Exception as e:
+        raise RuntimeError(
+            f"Could not download contents of url '{url}'. Error reported: {e}"
+        ) from e
+
+    return location
+
+
+def _open_url(
+    opener: urllib.request.OpenerDirector,
+    url: str,
+    offset: int,
+    timeout: Optional[float],
+    renew_session: Optional[Callable[[str], bool]] = None,
+) -> Any:
+    """
+    :param opener: The opener to open the url with.
+    :param url: The url to open.
+    :param offset: The byte from where on the content is requested.
+    :param timeout: The timeout in seconds for the request.
+    :param renew_session: A function that renews the session cookie of the opener when the
+                          server rejects the request (HTTP 401 or 403), for example because
+                          the session expired. It returns whether the request can be tried
+                          again. The request is tried again only once.
+    :return: The response.
+    """
+    request = urllib.request.Request(url)
+    if offset:
+        request.add_header("Range", f"bytes={offset}-")
+    try:
+        if timeout:
+            return opener.open(request, timeout=timeout)
+        return opener.open(request)
+    except urllib.error.HTTPError as e:
+        # The partial file is already complete (or larger than the file on the server).
+        if e.code == 416 and offset:
+            e.close()
+            return _open_url(opener, url, 0, timeout, renew_session)
+        if e.code in (401, 403) and renew_session is not None and renew_session(url):
+            e.close()
+            return _open_url(opener, url, offset, timeout)
+        raise
+
+
+def _file_size(path: str) -> Optional[int]:
+    """
+    :param path: The path of a file.
+    :return: The size of the file in bytes or None when the file does not exist.
+    """
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+
+def schema_snapshot_path(directory: str, base_url: str) -> str:
+    """
+    :param directory: The directory where schema snapshots are stored.
+    :param base_url: The URL of the ShotGrid site.
+    :return: The path of the schema snapshot for the given site.
+    """
+    return os.path.join(directory, re.sub(r"[^\w.-]+", "_", base_url).strip("_") + ".json")
+
+
+def _clone_connection(sg: shotgun_api3.shotgun.Shotgun) -> shotgun_api3.shotgun.Shotgun:
+    """
+    Create a new Shotgun instance that connects with the same settings as the given one.
+    Shotgun instances are not thread safe, so every thread should talk to ShotGrid through
+    its own connection.
+
+    .. Note::
+
+        Mockgun instances keep their whole database in memory and
+        :py:class:`PooledShotgun` instances are thread safe, so they are returned as is.
+
+    :param sg: A fully initialized instance of shotgun_api3.Shotgun.
+    :return: A new Shotgun instance.
+    """
+    if isinstance(sg, (PooledShotgun, *__MOCKGUN_CLASSES)):
+        return sg
+
+    config = sg.config
+    if config.script_name is not None:
+        auth = {"script_name": config.script_name, "api_key": config.api_key}
+    elif config.user_login is not None and config.user_password is not None:
+        auth = {"login": config.user_login, "password": config.user_password}
+    else:
+        auth = {"session_token": config.session_token or sg.get_session_token()}
+
+    clone = sg.__class__(
+        sg.base_url,
+        convert_datetimes_to_utc=config.convert_datetimes_to_utc,
+        http_proxy=config.raw_http_proxy,
+        connect=False,
+        ca_certs=getattr(sg, "_Shotgun__ca_certs", None),
+        sudo_as_login=config.sudo_as_login,
+        **auth,
+    )
+    clone.config.timeout_secs = config.timeout_secs
+    clone.config.max_rpc_attempts = config.max_rpc_attempts
+    clone.config.rpc_attempt_interval = config.rpc_attempt_interval
+    return clone
+
+
+class PooledShotgun:
+    """
+    Behaves like a Shotgun instance, but spreads the calls over a pool of connections,
+    so it can be shared by many threads. Every call borrows an idle connection from the
+    pool and gives it back afterward. A new connection is only opened when all others are
+    busy and the pool is not full yet. Otherwise the call waits for the next idle one.
+
+    Use :py:func:`new_site` with the ``pool_size`` argument to create a site that uses a pool.
+    """
+
+    def __init__(
+        self,
+        sg: shotgun_api3.shotgun.Shotgun,
+        pool_size: int,
+        wait_timeout: Optional[float] = None,
+    ) -> None:
+        """
+        :param sg: The first connection of the pool. The other connections are cloned from it.
+        :param pool_size: The maximum number of connections.
+        :param wait_timeout: The maximum number of seconds that a call waits for a connection.
+                             None means no limit.
+        """
+        if pool_size < 1:
+            raise ValueError(f"pool_size needs to be at least 1. Got {pool_size}.")
+        self._sg = sg
+        self._pool_size = pool_size
+        self._wait_timeout = wait_timeout
+        self._idle: "queue.LifoQueue[shotgun_api3.shotgun.Shotgun]" = queue.LifoQueue()
+        self._idle.put(sg)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = 1
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._max_wait_time = 0.0
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._sg, name)
+        if name.startswith("_") or not callable(attribute):
+            return attribute
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            with self.connection() as sg:
+                return getattr(sg, name)(*args, **kwargs)
+
+        call.__name__ = name
+        call.__doc__ = attribute.__doc__
+        return call
+
+    @contextlib.contextmanager
+    def connection(self) -> Iterator[shotgun_api3.shotgun.Shotgun]:
+        """
+        Borrow a connection from the pool. Nested calls in the same thread
+        get the connection that the thread already borrowed::
+
+            >>> with pooled_sg.connection() as sg:
+            ...     sg.find("Shot", [])
+
+        :return: A context manager that gives the connection back to the pool on exit.
+        :raises:
+            :RuntimeError: When no connection got idle within the wait timeout.
+        """
+        sg = getattr(self._local, "sg", None)
+        if sg is not None:
+            yield sg
+            return
+
+        sg = self._acquire()
+        self._local.sg = sg
+        try:
+            yield sg
+        finally:
+            self._local.sg = None
+            self._idle.put(sg)
+
+    @property
+    def pool_size(self) -> int:
+        """
+        :return: The maximum number of connections.
+        """
+        return self._pool_size
+
+    @property
+    def metrics(self) -> dict[str, Any]:
+        """
+        :return: Usage statistics of the pool:
+
+                 - pool_size: The maximum number of connections.
+                 - connections: The number of connections that were opened so far.
+                 - idle: The number of connections that are not used right now.
+                 - checkouts: How often a connection was borrowed.
+                 - reuses: How often an already open connection was borrowed.
+                 - waits: How often a call had to wait for a connection.
+                 - wait_time: The total number of seconds that calls waited for a connection.
+                 - max_wait_time: The longest number of seconds that a call waited.
+        """
+        with self._lock:
+            return {
+                "pool_size": self._pool_size,
+                "connections": self._connections,
+                "idle": self._idle.qsize(),
+                "checkouts": self._checkouts,
+                "reuses": self._checkouts - self._connections + 1,
+                "waits": self._waits,
+                "wait_time": self._wait_time,
+                "max_wait_time": self._max_wait_time,
+            }
+
+    def _acquire(self) -> shotgun_api3.shotgun.Shotgun:
+        """
+        :return: An idle connection from the pool or a new connection if the pool is not full.
+        """
+        with self._lock:
+            self._checkouts += 1
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            create = self._connections < self._pool_size
+            if create:
+                self._connections += 1
+        if create:
+            try:
+                return _clone_connection(self._sg)
+            except Exception:
+                with self._lock:
+                    self._connections -= 1
+                raise
+
+        start = time.monotonic()
+        try:
+            sg = self._idle.get(timeout=self._wait_timeout)
+        except queue.Empty:
+            raise RuntimeError(
+                f"No idle ShotGrid connection after {self._wait_timeout} seconds. "
+                f"All {self._pool_size} connections of the pool are busy."
+            ) from None
+        finally:
+            wait_time = time.monotonic() - start
+            with self._lock:
+                self._waits += 1
+                self._wait_time += wait_time
+                self._max_wait_time = max(self._max_wait_time, wait_time)
+        return sg
+
+
+class _LRUCache:
+    """
+    A thread safe mapping that only keeps the most recently used items.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        """
+        :param max_size: The maximum number of items to keep.
+        """
+        self.max_size = max_size
+        self._items: OrderedDict[Any, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._items
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """
+        :param key: The key of the item.
+        :param default: The value to return when there is no item for the key.
+        :return: The item of the key or the default value.
+        """
+        with self._lock:
+            if key not in self._items:
+                return default
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def pop(self, key: Any, default: Any = None) -> Any:
+        """
+        :param key: The key of the item to remove.
+        :param default: The value to return when there is no item for the key.
+        :return: The removed item or the default value.
+        """
+        with self._lock:
+            return self._items.pop(key, default)
+
+    def clear(self) -> None:
+        """
+        Remove all items.
+        """
+        with self._lock:
+            self._items.clear()
+
+
+class _SiteState:
+    """
+    Holds all the data that is shared between the pysg objects of a single Shotgun instance.
+    """
+
+    #: The maximum number of publishes whose publish chains are cached.
+    PUBLISH_CHAINS_SIZE = 10000
+
+    def __init__(self, sg: shotgun_api3.shotgun.Shotgun) -> None:
+        """
+        :param sg: A fully initialized instance of shotgun_api3.Shotgun.
+        """
+        self.schema_cache = SchemaCache(sg)
+        self.value_cache_ttl: Optional[float] = None
+        self.project_index = _ProjectIndex(sg)
+        self._sg = sg
+        self._worker_pool: Optional[_WorkerPool] = None
+        self._worker_pool_lock = threading.Lock()
+        # Maps PublishedFile IDs to the publish chain they belong to.
+        self.publish_chains = _LRUCache(self.PUBLISH_CHAINS_SIZE)
+        # Maps entity types to the time when pyshotgrid last created or deleted an entity
+        # of the type or changed its link fields. Older prefetched relationships are outdated.
+        self.related_changes: dict[str, float] = {}
+        # Maps (entity type, entity ID) to the pysg object of the entity, if enabled.
+        self.identity_map: Optional[weakref.WeakValueDictionary[tuple[str, int], SGEntity]] = None
+        self._local = threading.local()
+        # Maps whether the opener sends the session cookie to the opener.
+        self._url_openers: dict[bool, urllib.request.OpenerDirector] = {}
+        self._url_openers_lock = threading.Lock()
+        # The cookie jar of the opener that authenticates with the session token.
+        self._session_cookie_jar: Optional[http.cookiejar.CookieJar] = None
+
+    def worker_pool(self) -> "_WorkerPool":
+        """
+        :return: The pool of worker threads of this site.
+        """
+        with self._worker_pool_lock:
+            if self._worker_pool is None:
+                self._worker_pool = _WorkerPool(self._sg)
+            return self._worker_pool
+
+    def close(self) -> None:
+        """
+        Stop the worker threads and forget the URL openers of this site.
+        """
+        with self._worker_pool_lock:
+            if self._worker_pool is not None:
+                self._worker_pool.shutdown()
+        with self._url_openers_lock:
+            self._url_openers.clear()
+            self._session_cookie_jar = None
+
+    def url_opener(self, url: str) -> urllib.request.OpenerDirector:
+        """
+        The openers are built once per site and never installed globally,
+        so they can be used from many threads at the same time. Use
+        :py:meth:`renew_session_cookie` when the server rejects the session cookie.
+
+        :param url: The url to open.
+        :return: The opener for the given url. It uses the proxy settings of the Shotgun
+                 instance and authenticates urls of the ShotGrid server with the session
+                 token of the Shotgun instance.
+        """
+        config = self._sg.config
+        authenticate = bool(config.server) and config.server in url
+        with self._url_openers_lock:
+            opener = self._url_openers.get(authenticate)
+            if opener is None:
+                handlers: list[urllib.request.BaseHandler] = []
+                if config.proxy_handler:
+                    handlers.append(config.proxy_handler)
+                if authenticate:
+                    self._session_cookie_jar = http.cookiejar.LWPCookieJar()
+                    self._session_cookie_jar.set_cookie(
+                        self._session_cookie(self._sg.get_session_token())
+                    )
+                    handlers.append(urllib.request.HTTPCookieProcessor(self._session_cookie_jar))
+                opener = self._url_openers[authenticate] = urllib.request.build_opener(*handlers)
+            return opener
+
+    def renew_session_cookie(self, url: str) -> bool:
+        """
+        Replace the session cookie of the url openers with a new session, after the
+        ShotGrid server rejected a request for the given url (for example because the
+        session expired). The new session is requested with a new connection,
+        because this usually runs in a worker thread.
+
+        :param url: The url of the rejected request.
+        :return: Whether the cookie was replaced, so the request can be tried again.
+                 Sessions can only be renewed for urls of the ShotGrid server and for
+                 Shotgun instances that log in with a script or a user.
+        """
+        config = self._sg.config
+        if not config.server or config.server not in url:
+            return False
+        if config.script_name is None and config.user_login is None:
+            return False
+        with self._url_openers_lock:
+            if self._session_cookie_jar is None:
+                return False
+            sg = _clone_connection(self._sg)
+            sg.config.session_token = None
+            self._session_cookie_jar.set_cookie(self._session_cookie(sg.get_session_token()))
+            return True
+
+    def _session_cookie(self, session_token: str) -> http.cookiejar.Cookie:
+        """
+        :param session_token: A session token of the ShotGrid server.
+        :return: The session cookie for the ShotGrid server.
+        """
+        return http.cookiejar.Cookie(
+            version=0,
+            name="_session_id",
+            value=session_token,
+            port=None,
+            port_specified=False,
+            domain=self._sg.config.server,
+            domain_specified=False,
+            domain_initial_dot=False,
+            path="/",
+            path_specified=True,
+            secure=False,
+            expires=None,
+            discard=True,
+            comment=None,
+            comment_url=None,
+            rest={},
+        )
+
+    @property
+    def write_buffer(self) -> Optional["WriteBuffer"]:
+        """
+        :return: The write buffer that is active in the current thread or None.
+        """
+        return getattr(self._local, "write_buffer", None)
+
+    @write_buffer.setter
+    def write_buffer(self, value: Optional["WriteBuffer"]) -> None:
+        self._local.write_buffer = value
+
+
+#: The attribute of the Shotgun instances that holds their shared state.
+#: The state references the Shotgun instance itself, so it can not be kept in a
+#: weak mapping without keeping the Shotgun instance alive forever.
+__SITE_STATE_ATTRIBUTE = "_pysg_site_state"
+__SITE_STATES_LOCK = threading.Lock()
+
+
+def _site_state(sg: shotgun_api3.shotgun.Shotgun) -> _SiteState:
+    """
+    :param sg: A fully initialized instance of shotgun_api3.Shotgun.
+    :return: The state that is shared by all pysg objects that use the given Shotgun instance.
+    """
+    state: Optional[_SiteState] = vars(sg).get(__SITE_STATE_ATTRIBUTE)
+    if state is None:
+        with __SITE_STATES_LOCK:
+            state = vars(sg).get(__SITE_STATE_ATTRIBUTE)
+            if state is None:
+                state = _SiteState(sg)
+                setattr(sg, __SITE_STATE_ATTRIBUTE, state)
+    return state
+
+
+#: The minimum average number of publishes per name at which the latest publishes
+#: are queried one name at a time instead of all at once.
+LATEST_PUBLISHES_MIN_PER_NAME = 20
+
+#: The order of publishes with the same name from the oldest to the latest one.
+__LATEST_PUBLISH_ORDER = [
+    {"field_name": "created_at", "direction": "asc"},
+    {"field_name": "version_number", "direction": "asc"},
+    {"field_name": "id", "direction": "asc"},
+]
+
+
+def _sort_versions(sg_versions: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    :param sg_versions: Version dicts with the "entity" and "created_at" fields.
+    :return: The Versions sorted by date (newest first) and then by the ID of their entity.
+    """
+    sg_versions.sort(key=lambda version: (version["entity"] or {}).get("id", 10000000000))
+    sg_versions.sort(key=lambda version: version["created_at"], reverse=True)
+    return sg_versions
+
+
+def _is_link_to(value: Any, sg_entity: SGEntity) -> bool:
+    """
+    :param value: An entity dict, a pysg entity or None.
+    :param sg_entity: A pysg entity.
+    :return: Whether the value links to the given entity.
+    """
+    if isinstance(value, SGEntity):
+        return value.type == sg_entity.type and value.id == sg_entity.id
+    if isinstance(value, dict):
+        return value.get("type") == sg_entity.type and value.get("id") == sg_entity.id
+    return False
+
+
+#: The relationships that can be prefetched with their related entity type, the field
+#: that links the related entities to an entity of the given type ("*" for any other
+#: type, None when the relationship can not be prefetched) and the fields that are
+#: always queried for the related entities.
+_RELATIONSHIPS: dict[str, tuple[str, dict[str, Optional[str]], tuple[str, ...]]] = {
+    "shots": ("Shot", {"Project": "project"}, ("code",)),
+    "assets": ("Asset", {"Project": "project"}, ("code",)),
+    "tasks": ("Task", {"HumanUser": None, "*": "entity"}, ("content",)),
+    "versions": (
+        "Version",
+        {"Project": "project", "Task": "sg_task", "HumanUser": "user", "*": "entity"},
+        ("entity", "created_at"),
+    ),
+    "publishes": (
+        "PublishedFile",
+        {"Project": "project", "Task": "task", "HumanUser": "created_by", "*": "entity"},
+        ("name", "version_number", "created_at"),
+    ),
+}
+
+
+#: The fields of the related entity types that link them to the entities of the relationships.
+_LINK_FIELDS: dict[str, frozenset[str]] = {
+    related_type: frozenset(field for field in link_fields.values() if field)
+    for related_type, link_fields, _ in _RELATIONSHIPS.values()
+}
+
+#: The fields of publishes that decide which publish chain they belong to
+#: and where they are in the chain.
+_PUBLISH_CHAIN_FIELDS = frozenset(
+    {"entity", "published_file_type", "name", "version_number", "created_at"}
+)
+
+
+def _outdate_prefetched(
+    sg: shotgun_api3.shotgun.Shotgun, entity_type: str, fields: Optional[Iterable[str]] = None
+) -> None:
+    """
+    Outdate the prefetched relationships to entities of the given type,
+    when an entity of the type was created, deleted or linked to another entity.
+    The cached publish chains are forgotten, when a publish was created, deleted
+    or moved to another chain.
+
+    :param sg: A fully initialized instance of shotgun_api3.Shotgun.
+    :param entity_type: The type of the entity that was written.
+    :param fields: The fields that were written or None when the entity was deleted.
+    """
+    fields = None if fields is None else set(fields)
+    link_fields = _LINK_FIELDS.get(entity_type)
+    if link_fields and (fields is None or not link_fields.isdisjoint(fields)):
+        _site_state(sg).related_changes[entity_type] = time.monotonic()
+    if entity_type == "PublishedFile" and (
+        fields is None or not _PUBLISH_CHAIN_FIELDS.isdisjoint(fields)
+    ):
+        _site_state(sg).publish_chains.clear()
+
+
+def _prefetch_related(
+    sg: shotgun_api3.shotgun.Shotgun,
+    entities: list[SGEntity],
+    prefetch: dict[str, Any],
+    chunk_size: int = 500,
+) -> None:
+    """
+    Query the related entities of many entities with one query per relationship
+    (and per ``chunk_size`` entities) and attach them to the entities.
+
+    :param sg: A fully initialized instance of shotgun_api3.Shotgun.
+    :param entities: The entities to prefetch the relationships for.
+    :param prefetch: The relationships to prefetch. See :py:meth:`SGSite.prefetch`.
+    :param chunk_size: The maximum number of entities to query with a single request.
+    """
+    for relationship, spec in prefetch.items():
+        if relationship not in _RELATIONSHIPS:
+            raise ValueError(
+                f'Cannot prefetch "{relationship}". '
+                f"Supported relationships are: {', '.join(_RELATIONSHIPS)}"
+            )
+        if isinstance(spec, dict):
+            fields = spec.get("fields") or []
+            nested_prefetch = spec.get("prefetch")
+        elif isinstance(spec, (list, tuple)):
+            fields = list(spec)
+            nested_prefetch = None
+        else:
+            raise TypeError(
+                f'The prefetch spec of "{relationship}" needs to be a list of fields or a dict '
+                'with the "fields" and "prefetch" keys.'
+            )
+        related_type, link_fields, default_fields = _RELATIONSHIPS[relationship]
+        query_fields = list(dict.fromkeys([*default_fields, *fields]))
+
+        entities_by_link: dict[str, dict[tuple[str, int], list[SGEntity]]] = {}
+        for entity in entities:
+            link_field = link_fields.get(entity.type, link_fields.get("*"))
+            if link_field is None or not callable(getattr(entity, relationship, None)):
+                raise ValueError(f'Cannot prefetch "{relationship}" for {entity.type} entities.')
+            entities_by_link.setdefault(link_field, {}).setdefault(
+                (entity.type, entity.id), []
+            ).append(entity)
+
+        related_entities = []
+        for link_field, entities_by_key in entities_by_link.items():
+            keys = list(entities_by_key)
+            sg_related_by_key: dict[tuple[str, int], list[dict[str, Any]]] = {
+                key: [] for key in keys
+            }
+            for start in range(0, len(keys), chunk_size):
+                links = [
+                    {"type": entity_type, "id": entity_id}
+                    for entity_type, entity_id in keys[start : start + chunk_size]
+                ]
+                for sg_related in sg.find(
+                    related_type, [[link_field, "in", links]], [*query_fields, link_field]
+                ):
+                    link = sg_related[link_field]
+                    sg_related_by_key[(link["type"], link["id"])].append(sg_related)
+
+            for key, sg_related_entities in sg_related_by_key.items():
+                if relationship == "versions":
+                    _sort_versions(sg_related_entities)
+                related = [
+                    convert_result_to_pysg(sg, sg_related, fields)
+                    for sg_related in sg_related_entities
+                ]
+                related_entities.extend(related)
+                for entity in entities_by_key[key]:
+                    entity._cache_related(relationship, related)
+
+        if nested_prefetch:
+            _prefetch_related(sg, related_entities, nested_prefetch, chunk_size)
+
+
+def _find_latest_publishes(
+    sg: shotgun_api3.shotgun.Shotgun, filters: list[Any], fields: Optional[list[str]] = None
+) -> list[dict[str, Any]]:
+    """
+    Find the latest publishes with the same logic as the tk-multi-loader2 app:
+
+    - group all publishes with the same "name" field together
+    - from these get the newest publish ("created_at" field)
+    - if there are publishes with the same "name" and "created_at" the one with the
+      highest "version_number" wins.
+
+    When there are many publishes per name, the latest publish of every name is
+    queried on its own so that the older publishes are not transferred at all.
+    The number of publishes per name is only estimated (with a single summarize request)
+    when the publishes do not fit on the first page of the query.
+
+    :param sg: A fully initialized instance of shotgun_api3.Shotgun.
+    :param filters: The filters for the publishes.
+    :param fields: More fields to query for the publishes.
+    :return: The latest publishes sorted by name.
+    """
+    fields = list(dict.fromkeys(["name", "version_number", "created_at", *(fields or [])]))
+    page_size = _records_per_page(sg)
+    pages = _iter_pages(
+        sg, "PublishedFile", filters, fields, order=__LATEST_PUBLISH_ORDER, page_size=page_size
+    )
+    latest_publishes = {}
+    names = None
+    for page, sg_publishes in enumerate(pages):
+        if page == 0 and len(sg_publishes) >= page_size:
+            names = _publish_names_to_query_one_by_one(sg, filters)
+            if names is not None:
+                break
+        for sg_publish in sg_publishes:
+            latest_publishes[sg_publish["name"]] = sg_publish
+
+    if names is not None:
+        latest_order = [
+            {"field_name": order["field_name"], "direction": "desc"}
+            for order in __LATEST_PUBLISH_ORDER
+        ]
+        result = []
+        for name in names:
+            sg_publish = sg.find_one(
+                "PublishedFile", [*filters, ["name", "is", name]], fields, order=latest_order
+            )
+            if sg_publish is not None:
+                result.append(sg_publish)
+    else:
+        result = list(latest_publishes.values())
+
+    # Sort one more time by name.
+    result.sort(key=lambda pub: pub["name"])
+    return result
+
+
+def _publish_names_to_query_one_by_one(
+    sg: shotgun_api3.shotgun.Shotgun, filters: list[Any]
+) -> Optional[list[Optional[str]]]:
+    """
+    :param sg: A fully initialized instance of shotgun_api3.Shotgun.
+    :param filters: The filters for the publishes.
+    :return: The names of all publishes that match the given filters, if there are so many
+             publishes per name that querying the latest publish of each name on its
+             own transfers less data. None otherwise.
+    """
+    if not hasattr(sg, "summarize"):
+        return None
+    summary = sg.summarize(
+        "PublishedFile",
+        filters,
+        [{"field": "id", "type": "count"}],
+        grouping=[{"field": "name", "type": "exact", "direction": "asc"}],
+    )
+    total = summary["summaries"]["id"]
+    names = [group["group_value"] for group in summary["groups"]]
+    if total <= _records_per_page(sg) or total < len(names) * LATEST_PUBLISHES_MIN_PER_NAME:
+        return None
+    return names
+
+
+def _split_field_paths(
+    sg: shotgun_api3.shotgun.Shotgun, entity_type: str, fields: list[str]
+) -> tuple[list[str], dict[str, tuple[str, str, str]]]:
+    """
+    ShotGrid resolves dotted field paths like ``entity.Shot.sg_sequence.Sequence.code``
+    on the server, but only as long as every linked field holds a single entity.
+    This splits the paths that go through a multi-entity field at that field.
+
+    :param sg: A fully initialized instance of shotgun_api3.Shotgun.
+    :param entity_type: The entity type that the fields belong to.
+    :param fields: The fields and dotted field paths.
+    :return: The fields to query from the server and for every path that goes through
+             a multi-entity field: the path up to that field, the linked entity type and
+             the rest of the path.
+    """
+    if not any("." in field for field in fields):
+        return fields, {}
+
+    schema_cache = _site_state(sg).schema_cache
+    query_fields: dict[str, None] = {}
+    multi_entity_paths = {}
+    for field in fields:
+        parts = field.split(".")
+        current_type = entity_type
+        for index in range(0, len(parts) - 2, 2):
+            field_schema = schema_cache.field_schemas(current_type).get(parts[index], {})
+            if field_schema.get("data_type", {}).get("value") == "multi_entity":
+                prefix = ".".join(parts[: index + 1])
+                multi_entity_paths[field] = (prefix, parts[index + 1], ".".join(parts[index + 2 :]))
+                query_fields[prefix] = None
+                break
+            current_type = parts[index + 1]
+        else:
+            query_fields[field] = None
+    return list(query_fields), multi_entity_paths
+
+
+def _resolve_multi_entity_paths(
+    sg: shotgun_api3.shotgun.Shotgun,
+    sg_entities: list[dict[str, Any]],
+    multi_entity_paths: dict[str, tuple[str, str, str]],
+    chunk_size: int = 500,
+) -> None:
+    """
+    Query the rest of the paths that go through multi-entity fields with one query per
+    linked entity type (and per ``chunk_size`` linked entities) for all given entities.
+    The values are added to the entity dicts, both under the full path (as a list with
+    one value per linked entity) and to the links of the multi-entity field, so the
+    pysg objects of the linked entities have them cached.
+
+    :param sg: A fully initialized instance of shotgun_api3.Shotgun.
+    :param sg_entities: The entity dicts with the values of the multi-entity fields.
+    :param multi_entity_paths: The paths as returned by :py:func:`_split_field_paths`.
+    :param chunk_size: The maximum number of entities to query with a single request.
+    """
+    rests_by_link: dict[tuple[str, str], list[str]] = {}
+    for prefix, linked_type, rest in multi_entity_paths.values():
+        rests_by_link.setdefault((prefix, linked_type), []).append(rest)
+
+    for (prefix, linked_type), rests in rests_by_link.items():
+        linked_ids = list(
+            dict.fromkeys(
+                link["id"]
+                for sg_entity in sg_entities
+                for link in sg_entity.get(prefix) or []
+                if link["type"] == linked_type
+            )
+        )
+        linked_values = {
+            sg_linked["id"]: sg_linked
+            for start in range(0, len(linked_ids), chunk_size)
+            for sg_linked in _find_field_paths(
+                sg, linked_type, linked_ids[start : start + chunk_size], rests
+            )
+        }
+        for sg_entity in sg_entities:
+            links = [
+                {**link, **linked_values.get(link["id"], {})}
+                if link["type"] == linked_type
+                else link
+                for link in sg_entity.get(prefix) or []
+            ]
+            sg_entity[prefix] = links
+            for path, (path_prefix, path_type, rest) in multi_entity_paths.items():
+                if (path_prefix, path_type) == (prefix, linked_type):
+                    sg_entity[path] = [
+                        link.get(rest) for link in links if link["type"] == linked_type
+                    ]
+
+
+def _find_field_paths(
+    sg: shotgun_api3.shotgun.Shotgun, entity_type: str, entity_ids: list[int], fields: list[str]
+) -> list[dict[str, Any]]:
+    """
+    :param sg: A fully initialized instance of shotgun_api3.Shotgun.
+    :param entity_type: The type of the entities.
+    :param entity_ids: The IDs of the entities.
+    :param fields: The fields and dotted field paths to query.
+    :return: The entity dicts with the values of the fields.
+    """
+    query_fields, multi_entity_paths = _split_field_paths(sg, entity_type, fields)
+    sg_entities = sg.find(entity_type, [["id", "in", entity_ids]], query_fields)
+    if multi_entity_paths:
+        _resolve_multi_entity_paths(sg, sg_entities, multi_entity_paths)
+    return sg_entities
+
+
+#: Marks values that are not cached.
+_MISSING = object()
+
 #: Entity plugins that are registered to pyshotgrid.
 __ENTITY_PLUGINS: dict[str, Type[SGEntity]] = {}
 #: The class that represents the ShotGrid site.
@@ -1350,13 +4015,27 @@ def new_entity(sg: shotgun_api3.shotgun.Shotgun, *args: Any, **kwargs: Any) -> S
             entity_id = kwargs["entity_id"]
 
     if entity_type is not None and entity_id is not None:
-        if entity_type in __ENTITY_PLUGINS:
-            return __ENTITY_PLUGINS[entity_type](sg, entity_id, entity_type)
-        return SGEntity(sg, entity_id, entity_type)
+        entity_class = __ENTITY_PLUGINS.get(entity_type, SGEntity)
+        identity_map = _site_state(sg).identity_map
+        if identity_map is None:
+            return entity_class(sg, entity_id, entity_type)
+        with __SITE_STATES_LOCK:
+            sg_entity = identity_map.get((entity_type, entity_id))
+            if sg_entity is None or sg_entity.__class__ is not entity_class:
+                sg_entity = entity_class(sg, entity_id, entity_type)
+                identity_map[(entity_type, entity_id)] = sg_entity
+            return sg_entity
     raise ValueError("Entity type and ID could not be extracted from the given values.")
 
 
-def new_site(*args: Any, **kwargs: Any) -> SGSite:
+def new_site(
+    *args: Any,
+    schema_cache_dir: Optional[str] = None,
+    schema_cache_max_age: float = 3600.0,
+    pool_size: Optional[int] = None,
+    pool_wait_timeout: Optional[float] = None,
+    **kwargs: Any,
+) -> SGSite:
     """
     This function will create a new :py:class:`pyshotgrid.SGSite <pyshotgrid.sg_site.SGSite>`
     instance that represents a ShotGrid site.
@@ -1372,6 +4051,28 @@ def new_site(*args: Any, **kwargs: Any) -> SGSite:
         ...                    script_name='Some User',
         ...                    api_key='$ome_password')
 
+    Short-lived processes can skip reading the site schema from ShotGrid by keeping a
+    schema snapshot on disk::
+
+        >>> sg_site = new_site(sg, schema_cache_dir='/tmp/pysg_schemas')
+
+    The snapshot is loaded right away when it matches the site. It is refreshed in a
+    background thread when it is missing, outdated or older than ``schema_cache_max_age``.
+
+    Sites that are shared by many threads should use a pool of connections, because
+    Shotgun instances are not thread safe. All entities of the site use the pool as well::
+
+        >>> sg_site = new_site(sg, pool_size=8)
+        >>> sg_site.sg.metrics["wait_time"]
+        0.0
+
+    :param schema_cache_dir: A directory to store schema snapshots in.
+                             No snapshot is used when this is None.
+    :param schema_cache_max_age: The age in seconds after which a schema snapshot is refreshed.
+    :param pool_size: The maximum number of connections of a :py:class:`PooledShotgun`
+                      that the site uses. No pool is used when this is None.
+    :param pool_wait_timeout: The maximum number of seconds that a call waits for a
+                              connection of the pool. None means no limit.
     :return: A new instance of the pyshotgrid site.
     """
     if args:
@@ -1384,15 +4085,27 @@ def new_site(*args: Any, **kwargs: Any) -> SGSite:
         #   - tank_vendor.shotgun_api3.Shotgun
         #   - tank_vendor.shotgun_api3.lib.mockgun.Shotgun
         # These are collected during import on top of the file and are now compared against.
-        for sg_class in __SG_CLASSES:
+        for sg_class in (PooledShotgun, *__SG_CLASSES):
             if isinstance(args[0], sg_class):
                 sg = args[0]
                 break
         else:
-            sg = shotgun_api3.Shotgun(*args)
+            sg = shotgun_api3.Shotgun(*args, **kwargs)
     else:
         sg = shotgun_api3.Shotgun(**kwargs)
-    return __SG_SITE_CLASS(sg)
+    if pool_size is not None and not isinstance(sg, PooledShotgun):
+        sg = PooledShotgun(sg, pool_size, wait_timeout=pool_wait_timeout)
+    sg_site = __SG_SITE_CLASS(sg)
+
+    if schema_cache_dir is not None:
+        snapshot_path = schema_snapshot_path(schema_cache_dir, sg.base_url)
+        if (
+            not sg_site.schema_cache.load(snapshot_path)
+            or time.time() - os.path.getmtime(snapshot_path) > schema_cache_max_age
+        ):
+            sg_site.schema_cache.refresh_in_background(snapshot_path)
+
+    return sg_site
 
 
 def register_pysg_class(pysg_class: Type[SGEntity], shotgrid_type: Optional[str] = None) -> None:
@@ -1507,9 +4220,11 @@ def convert_value_to_dict(value: Any) -> Union[dict[str, Any], list[dict[str, An
         return value
 
 
-def convert_filters_to_dict(filters: list[list[Any]]) -> list[list[Any]]:
+def convert_filters_to_dict(filters: list[Any]) -> list[Any]:
     """
     Convert any pysg objects form the given shotgun_api3 filter to simple dictionaries.
+    Filter groups (``{"filter_operator": "any", "filters": [...]}``) are converted as well.
+    The given filters are not modified.
 
     Example::
 
@@ -1519,33 +4234,223 @@ def convert_filters_to_dict(filters: list[list[Any]]) -> list[list[Any]]:
 
     :param filters: The filters to convert
     :return: The filter with all pysg objects converted to dictionaries.
+             Filters without pysg objects are shared with the given filters.
     """
-    for f in filters:
-        if isinstance(f[2], list):
-            tmp = []
-            for entity in f[2]:
-                if isinstance(entity, SGEntity):
-                    tmp.append(entity.to_dict())
-                else:
-                    tmp.append(entity)
-            f[2] = tmp
-        elif isinstance(f[2], SGEntity):
-            f[2] = f[2].to_dict()
+    return [_convert_filter(f) for f in filters]
+
+
+def compile_filters(filters: list[Any]) -> "CompiledFilters":
+    """
+    Convert filters with :py:class:`Param` placeholders once, so that they can be used
+    over and over again with different values::
+
+        >>> publishes_of = compile_filters(
+        ...     [["entity", "is", Param("entity")], ["name", "in", Param("names")]]
+        ... )
+        >>> for sg_shot in sg_shots:
+        ...     sg_site.find("PublishedFile", publishes_of.bind(entity=sg_shot, names=names))
+
+    :param filters: The filters in the format of
+                    :py:meth:`Shotgun.find <shotgun_api3:shotgun_api3.shotgun.Shotgun.find>`.
+                    Any value can be a :py:class:`Param`.
+    :return: The compiled filters.
+    """
+    return CompiledFilters(filters)
+
+
+class Param:
+    """
+    A placeholder for a value in filters that are compiled with :py:func:`compile_filters`.
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str) -> None:
+        """
+        :param name: The name of the value when it is bound with :py:meth:`CompiledFilters.bind`.
+        """
+        self.name = name
+
+    def __repr__(self) -> str:
+        return f"Param({self.name!r})"
+
+
+class CompiledFilters:
+    """
+    Filters that were converted to the format of shotgun_api3 once. Binding values to
+    their :py:class:`Param` placeholders only copies the parts of the filters that contain
+    placeholders, so :py:meth:`SGSite.find` only needs to walk the bound filters
+    without copying them again.
+    Use :py:func:`compile_filters` to create them.
+    """
+
+    __slots__ = ("_build", "_filters", "params")
+
+    def __init__(self, filters: list[Any]) -> None:
+        """
+        :param filters: The filters with :py:class:`Param` placeholders.
+        """
+        self._filters = convert_filters_to_dict(filters)
+        params: set[str] = set()
+        self._build = _compile_filter_node(self._filters, params)
+        #: The names of all placeholders.
+        self.params = frozenset(params)
 
-    return filters
+    def __repr__(self) -> str:
+        return f"CompiledFilters({list(self._filters)!r})"
+
+    def bind(self, **values: Any) -> list[Any]:
+        """
+        :param values: The values for all placeholders by their name.
+                       pysg objects are converted to dictionaries.
+        :return: The filters with the values in place of the placeholders.
+                 Parts of the filters without placeholders are shared between all
+                 bound filters, so do not modify the bound filters.
+        :raises:
+            :TypeError: When a value is missing or there is no placeholder for a value.
+        """
+        if values.keys() != self.params:
+            missing = sorted(self.params - values.keys())
+            unknown = sorted(values.keys() - self.params)
+            raise TypeError(
+                f"Cannot bind the values to the filters. Missing values: {missing}. "
+                f"Values without placeholder: {unknown}."
+            )
+        if self._build is None:
+            return list(self._filters)
+        converted = {name: _convert_filter_value(value) for name, value in values.items()}
+        return self._build(converted)
+
+
+def _convert_filter(f: Any) -> Any:
+    """
+    :param f: A single filter or filter group.
+    :return: The filter with all pysg objects converted to dictionaries.
+             The filter itself when there was nothing to convert.
+    """
+    if isinstance(f, dict):
+        sub_filters = f.get("filters")
+        if isinstance(sub_filters, list):
+            converted = [_convert_filter(sub_filter) for sub_filter in sub_filters]
+            if any(new is not old for new, old in zip(converted, sub_filters)):
+                return {**f, "filters": converted}
+        return f
+    if isinstance(f, list) and len(f) > 2:
+        values = [_convert_filter_value(value) for value in f[2:]]
+        if any(new is not old for new, old in zip(values, f[2:])):
+            return [*f[:2], *values]
+    return f
+
+
+def _convert_filter_value(value: Any) -> Any:
+    """
+    :param value: The value of a filter.
+    :return: The value with all pysg objects converted to dictionaries.
+             The value itself when there was nothing to convert.
+    """
+    if isinstance(value, SGEntity):
+        return value.to_dict()
+    if isinstance(value, list):
+        converted = [_convert_filter_value(item) for item in value]
+        if any(new is not old for new, old in zip(converted, value)):
+            return converted
+    return value
+
+
+def _compile_filter_node(node: Any, params: set[str]) -> Optional[Callable[[dict[str, Any]], Any]]:
+    """
+    :param node: Converted filters or any part of them.
+    :param params: The names of the found placeholders are added to this set.
+    :return: A function that takes the values of the placeholders and returns a copy of the
+             node with the values in place of the placeholders. None when the node does
+             not contain any placeholders.
+    """
+    if isinstance(node, Param):
+        name = node.name
+        params.add(name)
+        return lambda values: values[name]
+    if isinstance(node, (list, dict)):
+        items = enumerate(node) if isinstance(node, list) else node.items()
+        builders = [
+            (key, builder)
+            for key, item in items
+            if (builder := _compile_filter_node(item, params)) is not None
+        ]
+        if not builders:
+            return None
+
+        def build(values: dict[str, Any]) -> Any:
+            result = node.copy()
+            for key, builder in builders:
+                result[key] = builder(values)
+            return result
+
+        return build
+    return None
 
 
 def convert_value_to_pysg(sg: shotgun_api3.Shotgun, value: Any) -> Any:
     """
     Convert the value from a field to pysg object(s) where possible.
+    Any additional fields that come with an entity link (except for its display name)
+    are cached on the pysg object.
 
     :param sg: A fully initialized Shotgun instance.
     :param value: A field value
     :return: The value converted to pysg object(s) where possible.
     """
     if isinstance(value, list):
-        return [new_entity(sg, entity) for entity in value]
+        return [convert_value_to_pysg(sg, entity) for entity in value]
     elif isinstance(value, dict) and "type" in value and "id" in value:
-        return new_entity(sg, value)
+        entity = new_entity(sg, value)
+        # The "name" of an entity link is its display name and not necessarily a field.
+        entity._cache_values({field: v for field, v in value.items() if field != "name"})
+        return entity
     else:
         return value
+
+
+def convert_field_value_to_pysg(sg: shotgun_api3.Shotgun, value: Any) -> Any:
+    """
+    Convert the raw value of a field to the value that pyshotgrid returns for it.
+    Entities will be converted to pysg objects and values of "url" fields are converted
+    as follows:
+
+    * Uploaded Files:
+       The dict that describes the uploaded file attachment.
+    * Link to local files:
+       The platform dependent absolute path to the linked file.
+    * Link to a URL:
+       The URL.
+
+    :param sg: A fully initialized Shotgun instance.
+    :param value: A raw field value as returned from a shotgun_api3.Shotgun.find() call.
+    :return: The converted value.
+    """
+    if isinstance(value, dict) and "link_type" in value:
+        link_type = value["link_type"]
+        if link_type == "upload":
+            return value
+        elif link_type == "web":
+            return value["url"]
+        else:  # link_type == "local":
+            return value["local_path"]
+    return convert_value_to_pysg(sg, value)
+
+
+def convert_result_to_pysg(
+    sg: shotgun_api3.Shotgun, sg_entity: dict[str, Any], fields: Optional[list[str]] = None
+) -> SGEntity:
+    """
+    Convert a single entity dict as returned by a shotgun_api3.Shotgun.find() call to a
+    pysg object. All queried field values are cached on the pysg object.
+
+    :param sg: A fully initialized Shotgun instance.
+    :param sg_entity: The entity dict with "type", "id" and any queried fields.
+    :param fields: The fields that were explicitly asked for. Reading them does not
+                   need another query.
+    :return: The pysg object.
+    """
+    entity = new_entity(sg, sg_entity)
+    entity._cache_values(sg_entity, explicit_fields=fields)
+    return entity
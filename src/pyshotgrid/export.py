@@ -0,0 +1,389 @@
+"""
+This module exports whole entity tables to Parquet or NDJSON files, for example for
+nightly dumps into a data warehouse::
+
+    >>> import pyshotgrid as pysg
+    >>> sg_site = pysg.new_site(sg)
+    >>> sg_site.export("Shot", "/dumps/Shot.parquet", fields=["code", "sg_status_list"])
+    2000
+
+The entities are queried page by page and every page is written before the next one
+is processed, so the memory usage does not grow with the size of the table.
+The next page is queried in a background thread while the current page is written.
+The files are written next to the target path and renamed when the export is complete,
+so an export that fails never leaves a half written file behind.
+
+The Parquet columns are typed by the data types of the fields:
+
+================================================== =========================================
+Data type                                          Parquet column
+================================================== =========================================
+number, duration, percent, timecode                int64
+float                                              double
+checkbox                                           boolean
+date_time                                          timestamp in UTC
+date                                               date32
+status_list, list, entity_type                     dictionary encoded string
+entity                                             struct with the "type" and "id" fields
+multi_entity                                       list of structs with the "type" and "id"
+                                                   fields
+all other data types                               string, values that are not strings
+                                                   are JSON encoded.
+================================================== =========================================
+
+Parquet files need the ``arrow`` extra (``pip install pyshotgrid[arrow]``). NDJSON files
+contain one JSON object per entity with the raw field values, where dates are written in
+ISO format.
+
+The module can be run from the command line as well. The credentials are read from the
+``SHOTGRID_BASE_URL``, ``SHOTGRID_SCRIPT_NAME`` and ``SHOTGRID_API_KEY`` environment
+variables, unless they are passed as arguments::
+
+    pyshotgrid-export Shot Task Version PublishedFile --output-dir /dumps --format parquet
+"""
+
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import sys
+from typing import Any, Callable, Optional, Union
+
+import shotgun_api3
+
+from .core import _iter_pages, _site_state, new_site
+
+#: The file formats that entities can be exported to.
+FORMATS = ("parquet", "ndjson")
+
+#: The file extensions of the formats.
+EXTENSIONS = {".parquet": "parquet", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+def export_entities(
+    sg: shotgun_api3.shotgun.Shotgun,
+    entity_type: str,
+    path: Union[str, os.PathLike[str]],
+    fields: Optional[list[str]] = None,
+    filters: Optional[list[Any]] = None,
+    file_format: Optional[str] = None,
+    page_size: int = 500,
+    row_group_size: int = 100_000,
+    include_archived_projects: bool = True,
+) -> int:
+    """
+    Export entities to a Parquet or NDJSON file.
+
+    :param sg: A fully initialized instance of shotgun_api3.Shotgun.
+    :param entity_type: The type of the entities to export.
+    :param path: The file to write.
+    :param fields: The fields to export. The "id" is always exported.
+                   When this is None all fields of the entity type are exported.
+    :param filters: The filters for the entities to export. All entities are exported
+                    when this is None.
+    :param file_format: "parquet" or "ndjson". When this is None the format is derived from
+                        the extension of the path (".parquet", ".ndjson" or ".jsonl").
+    :param page_size: The number of entities to query per request. Larger values are
+                      limited to the maximum page size of the server (usually 500).
+    :param row_group_size: The maximum number of rows per Parquet row group.
+                           The rows of a row group are kept in memory until it is written,
+                           so at most ``max(row_group_size, page_size)`` rows plus the next
+                           page that is queried in the background are kept in memory.
+    :param include_archived_projects: Whether to export the entities of archived projects.
+    :return: The number of exported entities.
+    :raises ValueError: When the file format is unknown.
+    """
+    path = os.fspath(path)
+    if file_format is None:
+        file_format = EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if file_format not in FORMATS:
+        raise ValueError(
+            f'Cannot export to "{path}". Use one of the file formats {", ".join(FORMATS)} '
+            f"or one of the extensions {', '.join(EXTENSIONS)}."
+        )
+    if fields is None:
+        fields = list(_site_state(sg).schema_cache.field_schemas(entity_type))
+    fields = [field for field in fields if field != "id"]
+
+    writer: Union[_NDJSONWriter, _ParquetWriter]
+    temp_path = f"{path}.part"
+    if file_format == "parquet":
+        writer = _ParquetWriter(sg, entity_type, fields, temp_path, row_group_size)
+    else:
+        writer = _NDJSONWriter(fields, temp_path)
+    count = 0
+    try:
+        for sg_entities in _iter_pages(
+            sg,
+            entity_type,
+            filters or [],
+            fields=fields,
+            include_archived_projects=include_archived_projects,
+            page_size=page_size,
+            prefetch=True,
+        ):
+            writer.write(sg_entities)
+            count += len(sg_entities)
+        writer.close()
+    except BaseException:
+        # Cleaning up must not hide the error of the export.
+        with contextlib.suppress(Exception):
+            writer.abort()
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
+    os.replace(temp_path, path)
+    return count
+
+
+class _NDJSONWriter:
+    """
+    Writes entity dicts as one JSON object per line.
+    """
+
+    def __init__(self, fields: list[str], path: str) -> None:
+        """
+        :param fields: The fields to write besides the "id".
+        :param path: The file to write.
+        """
+        self._fields = ["id", *fields]
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, sg_entities: list[dict[str, Any]]) -> None:
+        """
+        :param sg_entities: The next page of entity dicts.
+        """
+        self._file.writelines(
+            json.dumps(
+                {field: sg_entity.get(field) for field in self._fields}, default=_json_default
+            )
+            + "\n"
+            for sg_entity in sg_entities
+        )
+
+    def close(self) -> None:
+        self._file.close()
+
+    def abort(self) -> None:
+        """
+        Close the file after the export failed.
+        """
+        self._file.close()
+
+
+class _ParquetWriter:
+    """
+    Writes entity dicts as Parquet row groups.
+    """
+
+    def __init__(
+        self,
+        sg: shotgun_api3.shotgun.Shotgun,
+        entity_type: str,
+        fields: list[str],
+        path: str,
+        row_group_size: int,
+    ) -> None:
+        """
+        :param sg: A fully initialized instance of shotgun_api3.Shotgun.
+        :param entity_type: The type of the entities.
+        :param fields: The fields to write besides the "id".
+        :param path: The file to write.
+        :param row_group_size: The maximum number of rows per row group.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        from .columnar import field_data_type
+
+        self._pa = pa
+        self._converters: dict[str, Callable[[list[Any]], Any]] = {"id": _arrow_converter("id")}
+        for field in fields:
+            self._converters[field] = _arrow_converter(field_data_type(sg, entity_type, field))
+        self._schema = pa.schema(
+            [(field, converter([]).type) for field, converter in self._converters.items()]
+        )
+        self._row_group_size = row_group_size
+        self._batches: list[Any] = []
+        self._rows = 0
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write(self, sg_entities: list[dict[str, Any]]) -> None:
+        """
+        :param sg_entities: The next page of entity dicts.
+        """
+        # Row groups are written before they exceed the row group size.
+        if self._rows + len(sg_entities) > self._row_group_size:
+            self._flush()
+        self._batches.append(
+            self._pa.record_batch(
+                [
+                    converter([sg_entity.get(field) for sg_entity in sg_entities])
+                    for field, converter in self._converters.items()
+                ],
+                schema=self._schema,
+            )
+        )
+        self._rows += len(sg_entities)
+        if self._rows >= self._row_group_size:
+            self._flush()
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
+
+    def abort(self) -> None:
+        """
+        Close the file without writing the collected pages after the export failed.
+        """
+        self._batches = []
+        self._rows = 0
+        self._writer.close()
+
+    def _flush(self) -> None:
+        """
+        Write the collected pages.
+        """
+        if self._batches:
+            self._writer.write_table(
+                self._pa.Table.from_batches(self._batches, schema=self._schema),
+                row_group_size=self._row_group_size,
+            )
+        self._batches = []
+        self._rows = 0
+
+
+def _arrow_converter(data_type: Optional[str]) -> Callable[[list[Any]], Any]:
+    """
+    :param data_type: The ShotGrid data type of a field or "id" for the "id" field.
+    :return: A function that converts the values of the field to a pyarrow.Array
+             with a type that only depends on the data type.
+    """
+    import pyarrow as pa
+
+    scalar_types = {
+        "id": pa.int64(),
+        "number": pa.int64(),
+        "duration": pa.int64(),
+        "percent": pa.int64(),
+        "timecode": pa.int64(),
+        "float": pa.float64(),
+        "checkbox": pa.bool_(),
+    }
+    link_type = pa.struct([("type", pa.string()), ("id", pa.int64())])
+
+    def scalars(values: list[Any]) -> Any:
+        return pa.array(values, type=scalar_types[data_type or ""])
+
+    def date_times(values: list[Any]) -> Any:
+        # Datetimes without time zone are written as they are, so they are taken as UTC.
+        return pa.array(
+            [
+                value.astimezone(datetime.timezone.utc)
+                if value is not None and value.tzinfo is not None
+                else value
+                for value in values
+            ],
+            type=pa.timestamp("us", tz="UTC"),
+        )
+
+    def dates(values: list[Any]) -> Any:
+        return pa.array(values, type=pa.string()).cast(pa.date32())
+
+    def categories(values: list[Any]) -> Any:
+        return pa.array(values, type=pa.string()).dictionary_encode()
+
+    def links(values: list[Any]) -> Any:
+        return pa.array(values, type=link_type)
+
+    def multi_links(values: list[Any]) -> Any:
+        return pa.array(values, type=pa.list_(link_type))
+
+    def strings(values: list[Any]) -> Any:
+        return pa.array(
+            [
+                value
+                if value is None or isinstance(value, str)
+                else json.dumps(value, default=_json_default)
+                for value in values
+            ],
+            type=pa.string(),
+        )
+
+    if data_type in scalar_types:
+        return scalars
+    converters = {
+        "date_time": date_times,
+        "date": dates,
+        "status_list": categories,
+        "list": categories,
+        "entity_type": categories,
+        "entity": links,
+        "multi_entity": multi_links,
+    }
+    return converters.get(data_type or "", strings)
+
+
+def _json_default(value: Any) -> Any:
+    """
+    :param value: A value that the json module cannot encode.
+    :return: The value in a form that the json module can encode.
+    """
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {value.__class__.__name__} is not JSON serializable")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    The command line interface to export entity tables.
+
+    :param argv: The command line arguments. The arguments of the process when this is None.
+    :return: The exit code.
+    """
+    parser = argparse.ArgumentParser(
+        prog="pyshotgrid-export",
+        description="Export ShotGrid entity tables to Parquet or NDJSON files.",
+    )
+    parser.add_argument("entity_types", nargs="+", metavar="entity_type")
+    parser.add_argument(
+        "--output-dir", default=".", help="The directory to write <entity_type>.<format> to."
+    )
+    parser.add_argument("--format", choices=FORMATS, default="parquet")
+    parser.add_argument("--fields", nargs="+", help="The fields to export. Defaults to all fields.")
+    parser.add_argument(
+        "--filters", type=json.loads, default=None, help="The filters as JSON list."
+    )
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--row-group-size", type=int, default=100_000)
+    parser.add_argument("--base-url", default=os.environ.get("SHOTGRID_BASE_URL"))
+    parser.add_argument("--script-name", default=os.environ.get("SHOTGRID_SCRIPT_NAME"))
+    parser.add_argument("--api-key", default=os.environ.get("SHOTGRID_API_KEY"))
+    args = parser.parse_args(argv)
+    if not (args.base_url and args.script_name and args.api_key):
+        parser.error(
+            "The credentials are missing. Pass --base-url, --script-name and --api-key or set "
+            "the SHOTGRID_BASE_URL, SHOTGRID_SCRIPT_NAME and SHOTGRID_API_KEY variables."
+        )
+
+    sg_site = new_site(base_url=args.base_url, script_name=args.script_name, api_key=args.api_key)
+    os.makedirs(args.output_dir, exist_ok=True)
+    for entity_type in args.entity_types:
+        path = os.path.join(args.output_dir, f"{entity_type}.{args.format}")
+        count = export_entities(
+            sg_site.sg,
+            entity_type,
+            path,
+            fields=args.fields,
+            filters=args.filters,
+            file_format=args.format,
+            page_size=args.page_size,
+            row_group_size=args.row_group_size,
+        )
+        sys.stdout.write(f"Exported {count} {entity_type} entities to {path}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,576 @@
+"""
+This module records the calls that pyshotgrid makes to the ShotGrid API.
+
+Use it like::
+
+    >>> from pyshotgrid import instrumentation
+    >>> stats = instrumentation.CallStats()
+    >>> with instrumentation.instrumented(stats):
+    ...     sg_project.shots()
+    >>> stats.stats()["SGProject.shots"]["count"]
+    1
+
+Every registered callback is called after every API call with a dict:
+
+- pysg_method: The pyshotgrid method that made the call, like "SGProject.shots",
+  or None when the call was not made by pyshotgrid.
+- call_site: The file and line outside of pyshotgrid that lead to the call,
+  like "/path/to/tool.py:42".
+- api_method: The name of the method of the Shotgun instance, like "find".
+- entity_type: The entity type of the call or None.
+- rows: The number of returned rows or None when the result is not a list or dict.
+- payload_bytes: The size of the JSON encoded arguments of the call.
+- seconds: The wall time of the call.
+- error: The exception that was raised by the call or None.
+- args: The positional arguments of the call.
+- kwargs: The keyword arguments of the call.
+
+The methods of the Shotgun classes are only wrapped while at least one callback is
+registered, so there is no overhead at all otherwise. Callbacks are called from the thread
+that made the call. Errors of callbacks are logged and do not affect the API call.
+"""
+
+import bisect
+import contextlib
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import warnings
+from types import FrameType
+from typing import Any, Callable, ClassVar, Iterator, Optional
+
+from . import core
+
+_LOGGER = logging.getLogger(__name__)
+
+#: The methods of the Shotgun API that are recorded.
+API_METHODS = (
+    "activity_stream_read",
+    "batch",
+    "create",
+    "delete",
+    "download_attachment",
+    "find",
+    "find_one",
+    "follow",
+    "followers",
+    "info",
+    "note_thread_read",
+    "revive",
+    "schema_entity_read",
+    "schema_field_create",
+    "schema_field_delete",
+    "schema_field_read",
+    "schema_field_update",
+    "schema_read",
+    "share_thumbnail",
+    "summarize",
+    "text_search",
+    "unfollow",
+    "update",
+    "upload",
+    "upload_thumbnail",
+)
+
+#: The API methods whose first argument is an entity type.
+__ENTITY_TYPE_METHODS = frozenset(
+    {
+        "create",
+        "delete",
+        "find",
+        "find_one",
+        "revive",
+        "schema_field_create",
+        "schema_field_delete",
+        "schema_field_read",
+        "schema_field_update",
+        "summarize",
+        "update",
+        "upload",
+        "upload_thumbnail",
+    }
+)
+
+__CALLBACKS: tuple[Callable[[dict[str, Any]], None], ...] = ()
+__LOCK = threading.Lock()
+# Maps the wrapped (Shotgun class, method name) to the original method of the class
+# or None when the class inherited the method and to the wrapper that replaced it.
+__ORIGINALS: dict[tuple[type, str], tuple[Any, Callable[..., Any]]] = {}
+__LOCAL = threading.local()
+__PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+
+
+def register_callback(callback: Callable[[dict[str, Any]], None]) -> None:
+    """
+    Call the given function after every call to the ShotGrid API.
+
+    :param callback: A function that takes a dict that describes the call.
+                     See :py:mod:`pyshotgrid.instrumentation` for its keys.
+    """
+    global __CALLBACKS
+    with __LOCK:
+        if not __CALLBACKS:
+            _install()
+        __CALLBACKS = (*__CALLBACKS, callback)
+
+
+def unregister_callback(callback: Callable[[dict[str, Any]], None]) -> None:
+    """
+    Stop calling the given function after calls to the ShotGrid API.
+
+    :param callback: A function that was registered with :py:func:`register_callback`.
+    :raises:
+        :ValueError: When the function is not registered.
+    """
+    global __CALLBACKS
+    with __LOCK:
+        if callback not in __CALLBACKS:
+            raise ValueError(f"The callback {callback} is not registered.")
+        callbacks = list(__CALLBACKS)
+        callbacks.remove(callback)
+        __CALLBACKS = tuple(callbacks)
+        if not __CALLBACKS:
+            _uninstall()
+
+
+@contextlib.contextmanager
+def instrumented(callback: Callable[[dict[str, Any]], None]) -> Iterator[None]:
+    """
+    Call the given function after every call to the ShotGrid API within the block::
+
+        >>> with instrumentation.instrumented(print):
+        ...     sg_shot["code"].get()
+
+    :param callback: A function that takes a dict that describes the call.
+    """
+    register_callback(callback)
+    try:
+        yield
+    finally:
+        unregister_callback(callback)
+
+
+class CallStats:
+    """
+    Collects the number of calls, the returned rows, the payload sizes and a histogram
+    of the wall times of the calls to the ShotGrid API per pyshotgrid method in memory.
+    Register it with :py:func:`register_callback` or :py:func:`instrumented`.
+    """
+
+    #: The upper bounds of the buckets of the latency histograms in seconds.
+    BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: dict[Optional[str], dict[str, Any]] = {}
+
+    def __call__(self, call: dict[str, Any]) -> None:
+        """
+        :param call: The dict that describes a call to the ShotGrid API.
+        """
+        with self._lock:
+            stats = self._stats.get(call["pysg_method"])
+            if stats is None:
+                stats = self._stats[call["pysg_method"]] = {
+                    "count": 0,
+                    "errors": 0,
+                    "rows": 0,
+                    "payload_bytes": 0,
+                    "seconds": 0.0,
+                    "max_seconds": 0.0,
+                    "api_methods": {},
+                    "histogram": [0] * len(self.BUCKETS),
+                }
+            stats["count"] += 1
+            stats["errors"] += call["error"] is not None
+            stats["rows"] += call["rows"] or 0
+            stats["payload_bytes"] += call["payload_bytes"] or 0
+            stats["seconds"] += call["seconds"]
+            stats["max_seconds"] = max(stats["max_seconds"], call["seconds"])
+            api_methods = stats["api_methods"]
+            api_methods[call["api_method"]] = api_methods.get(call["api_method"], 0) + 1
+            stats["histogram"][bisect.bisect_left(self.BUCKETS, call["seconds"])] += 1
+
+    def stats(self) -> dict[Optional[str], dict[str, Any]]:
+        """
+        :return: The statistics per pyshotgrid method (None for calls that were not made
+                 by pyshotgrid):
+
+                 - count: The number of calls.
+                 - errors: The number of calls that raised an exception.
+                 - rows: The total number of returned rows.
+                 - payload_bytes: The total size of the arguments.
+                 - seconds: The total wall time.
+                 - max_seconds: The longest wall time of a single call.
+                 - api_methods: The number of calls per API method.
+                 - histogram: The number of calls per upper bound of :py:attr:`BUCKETS`.
+        """
+        with self._lock:
+            return {
+                pysg_method: {
+                    **stats,
+                    "api_methods": dict(stats["api_methods"]),
+                    "histogram": dict(zip(self.BUCKETS, stats["histogram"])),
+                }
+                for pysg_method, stats in self._stats.items()
+            }
+
+    def reset(self) -> None:
+        """
+        Forget all collected statistics.
+        """
+        with self._lock:
+            self._stats.clear()
+
+
+class QueryBudget:
+    """
+    Counts the calls to the ShotGrid API per query shape and reports query shapes that run
+    more often than allowed. The shape of a query is the API method, the entity type, the
+    structure of the filters (without their values) and the fields. A query shape that runs
+    over and over again is usually a loop that queries one entity after another::
+
+        >>> with instrumentation.QueryBudget(max_repeats=5):
+        ...     for sg_shot in sg_project.shots():
+        ...         sg_shot["sg_status_list"].get()
+        RuntimeError: The query budget of 5 queries per query shape was exceeded: ...
+
+    Use it as context manager, or create it with :py:meth:`pyshotgrid.core.SGSite.query_budget`.
+    The budget is checked when the block is left without an exception.
+    """
+
+    #: Bulk alternatives for the pyshotgrid methods that are often called in loops.
+    SUGGESTIONS: ClassVar[dict[str, str]] = {
+        "Field.get": "Query the field for all entities at once with SGSite.load_fields() "
+        'or pass "fields" to the find() call that returned the entities.',
+        "SGEntity.get": "Query the fields for all entities at once with SGSite.load_fields() "
+        'or pass "fields" to the find() call that returned the entities.',
+        "SGEntity.name": "Query the name fields for all entities at once with "
+        "SGSite.load_fields().",
+        "SGSite.find_one": 'Query all entities with a single SGSite.find() and an "in" filter.',
+        "SGEntity.set": "Collect the updates with SGSite.batch().",
+        "Field.set": "Collect the updates with SGSite.batch().",
+        "SGSite.create": "Collect the creates with SGSite.batch().",
+        "SGEntity.delete": "Collect the deletes with SGSite.batch().",
+        "Field.download": "Download all files at once with SGSite.download().",
+        "Field.upload": "Upload all files at once with SGSite.upload().",
+    }
+    #: The suggestion for all other pyshotgrid methods.
+    DEFAULT_SUGGESTION = (
+        'Query all entities at once with an "in" filter or run the queries at the same time '
+        "with SGSite.parallel()."
+    )
+
+    def __init__(self, max_repeats: int = 10, action: str = "raise") -> None:
+        """
+        :param max_repeats: How often the same query shape may run.
+        :param action: Either "raise" to raise a RuntimeError or "warn" to issue a warning
+                       when the budget is exceeded.
+        """
+        if action not in ("raise", "warn"):
+            raise ValueError(f'action needs to be either "raise" or "warn". Got "{action}".')
+        self.max_repeats = max_repeats
+        self.action = action
+        self._lock = threading.Lock()
+        self._shapes: dict[tuple[Any, ...], dict[str, Any]] = {}
+
+    def __call__(self, call: dict[str, Any]) -> None:
+        """
+        :param call: The dict that describes a call to the ShotGrid API.
+        """
+        shape = _query_shape(call)
+        with self._lock:
+            usage = self._shapes.get(shape)
+            if usage is None:
+                usage = self._shapes[shape] = {"count": 0, "pysg_methods": {}, "call_sites": {}}
+            usage["count"] += 1
+            for key, value in (
+                ("pysg_methods", call["pysg_method"]),
+                ("call_sites", call["call_site"]),
+            ):
+                usage[key][value] = usage[key].get(value, 0) + 1
+
+    def __enter__(self) -> "QueryBudget":
+        register_callback(self)
+        return self
+
+    def __exit__(self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
+        unregister_callback(self)
+        if exc_type is None:
+            self.check()
+
+    def violations(self) -> list[dict[str, Any]]:
+        """
+        :return: The query shapes that ran more than ``max_repeats`` times,
+                 the most frequent first:
+
+                 - shape: The API method, the entity type, the filter structure and the fields.
+                 - count: How often the query shape ran.
+                 - pysg_methods: How often each pyshotgrid method ran the query shape.
+                 - call_sites: How often each line outside of pyshotgrid ran the query shape.
+                 - suggestion: A bulk alternative for the most frequent pyshotgrid method.
+        """
+        with self._lock:
+            violations = [
+                {
+                    "shape": shape,
+                    "count": usage["count"],
+                    "pysg_methods": dict(usage["pysg_methods"]),
+                    "call_sites": dict(usage["call_sites"]),
+                    "suggestion": self.SUGGESTIONS.get(
+                        max(usage["pysg_methods"], key=usage["pysg_methods"].get) or "",
+                        self.DEFAULT_SUGGESTION,
+                    ),
+                }
+                for shape, usage in self._shapes.items()
+                if usage["count"] > self.max_repeats
+            ]
+        violations.sort(key=lambda violation: -violation["count"])
+        return violations
+
+    def report(self) -> str:
+        """
+        :return: A readable report of all violations.
+        """
+        lines = []
+        for violation in self.violations():
+            api_method, entity_type, filters, fields = violation["shape"]
+            lines.append(
+                f"- {violation['count']}x {api_method} {entity_type} "
+                f"filters={filters} fields={fields}"
+            )
+            for pysg_method, count in violation["pysg_methods"].items():
+                lines.append(f"    {count}x from {pysg_method or 'a direct API call'}")
+            for call_site, count in violation["call_sites"].items():
+                lines.append(f"    {count}x at {call_site}")
+            lines.append(f"    Suggestion: {violation['suggestion']}")
+        return "\n".join(lines)
+
+    def check(self) -> None:
+        """
+        Raise or warn, when a query shape ran more than ``max_repeats`` times.
+
+        :raises:
+            :RuntimeError: When the budget is exceeded and the action is "raise".
+        """
+        if not self.violations():
+            return
+        message = (
+            f"The query budget of {self.max_repeats} queries per query shape "
+            f"was exceeded:\n{self.report()}"
+        )
+        if self.action == "raise":
+            raise RuntimeError(message)
+        warnings.warn(message, stacklevel=3)
+
+
+def _install() -> None:
+    """
+    Wrap the API methods of all known Shotgun classes.
+    When this fails, the methods that were already wrapped are restored.
+    """
+    try:
+        for sg_class in core._sg_classes():
+            for api_method in API_METHODS:
+                method = getattr(sg_class, api_method, None)
+                if method is None:
+                    continue
+                wrapper = _wrap(method, api_method)
+                __ORIGINALS[(sg_class, api_method)] = (vars(sg_class).get(api_method), wrapper)
+                setattr(sg_class, api_method, wrapper)
+    except BaseException:
+        _uninstall()
+        raise
+
+
+def _uninstall() -> None:
+    """
+    Restore the API methods of all wrapped Shotgun classes.
+    Methods that were replaced by someone else in the meantime are left alone.
+    Their wrappers stay in place but only call the original method
+    while no callback is registered.
+    """
+    for (sg_class, api_method), (method, wrapper) in __ORIGINALS.items():
+        if vars(sg_class).get(api_method) is not wrapper:
+            continue
+        if method is None:
+            delattr(sg_class, api_method)
+        else:
+            setattr(sg_class, api_method, method)
+    __ORIGINALS.clear()
+
+
+def _wrap(method: Callable[..., Any], api_method: str) -> Callable[..., Any]:
+    """
+    :param method: An API method of a Shotgun class.
+    :param api_method: The name of the method.
+    :return: The method that reports every call to the registered callbacks.
+    """
+
+    @functools.wraps(method)
+    def call(sg: Any, *args: Any, **kwargs: Any) -> Any:
+        # API methods that call other API methods are reported only once.
+        if not __CALLBACKS or getattr(__LOCAL, "active", False):
+            return method(sg, *args, **kwargs)
+        pysg_method, call_site = _caller(sys._getframe(1))
+        __LOCAL.active = True
+        result = None
+        error: Optional[BaseException] = None
+        start = time.perf_counter()
+        try:
+            result = method(sg, *args, **kwargs)
+            return result
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            __LOCAL.active = False
+            record = {
+                "pysg_method": pysg_method,
+                "call_site": call_site,
+                "api_method": api_method,
+                "entity_type": _entity_type(api_method, args, kwargs),
+                "rows": len(result) if isinstance(result, list) else _single_row(result),
+                "payload_bytes": _payload_size(args, kwargs),
+                "seconds": seconds,
+                "error": error,
+                "args": args,
+                "kwargs": kwargs,
+            }
+            for callback in __CALLBACKS:
+                try:
+                    callback(record)
+                except Exception:
+                    _LOGGER.exception("The instrumentation callback %s failed.", callback)
+
+    return call
+
+
+def _caller(frame: Optional[FrameType]) -> tuple[Optional[str], Optional[str]]:
+    """
+    :param frame: The frame that called the API method.
+    :return: The outermost public pyshotgrid method of the calls that lead to the given frame
+             and the file and line of the code outside of pyshotgrid that called it.
+             When there is no public method it is the outermost pyshotgrid function
+             and None when the API method was not called from pyshotgrid.
+    """
+    outermost = None
+    public = None
+    while frame is not None and frame.f_code.co_filename.startswith(__PACKAGE_DIR):
+        code = frame.f_code
+        qualname = getattr(code, "co_qualname", None)
+        if qualname is None:  # Python < 3.11
+            owner = frame.f_locals.get("self")
+            qualname = code.co_name if owner is None else f"{type(owner).__name__}.{code.co_name}"
+        outermost = qualname
+        if not any(part.startswith(("_", "<")) for part in qualname.split(".")):
+            public = qualname
+        frame = frame.f_back
+    call_site = None if frame is None else f"{frame.f_code.co_filename}:{frame.f_lineno}"
+    return public or outermost, call_site
+
+
+def _query_shape(call: dict[str, Any]) -> tuple[Any, ...]:
+    """
+    :param call: The dict that describes a call to the ShotGrid API.
+    :return: The API method, the entity type, the structure of the filters and the fields
+             of the call. For creates and updates the fields are the keys of the data.
+    """
+    api_method = call["api_method"]
+    arguments = _bind_arguments(api_method, call["args"], call["kwargs"])
+    filters = arguments.get("filters")
+    fields = arguments.get("fields") or arguments.get("summary_fields")
+    if fields is None and isinstance(arguments.get("data"), dict):
+        fields = list(arguments["data"])
+    if fields is not None:
+        fields = tuple(sorted(str(field) for field in fields))
+    return (
+        api_method,
+        call["entity_type"],
+        None if filters is None else _filter_shape(filters),
+        fields,
+    )
+
+
+#: The names of the first arguments of the API methods that have a query shape.
+__ARGUMENT_NAMES = {
+    "find": ("entity_type", "filters", "fields"),
+    "find_one": ("entity_type", "filters", "fields"),
+    "summarize": ("entity_type", "filters", "summary_fields"),
+    "create": ("entity_type", "data", "return_fields"),
+    "update": ("entity_type", "entity_id", "data"),
+}
+
+
+def _bind_arguments(
+    api_method: str, args: tuple[Any, ...], kwargs: dict[str, Any]
+) -> dict[str, Any]:
+    """
+    :param api_method: The name of the API method.
+    :param args: The positional arguments of the call.
+    :param kwargs: The keyword arguments of the call.
+    :return: The arguments of the call by name.
+    """
+    return {**dict(zip(__ARGUMENT_NAMES.get(api_method, ()), args)), **kwargs}
+
+
+def _filter_shape(filters: Any) -> Any:
+    """
+    :param filters: Filters in the format of shotgun_api3.Shotgun.find().
+    :return: The filters without their values.
+    """
+    if isinstance(filters, dict):
+        return (
+            filters.get("filter_operator"),
+            tuple(_filter_shape(sub_filter) for sub_filter in filters.get("filters", [])),
+        )
+    if isinstance(filters, (list, tuple)):
+        if len(filters) >= 2 and all(isinstance(item, str) for item in filters[:2]):
+            return tuple(filters[:2])
+        return tuple(_filter_shape(sub_filter) for sub_filter in filters)
+    return "?"
+
+
+def _entity_type(api_method: str, args: tuple[Any, ...], kwargs: dict[str, Any]) -> Optional[str]:
+    """
+    :param api_method: The name of the API method.
+    :param args: The positional arguments of the call.
+    :param kwargs: The keyword arguments of the call.
+    :return: The entity type of the call. For batch calls these are all entity types
+             separated by commas.
+    """
+    if api_method == "batch":
+        requests = args[0] if args else kwargs.get("requests", [])
+        return ",".join(sorted({request["entity_type"] for request in requests})) or None
+    if api_method not in __ENTITY_TYPE_METHODS:
+        return None
+    return args[0] if args else kwargs.get("entity_type")
+
+
+def _single_row(result: Any) -> Optional[int]:
+    """
+    :param result: The result of an API call that is not a list.
+    :return: 1 for a dict, 0 for None and None for anything else.
+    """
+    if isinstance(result, dict):
+        return 1
+    if result is None:
+        return 0
+    return None
+
+
+def _payload_size(args: tuple[Any, ...], kwargs: dict[str, Any]) -> Optional[int]:
+    """
+    :param args: The positional arguments of the call.
+    :param kwargs: The keyword arguments of the call.
+    :return: The size of the JSON encoded arguments.
+    """
+    try:
+        return len(json.dumps([args, kwargs], default=str))
+    except (TypeError, ValueError):
+        return None
@@ -3,9 +3,10 @@ This module collects all default pyshotgrid custom entities.
 """
 
 import fnmatch
-from typing import Any, Optional, Union
+import time
+from typing import Any, Iterator, Optional, Union
 
-from .core import Field, SGEntity, new_entity
+from .core import Field, SGEntity, convert_result_to_pysg, new_site
 
 
 class SGProject(SGEntity):
@@ -22,6 +23,8 @@ class SGProject(SGEntity):
 
     DEFAULT_SG_ENTITY_TYPE = "Project"
 
+    __slots__ = ()
+
     @property
     def name(self) -> Field:
         """
@@ -29,42 +32,70 @@ class SGProject(SGEntity):
         """
         return self["name"]
 
-    def shots(self, glob_pattern: Optional[str] = None) -> list[SGEntity]:
+    def shots(
+        self,
+        glob_pattern: Optional[str] = None,
+        fields: Optional[list[str]] = None,
+        prefetch: Optional[dict[str, Any]] = None,
+    ) -> list[SGEntity]:
         """
         :param glob_pattern: A glob to match the shots to return. For example
                              `TEST_01_*` would return all shots that start with `TEST_01_`.
+        :param fields: More fields to load for the shots.
+        :param prefetch: The relationships to prefetch for the shots.
+                         See :py:meth:`SGSite.prefetch <pyshotgrid.core.SGSite.prefetch>`.
         :return: All the shots from this project.
         """
-        sg_shots = self.sg.find("Shot", [["project", "is", self.to_dict()]], ["code"])
-        if glob_pattern is not None:
-            return [
-                new_entity(self._sg, sg_shot)
-                for sg_shot in sg_shots
-                if fnmatch.fnmatchcase(sg_shot["code"], glob_pattern)
-            ]
-        else:
-            return [new_entity(self._sg, sg_shot) for sg_shot in sg_shots]
 
-    def assets(self, glob_pattern: Optional[str] = None) -> list[SGEntity]:
+        def find(query_fields: list[str]) -> list[dict[str, Any]]:
+            sg_shots = self.sg.find("Shot", [["project", "is", self.to_dict()]], query_fields)
+            if glob_pattern is not None:
+                return [
+                    sg_shot
+                    for sg_shot in sg_shots
+                    if fnmatch.fnmatchcase(sg_shot["code"], glob_pattern)
+                ]
+            return sg_shots
+
+        return self._relationship(
+            "shots", find, fields=fields, prefetch=prefetch, use_prefetched=glob_pattern is None
+        )
+
+    def assets(
+        self,
+        glob_pattern: Optional[str] = None,
+        fields: Optional[list[str]] = None,
+        prefetch: Optional[dict[str, Any]] = None,
+    ) -> list[SGEntity]:
         """
         :param glob_pattern: A glob to match the assets to return. For example
                             `TEST_*` would return all assets that start with `TEST_`.
+        :param fields: More fields to load for the assets.
+        :param prefetch: The relationships to prefetch for the assets.
+                         See :py:meth:`SGSite.prefetch <pyshotgrid.core.SGSite.prefetch>`.
         :return: All the assets from this project.
         """
-        sg_assets = self.sg.find("Asset", [["project", "is", self.to_dict()]], ["code"])
-        if glob_pattern is not None:
-            return [
-                new_entity(self._sg, sg_asset)
-                for sg_asset in sg_assets
-                if fnmatch.fnmatchcase(sg_asset["code"], glob_pattern)
-            ]
-        else:
-            return [new_entity(self._sg, sg_asset) for sg_asset in sg_assets]
+
+        def find(query_fields: list[str]) -> list[dict[str, Any]]:
+            sg_assets = self.sg.find("Asset", [["project", "is", self.to_dict()]], query_fields)
+            if glob_pattern is not None:
+                return [
+                    sg_asset
+                    for sg_asset in sg_assets
+                    if fnmatch.fnmatchcase(sg_asset["code"], glob_pattern)
+                ]
+            return sg_assets
+
+        return self._relationship(
+            "assets", find, fields=fields, prefetch=prefetch, use_prefetched=glob_pattern is None
+        )
 
     def publishes(
         self,
         pub_types: Optional[Union[str, list[str]]] = None,
         latest: bool = False,
+        fields: Optional[list[str]] = None,
+        prefetch: Optional[dict[str, Any]] = None,
     ) -> list[SGEntity]:
         """
         :param pub_types: The names of the Publish File Types to return.
@@ -75,12 +106,17 @@ class SGProject(SGEntity):
             - from these get the publishes with the highest "version_number" field
             - if there are publishes with the same "name" and "version_number" the
               newest one wins.
+        :param fields: More fields to load for the publishes.
+        :param prefetch: The relationships to prefetch for the publishes.
+                         See :py:meth:`SGSite.prefetch <pyshotgrid.core.SGSite.prefetch>`.
         :return: All published files from this project.
         """
         return self._publishes(
             base_filter=[["project", "is", self.to_dict()]],
             pub_types=pub_types,
             latest=latest,
+            fields=fields,
+            prefetch=prefetch,
         )
 
     def people(self, only_active: bool = True) -> list[SGEntity]:
@@ -92,14 +128,17 @@ class SGProject(SGEntity):
         if only_active:
             sg_filter.append(["sg_status_list", "is", "act"])
 
-        return [new_entity(self._sg, sg_user) for sg_user in self._sg.find("HumanUser", sg_filter)]
+        return [
+            convert_result_to_pysg(self._sg, sg_user)
+            for sg_user in self._sg.find("HumanUser", sg_filter)
+        ]
 
     def playlists(self) -> list[SGEntity]:
         """
         :return: All playlists attached to this project.
         """
         return [
-            new_entity(self._sg, sg_playlist)
+            convert_result_to_pysg(self._sg, sg_playlist)
             for sg_playlist in self._sg.find("Playlist", [["project", "is", self.to_dict()]])
         ]
 
@@ -108,11 +147,16 @@ class SGProject(SGEntity):
         user: Optional[Union[dict[str, Any], SGEntity]] = None,
         pipeline_step: Optional[Union[str, dict[str, Any], SGEntity]] = None,
         latest: bool = False,
+        fields: Optional[list[str]] = None,
+        prefetch: Optional[dict[str, Any]] = None,
     ) -> list[SGEntity]:
         """
         :param user: The artist assigned to the Versions.
         :param pipeline_step: Name, short name or entity object or the Pipeline Step to filter by.
         :param latest: Whether to return only the latest Version per link/entity.
+        :param fields: More fields to load for the Versions.
+        :param prefetch: The relationships to prefetch for the Versions.
+                         See :py:meth:`SGSite.prefetch <pyshotgrid.core.SGSite.prefetch>`.
         :returns: A list of Versions
         """
         return self._versions(
@@ -120,6 +164,8 @@ class SGProject(SGEntity):
             user=user,
             pipeline_step=pipeline_step,
             latest=latest,
+            fields=fields,
+            prefetch=prefetch,
         )
 
 
@@ -137,6 +183,8 @@ class SGShot(SGEntity):
 
     DEFAULT_SG_ENTITY_TYPE = "Shot"
 
+    __slots__ = ()
+
     @property
     def name(self) -> Field:
         """
@@ -148,6 +196,8 @@ class SGShot(SGEntity):
         self,
         pub_types: Optional[Union[str, list[str]]] = None,
         latest: bool = False,
+        fields: Optional[list[str]] = None,
+        prefetch: Optional[dict[str, Any]] = None,
     ) -> list[SGEntity]:
         """
         :param pub_types: The names of the Publish File Types to return.
@@ -158,12 +208,17 @@ class SGShot(SGEntity):
                          - from these get the publishes with the highest "version_number" field
                          - if there are publishes with the same "name" and "version_number" the
                            newest one wins.
+        :param fields: More fields to load for the publishes.
+        :param prefetch: The relationships to prefetch for the publishes.
+                         See :py:meth:`SGSite.prefetch <pyshotgrid.core.SGSite.prefetch>`.
         :return: All published files from this shot.
         """
         return self._publishes(
             base_filter=[["entity", "is", self.to_dict()]],
             pub_types=pub_types,
             latest=latest,
+            fields=fields,
+            prefetch=prefetch,
         )
 
     def tasks(
@@ -171,12 +226,17 @@ class SGShot(SGEntity):
         names: Optional[list[str]] = None,
         assignee: Optional[Union[dict[str, Any], SGEntity]] = None,
         pipeline_step: Optional[Union[str, dict[str, Any], SGEntity]] = None,
+        fields: Optional[list[str]] = None,
+        prefetch: Optional[dict[str, Any]] = None,
     ) -> list[SGEntity]:
         """
         :param names: The names of Tasks to return.
         :param assignee: The assignee of the Tasks to return.
         :param pipeline_step: Name, short name or entity object
                               or the Pipeline Step to filter by.
+        :param fields: More fields to load for the Tasks.
+        :param prefetch: The relationships to prefetch for the Tasks.
+                         See :py:meth:`SGSite.prefetch <pyshotgrid.core.SGSite.prefetch>`.
         :returns: A list of Tasks.
         """
         return self._tasks(
@@ -184,6 +244,8 @@ class SGShot(SGEntity):
             entity=self.to_dict(),
             assignee=assignee,
             pipeline_step=pipeline_step,
+            fields=fields,
+            prefetch=prefetch,
         )
 
     def versions(
@@ -191,11 +253,16 @@ class SGShot(SGEntity):
         user: Optional[Union[dict[str, Any], SGEntity]] = None,
         pipeline_step: Optional[Union[str, dict[str, Any], SGEntity]] = None,
         latest: bool = False,
+        fields: Optional[list[str]] = None,
+        prefetch: Optional[dict[str, Any]] = None,
     ) -> list[SGEntity]:
         """
         :param user: The artist assigned to the Versions.
         :param pipeline_step: Name, short name or entity object or the Pipeline Step to filter by.
         :param latest: Whether to return only the latest Version per link/entity.
+        :param fields: More fields to load for the Versions.
+        :param prefetch: The relationships to prefetch for the Versions.
+                         See :py:meth:`SGSite.prefetch <pyshotgrid.core.SGSite.prefetch>`.
         :returns: A list of Versions
         """
         return self._versions(
@@ -203,6 +270,8 @@ class SGShot(SGEntity):
             user=user,
             pipeline_step=pipeline_step,
             latest=latest,
+            fields=fields,
+            prefetch=prefetch,
         )
 
 
@@ -220,6 +289,8 @@ class SGAsset(SGEntity):
 
     DEFAULT_SG_ENTITY_TYPE = "Asset"
 
+    __slots__ = ()
+
     @property
     def name(self) -> Field:
         """
@@ -231,6 +302,8 @@ class SGAsset(SGEntity):
         self,
         pub_types: Optional[Union[str, list[str]]] = None,
         latest: bool = False,
+        fields: Optional[list[str]] = None,
+        prefetch: Optional[dict[str, Any]] = None,
     ) -> list[SGEntity]:
         """
         :param pub_types: The names of the Publish File Types to return.
@@ -241,12 +314,17 @@ class SGAsset(SGEntity):
                          - from these get the publishes with the highest "version_number" field
                          - if there are publishes with the same "name" and "version_number" the
                            newest one wins.
+        :param fields: More fields to load for the publishes.
+        :param prefetch: The relationships to prefetch for the publishes.
+                         See :py:meth:`SGSite.prefetch <pyshotgrid.core.SGSite.prefetch>`.
         :return: All published files from this asset.
         """
         return self._publishes(
             base_filter=[["entity", "is", self.to_dict()]],
             pub_types=pub_types,
             latest=latest,
+            fields=fields,
+            prefetch=prefetch,
         )
 
     def tasks(
@@ -254,12 +332,17 @@ class SGAsset(SGEntity):
         names: Optional[list[str]] = None,
         assignee: Optional[Union[dict[str, Any], SGEntity]] = None,
         pipeline_step: Optional[Union[str, dict[str, Any], SGEntity]] = None,
+        fields: Optional[list[str]] = None,
+        prefetch: Optional[dict[str, Any]] = None,
     ) -> list[SGEntity]:
         """
         :param names: The names of Tasks to return.
         :param assignee: The assignee of the tasks to return.
         :param pipeline_step: Name, short name or entity object
                               or the Pipeline Step to filter by.
+        :param fields: More fields to load for the Tasks.
+        :param prefetch: The relationships to prefetch for the Tasks.
+                         See :py:meth:`SGSite.prefetch <pyshotgrid.core.SGSite.prefetch>`.
         :returns: A list of Tasks.
         """
         return self._tasks(
@@ -267,6 +350,8 @@ class SGAsset(SGEntity):
             entity=self.to_dict(),
             assignee=assignee,
             pipeline_step=pipeline_step,
+            fields=fields,
+            prefetch=prefetch,
         )
 
     def versions(
@@ -274,11 +359,16 @@ class SGAsset(SGEntity):
         user: Optional[Union[dict[str, Any], SGEntity]] = None,
         pipeline_step: Optional[Union[str, dict[str, Any], SGEntity]] = None,
         latest: bool = False,
+        fields: Optional[list[str]] = None,
+        prefetch: Optional[dict[str, Any]] = None,
     ) -> list[SGEntity]:
         """
         :param user: The artist assigned to the Versions.
         :param pipeline_step: Name, short name or entity object or the Pipeline Step to filter by.
         :param latest: Whether to return only the latest Version per link/entity.
+        :param fields: More fields to load for the Versions.
+        :param prefetch: The relationships to prefetch for the Versions.
+                         See :py:meth:`SGSite.prefetch <pyshotgrid.core.SGSite.prefetch>`.
         :returns: A list of Versions
         """
         return self._versions(
@@ -286,6 +376,8 @@ class SGAsset(SGEntity):
             user=user,
             pipeline_step=pipeline_step,
             latest=latest,
+            fields=fields,
+            prefetch=prefetch,
         )
 
 
@@ -303,6 +395,8 @@ class SGTask(SGEntity):
 
     DEFAULT_SG_ENTITY_TYPE = "Task"
 
+    __slots__ = ()
+
     @property
     def name(self) -> Field:
         """
@@ -314,6 +408,8 @@ class SGTask(SGEntity):
         self,
         pub_types: Optional[Union[str, list[str]]] = None,
         latest: bool = False,
+        fields: Optional[list[str]] = None,
+        prefetch: Optional[dict[str, Any]] = None,
     ) -> list[SGEntity]:
         """
         :param pub_types: The names of the Publish File Types to return.
@@ -324,12 +420,17 @@ class SGTask(SGEntity):
                         - from these get the publishes with the highest "version_number" field
                         - if there are publishes with the same "name" and "version_number" the
                           newest one wins.
+        :param fields: More fields to load for the publishes.
+        :param prefetch: The relationships to prefetch for the publishes.
+                         See :py:meth:`SGSite.prefetch <pyshotgrid.core.SGSite.prefetch>`.
         :return: All published files from this shot.
         """
         return self._publishes(
             base_filter=[["task", "is", self.to_dict()]],
             pub_types=pub_types,
             latest=latest,
+            fields=fields,
+            prefetch=prefetch,
         )
 
     def versions(
@@ -337,11 +438,16 @@ class SGTask(SGEntity):
         user: Optional[Union[dict[str, Any], SGEntity]] = None,
         pipeline_step: Optional[Union[str, dict[str, Any], SGEntity]] = None,
         latest: bool = False,
+        fields: Optional[list[str]] = None,
+        prefetch: Optional[dict[str, Any]] = None,
     ) -> list[SGEntity]:
         """
         :param user: The artist assigned to the Versions.
         :param pipeline_step: Name, short name or entity object or the Pipeline Step to filter by.
         :param latest: Whether to return only the latest Version per link/entity.
+        :param fields: More fields to load for the Versions.
+        :param prefetch: The relationships to prefetch for the Versions.
+                         See :py:meth:`SGSite.prefetch <pyshotgrid.core.SGSite.prefetch>`.
         :returns: A list of Versions
         """
         return self._versions(
@@ -349,6 +455,8 @@ class SGTask(SGEntity):
             user=user,
             pipeline_step=pipeline_step,
             latest=latest,
+            fields=fields,
+            prefetch=prefetch,
         )
 
 
@@ -366,6 +474,8 @@ class SGPublishedFile(SGEntity):
 
     DEFAULT_SG_ENTITY_TYPE = "PublishedFile"
 
+    __slots__ = ()
+
     @property
     def name(self) -> Field:
         """
@@ -383,44 +493,215 @@ class SGPublishedFile(SGEntity):
         """
         :return: The latest published file of its kind (which might be this same entity).
         """
-        return self.get_all_publishes()[-1]
+        return self.get_publish_chain().latest
 
     def get_next_publishes(self) -> list[SGEntity]:
         """
         :return: The next publishes after this publish.
         """
-        all_publishes = self.get_all_publishes()
-        index = all_publishes.index(self)
-        return all_publishes[index + 1 :]
+        return self.get_publish_chain().next_publishes(self)
 
     def get_previous_publishes(self) -> list[SGEntity]:
         """
         :return: The previous publishes before this publish.
         """
-        all_publishes = self.get_all_publishes()
-        index = all_publishes.index(self)
-        return all_publishes[:index]
+        return self.get_publish_chain().previous_publishes(self)
 
     def get_all_publishes(self) -> list[SGEntity]:
         """
         :return: A list of all the published file versions from lowest to highest version number.
         """
-        this_publish = self.get(["entity", "published_file_type", "name"], raw_values=True)
-        sg_publishes = self.sg.find(
-            "PublishedFile",
-            [
-                ["entity", "is", this_publish["entity"]],
-                ["published_file_type", "is", this_publish["published_file_type"]],
-                ["name", "is", this_publish["name"]],
-            ],
-            ["name", "version_number", "created_at"],
+        return self.get_publish_chain().publishes
+
+    def get_publish_chain(self, refresh: bool = False) -> "PublishChain":
+        """
+        :param refresh: Query the publish chain again, even if it is cached.
+        :return: All the published file versions of this publish.
+                 See :py:func:`load_publish_chains` for details.
+        :raises:
+            :ValueError: When this publish does not exist (anymore) or is retired.
+        """
+        chain = load_publish_chains([self], refresh=refresh)[0]
+        if chain is None:
+            raise ValueError(f"{self} does not exist or is retired.")
+        return chain
+
+
+class PublishChain:
+    """
+    All versions of a published file. These are all publishes with the same "entity",
+    "published_file_type" and "name" field, sorted from the oldest to the latest one.
+    The position of each publish is indexed, so lookups do not depend on the
+    length of the chain.
+    """
+
+    def __init__(self, sg_publishes: list[SGEntity]) -> None:
+        """
+        :param sg_publishes: The publishes of the chain from the oldest to the latest one.
+        """
+        self._publishes = sg_publishes
+        self._positions = {sg_publish.id: index for index, sg_publish in enumerate(sg_publishes)}
+        self._time = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._publishes)
+
+    def __iter__(self) -> Iterator[SGEntity]:
+        return iter(self._publishes)
+
+    def __contains__(self, sg_publish: Any) -> bool:
+        return isinstance(sg_publish, SGEntity) and sg_publish.id in self._positions
+
+    @property
+    def publishes(self) -> list[SGEntity]:
+        """
+        :return: All publishes of the chain from the oldest to the latest one.
+        """
+        return list(self._publishes)
+
+    @property
+    def latest(self) -> SGEntity:
+        """
+        :return: The latest publish of the chain.
+        """
+        return self._publishes[-1]
+
+    def index(self, sg_publish: SGEntity) -> int:
+        """
+        :param sg_publish: A publish of this chain.
+        :return: The position of the publish in the chain.
+        :raises:
+            :ValueError: When the publish is not part of this chain.
+        """
+        try:
+            return self._positions[sg_publish.id]
+        except KeyError:
+            raise ValueError(f"{sg_publish} is not part of this publish chain.") from None
+
+    def next_publishes(self, sg_publish: SGEntity) -> list[SGEntity]:
+        """
+        :param sg_publish: A publish of this chain.
+        :return: The publishes after the given publish.
+        """
+        return self._publishes[self.index(sg_publish) + 1 :]
+
+    def previous_publishes(self, sg_publish: SGEntity) -> list[SGEntity]:
+        """
+        :param sg_publish: A publish of this chain.
+        :return: The publishes before the given publish.
+        """
+        return self._publishes[: self.index(sg_publish)]
+
+
+def load_publish_chains(
+    sg_publishes: list[SGEntity], refresh: bool = False, chunk_size: int = 100
+) -> list[Optional[PublishChain]]:
+    """
+    Get the publish chains of many publishes at once. The chains of all publishes are
+    queried together (one query per ``chunk_size`` chains) and cached for the site, so
+    that calling :py:meth:`SGPublishedFile.is_latest` and friends on the publishes
+    afterwards does not need any more queries::
+
+        >>> sg_publishes = sg_shot.publishes()
+        >>> load_publish_chains(sg_publishes)
+        >>> [sg_publish.is_latest() for sg_publish in sg_publishes]  # no more queries
+
+    The cached chains expire with the
+    :py:attr:`value_cache_ttl <pyshotgrid.core.SGSite.value_cache_ttl>` of the site
+    and are forgotten as soon as pyshotgrid creates or deletes a publish or changes
+    the fields that decide which chain a publish belongs to.
+    Only the chains of the most recently used publishes are kept, see
+    :py:attr:`SGSite.publish_chains <pyshotgrid.core.SGSite.publish_chains>`.
+
+    :param sg_publishes: The publishes to get the chains for. They need to belong to
+                         the same site.
+    :param refresh: Query the chains again, even if they are cached.
+    :param chunk_size: The maximum number of chains per query.
+    :return: The publish chain for each of the given publishes. It is None for publishes
+             that do not exist (anymore) or that are retired.
+    """
+    if not sg_publishes:
+        return []
+    sg = sg_publishes[0].sg
+    sg_site = new_site(sg)
+    ttl = sg_site.value_cache_ttl
+    chains_by_id: dict[int, Optional[PublishChain]] = {}
+    for sg_publish in sg_publishes:
+        chain = None if refresh else sg_site.publish_chains.get(sg_publish.id)
+        if chain is not None and (ttl is None or time.monotonic() - chain._time <= ttl):
+            chains_by_id[sg_publish.id] = chain
+
+    missing_ids = list(
+        dict.fromkeys(
+            sg_publish.id for sg_publish in sg_publishes if sg_publish.id not in chains_by_id
         )
+    )
+    if missing_ids:
+        fields = ["entity", "published_file_type", "name"]
+        # All publishes that share the same values of these fields form a chain.
+        chain_filters = {
+            _publish_chain_key(values): [
+                ["entity", "is", _link_to_dict(values["entity"])],
+                ["published_file_type", "is", _link_to_dict(values["published_file_type"])],
+                ["name", "is", values["name"]],
+            ]
+            for start in range(0, len(missing_ids), chunk_size)
+            for values in sg.find(
+                "PublishedFile", [["id", "in", missing_ids[start : start + chunk_size]]], fields
+            )
+        }
+        chain_filters_list = list(chain_filters.values())
+        for start in range(0, len(chain_filters_list), chunk_size):
+            sg_rows = sg.find(
+                "PublishedFile",
+                [
+                    {
+                        "filter_operator": "any",
+                        "filters": [
+                            {"filter_operator": "all", "filters": filters}
+                            for filters in chain_filters_list[start : start + chunk_size]
+                        ],
+                    }
+                ],
+                [*fields, "version_number", "created_at"],
+                order=[{"field_name": "id", "direction": "asc"}],
+            )
+            chains: dict[tuple[Any, ...], list[dict[str, Any]]] = {}
+            for sg_row in sg_rows:
+                chains.setdefault(_publish_chain_key(sg_row), []).append(sg_row)
+            for sg_rows in chains.values():
+                # sort them by date and than by version_number which sorts the latest
+                # publish to the last position.
+                sg_rows.sort(key=lambda pub: (pub["created_at"], pub["version_number"]))
+                chain = PublishChain([convert_result_to_pysg(sg, sg_row) for sg_row in sg_rows])
+                for sg_publish in chain:
+                    sg_site.publish_chains[sg_publish.id] = chain
+                    chains_by_id[sg_publish.id] = chain
+
+    return [chains_by_id.get(sg_publish.id) for sg_publish in sg_publishes]
+
+
+def _link_to_dict(value: Optional[dict[str, Any]]) -> Optional[dict[str, Any]]:
+    """
+    :param value: The raw value of an entity link field.
+    :return: The type and ID of the linked entity.
+    """
+    if value is None:
+        return None
+    return {"type": value["type"], "id": value["id"]}
 
-        # sort them by date and than by version_number which sorts the latest publish to the
-        # last position.
-        sg_publishes.sort(key=lambda pub: (pub["created_at"], pub["version_number"]))
 
-        return [new_entity(self._sg, sg_publish) for sg_publish in sg_publishes]
+def _publish_chain_key(sg_publish: dict[str, Any]) -> tuple[Any, ...]:
+    """
+    :param sg_publish: The raw values of a publish.
+    :return: The values that all publishes of the same chain have in common.
+    """
+    key: list[Any] = []
+    for field in ("entity", "published_file_type"):
+        value = sg_publish[field]
+        key.append(None if value is None else (value["type"], value["id"]))
+    key.append(sg_publish["name"])
+    return tuple(key)
 
 
 class SGVersion(SGEntity):
@@ -437,6 +718,8 @@ class SGVersion(SGEntity):
 
     DEFAULT_SG_ENTITY_TYPE = "Version"
 
+    __slots__ = ()
+
     @property
     def name(self) -> Field:
         """
@@ -461,6 +744,8 @@ class SGPlaylist(SGEntity):
 
     DEFAULT_SG_ENTITY_TYPE = "Playlist"
 
+    __slots__ = ()
+
     @property
     def name(self) -> Field:
         """
@@ -503,6 +788,8 @@ class SGHumanUser(SGEntity):
 
     DEFAULT_SG_ENTITY_TYPE = "HumanUser"
 
+    __slots__ = ()
+
     # TODO time logs
 
     @property
@@ -517,11 +804,16 @@ class SGHumanUser(SGEntity):
         entity: Optional[Union[dict[str, Any], SGEntity]] = None,
         pipeline_step: Optional[Union[str, dict[str, Any], SGEntity]] = None,
         latest: bool = False,
+        fields: Optional[list[str]] = None,
+        prefetch: Optional[dict[str, Any]] = None,
     ) -> list[SGEntity]:
         """
         :param entity: entity to filter by eg. (Shot, Asset, Project, Task...).
         :param pipeline_step: Name, short name or entity object or the Pipeline Step to filter by.
         :param latest: Whether to return only the latest Version per link/entity.
+        :param fields: More fields to load for the Versions.
+        :param prefetch: The relationships to prefetch for the Versions.
+                         See :py:meth:`SGSite.prefetch <pyshotgrid.core.SGSite.prefetch>`.
         :returns: A list of Versions
         """
         return self._versions(
@@ -529,6 +821,8 @@ class SGHumanUser(SGEntity):
             user=self,
             pipeline_step=pipeline_step,
             latest=latest,
+            fields=fields,
+            prefetch=prefetch,
         )
 
     def tasks(
@@ -536,11 +830,16 @@ class SGHumanUser(SGEntity):
         names: Optional[list[str]] = None,
         entity: Optional[Union[dict[str, Any], SGEntity]] = None,
         pipeline_step: Optional[Union[str, dict[str, Any], SGEntity]] = None,
+        fields: Optional[list[str]] = None,
+        prefetch: Optional[dict[str, Any]] = None,
     ) -> list[SGEntity]:
         """
         :param names: The names of Tasks to return.
         :param entity: entity to filter by eg. (Shot, Asset, Project,...).
         :param pipeline_step: Name, short name or entity object or the Pipeline Step to filter by.
+        :param fields: More fields to load for the Tasks.
+        :param prefetch: The relationships to prefetch for the Tasks.
+                         See :py:meth:`SGSite.prefetch <pyshotgrid.core.SGSite.prefetch>`.
         :returns: A list of Tasks
         """
         return self._tasks(
@@ -548,12 +847,16 @@ class SGHumanUser(SGEntity):
             assignee=self.to_dict(),
             entity=entity,
             pipeline_step=pipeline_step,
+            fields=fields,
+            prefetch=prefetch,
         )
 
     def publishes(
         self,
         pub_types: Optional[Union[str, list[str]]] = None,
         latest: bool = False,
+        fields: Optional[list[str]] = None,
+        prefetch: Optional[dict[str, Any]] = None,
     ) -> list[SGEntity]:
         """
         :param pub_types: The names of the Publish File Types to return.
@@ -564,10 +867,15 @@ class SGHumanUser(SGEntity):
                         - from these get the publishes with the highest "version_number" field
                         - if there are publishes with the same "name" and "version_number" the
                           newest one wins.
+        :param fields: More fields to load for the publishes.
+        :param prefetch: The relationships to prefetch for the publishes.
+                         See :py:meth:`SGSite.prefetch <pyshotgrid.core.SGSite.prefetch>`.
         :return: All published files from this shot.
         """
         return self._publishes(
             base_filter=[["created_by", "is", self.to_dict()]],
             pub_types=pub_types,
             latest=latest,
+            fields=fields,
+            prefetch=prefetch,
         )
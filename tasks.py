@@ -16,6 +16,7 @@ from invoke import task
 ROOT_DIR = Path(__file__).parent
 TEST_DIR = ROOT_DIR / "tests"
 SRC_DIR = ROOT_DIR / "src"
+BENCHMARK_DIR = ROOT_DIR / "benchmarks"
 
 DOC_DIR = ROOT_DIR / "docs"
 DOCS_BUILD_DIR = DOC_DIR / "_builds"
@@ -197,6 +198,20 @@ def coverage(c, open_browser=False):
         webbrowser.open(str(COVERAGE_INDEX))
 
 
+@task(
+    aliases=("bench",),
+    help={
+        "latency": "The number of seconds that every request to the mockgun site takes.",
+    },
+)
+def benchmark(c, latency=0.02):
+    """Measure the wall time and round trips of the hot paths."""
+    c.run(
+        f"python {BENCHMARK_DIR / 'hot_paths.py'} --latency {latency}",
+        env={"PYTHONPATH": str(SRC_DIR)},
+    )
+
+
 @task(
     help={
         "open_browser": "Open the docs in the web browser",
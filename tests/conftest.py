@@ -6,6 +6,8 @@ import sys
 import pytest
 from shotgun_api3.lib import mockgun
 
+_mockgun_compare = mockgun.Shotgun._compare
+
 
 @pytest.fixture(params=(True, False))
 def use_shotgun_api3_from_sgtk(request, monkeypatch):
@@ -164,7 +166,8 @@ def sg():
         # handle the ordering of the recordset
         if order:
             # order: [{"field_name": "code", "direction": "asc"}, ... ]
-            for order_entry in order:
+            # Sort by the last order entry first, so the first one has the highest priority.
+            for order_entry in reversed(order):
                 if "field_name" not in order_entry:
                     raise ValueError(
                         "Order clauses must be list of dicts with keys "
@@ -179,7 +182,25 @@ def sg():
                 else:
                     raise ValueError("Unknown ordering direction")
 
-                results = sorted(results, key=lambda k: k[order_field], reverse=desc_order)
+                results = sorted(
+                    results,
+                    key=lambda k: (
+                        k[order_field] is not None,
+                        k[order_field] if k[order_field] is not None else 0,
+                    ),
+                    reverse=desc_order,
+                )
+
+        # handle the paging of the recordset
+        # Like shotgun_api3, pages are never larger than the records per page of the server.
+        # mockgun has no server info to read the records per page from.
+        records_per_page = self.config._records_per_page or 500
+        if page:
+            page_size = limit if limit and limit <= records_per_page else records_per_page
+            start = (page - 1) * page_size
+            results = results[start : start + page_size]
+        elif limit:
+            results = results[:limit]
 
         if fields is None:
             fields = {"type", "id"}
@@ -196,6 +217,18 @@ def sg():
 
     mockgun.Shotgun.find = patched_find
 
+    # Patching the mockgun.Shotgun._compare method because the "in" operator of
+    # entity fields only matches when all the given entities are the same.
+    def patched_compare(self, field_type, lval, operator, rval):
+        if field_type == "entity" and operator == "in":
+            return lval is not None and any(
+                lval["type"] == sub_rval["type"] and lval["id"] == sub_rval["id"]
+                for sub_rval in rval
+            )
+        return _mockgun_compare(self, field_type, lval, operator, rval)
+
+    mockgun.Shotgun._compare = patched_compare
+
     return sg
 
 
@@ -0,0 +1,81 @@
+"""Tests for `pyshotgrid.aio` module."""
+
+import asyncio
+import threading
+from unittest import mock
+
+import pytest
+
+import pyshotgrid as pysg
+from pyshotgrid.aio import AsyncField, AsyncSGEntity, AsyncSGSite
+
+
+def test_async_site__find(sg):
+    sg_site = AsyncSGSite(pysg.new_site(sg))
+
+    result = asyncio.run(sg_site.find("Asset", [["code", "contains", "Car"]]))
+
+    assert all(isinstance(sg_asset, AsyncSGEntity) for sg_asset in result)
+    assert [sg_asset.sync for sg_asset in result] == pysg.new_site(sg).find(
+        "Asset", [["code", "contains", "Car"]]
+    )
+
+
+def test_async_entity__default_entity_methods(sg):
+    sg_project = AsyncSGEntity(pysg.new_entity(sg, 1, "Project"))
+
+    async def shot_codes():
+        sg_shots = await sg_project.shots()
+        return await asyncio.gather(*(sg_shot["code"].get() for sg_shot in sg_shots))
+
+    result = asyncio.run(shot_codes())
+
+    assert result == ["sq111_sh1111", "sq111_sh2222", "sq222_sh3333", "sq222_sh4444"]
+
+
+def test_async_entity__properties(sg):
+    sg_asset = AsyncSGEntity(pysg.new_entity(sg, 1, "Asset"))
+
+    result = asyncio.run(sg_asset.name)
+
+    assert isinstance(result, AsyncField)
+    assert result.name == "code"
+    assert result.entity == sg_asset
+    assert sg_asset.id == 1
+    assert sg_asset.type == "Asset"
+
+
+def test_async_field__keeps_cached_values(sg):
+    pysg.new_site(sg).value_cache_ttl = 60
+    sg_shot = pysg.new_entity(sg, 1, "Shot")
+
+    asyncio.run(AsyncSGEntity(sg_shot)["code"].get())
+
+    assert sg_shot._cached_value("code") == "sq111_sh1111"
+
+
+def test_async_site__cancel(sg):
+    sg_site = AsyncSGSite(pysg.new_site(sg), max_workers=1)
+    release = threading.Event()
+    find = sg.find
+
+    def blocking_find(*args, **kwargs):
+        release.wait(1)
+        return find(*args, **kwargs)
+
+    async def run():
+        blocking = asyncio.ensure_future(sg_site.find("Asset", []))
+        await asyncio.sleep(0.05)
+        queued = asyncio.ensure_future(sg_site.find("Shot", []))
+        await asyncio.sleep(0.05)
+        queued.cancel()
+        await asyncio.sleep(0.05)
+        release.set()
+        await blocking
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+
+    with mock.patch.object(sg, "find", side_effect=blocking_find) as mock_find:
+        asyncio.run(run())
+
+    assert mock_find.call_count == 1
@@ -0,0 +1 @@
+"""Tests for `pyshotgrid.columnar` module."""
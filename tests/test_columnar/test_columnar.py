@@ -0,0 +1,102 @@
+import datetime
+
+import pytest
+
+import pyshotgrid as pysg
+
+np = pytest.importorskip("numpy")
+
+from pyshotgrid import columnar  # noqa: E402
+
+
+def test_find_columns(sg):
+    sg.update("Version", 4, {"sg_status_list": None})
+    sg_site = pysg.new_site(sg)
+
+    result = sg_site.find_columns(
+        "Version",
+        [["project", "is", {"type": "Project", "id": 1}]],
+        ["code", "created_at", "entity", "sg_status_list"],
+        page_size=3,
+    )
+
+    assert ["id", "code", "created_at", "entity", "sg_status_list"] == list(result)
+    assert [1, 2, 3, 4] == result["id"].tolist()
+    assert ["sh1111_city_v001", "sh1111_city_v002", "Tree_mdl_v001", "Tree_mdl_v001"] == result[
+        "code"
+    ].tolist()
+    assert np.datetime64("2000-01-02T12:00:00", "us") == result["created_at"][1]
+    assert isinstance(result["entity"], columnar.EntityColumn)
+    assert [
+        {"type": "Shot", "id": 1},
+        {"type": "Shot", "id": 1},
+        {"type": "Asset", "id": 1},
+        None,
+    ] == result["entity"].to_list()
+    assert [1, 1, 1] == result["entity"].ids.compressed().tolist()
+    assert isinstance(result["sg_status_list"], columnar.CategoricalColumn)
+    assert ["wtg", "wtg", "wtg", None] == result["sg_status_list"].to_list()
+    assert {"wtg": 3} == result["sg_status_list"].value_counts()
+
+
+def test_find_columns__numbers_and_categories(sg):
+    sg.update("Task", 1, {"duration": 600, "sg_status_list": "ip"})
+    sg.update("Task", 2, {"duration": 120, "sg_status_list": "fin"})
+    sg.update("Task", 3, {"sg_status_list": "ip"})
+    sg_site = pysg.new_site(sg)
+
+    result = sg_site.find_columns("Task", [], ["duration", "sg_status_list"], page_size=2)
+
+    assert 720 == result["duration"].sum()
+    assert [False, False, True, True, True] == np.ma.getmaskarray(result["duration"]).tolist()
+    assert {"ip": 2, "fin": 1, "wtg": 2} == result["sg_status_list"].value_counts()
+    assert ["ip", "fin", "ip", "wtg", "wtg"] == result["sg_status_list"].to_list()
+
+
+def test_find_columns__converts_datetimes_to_utc(sg):
+    created_at = datetime.datetime(
+        2000, 1, 1, 14, 0, tzinfo=datetime.timezone(datetime.timedelta(hours=2))
+    )
+    sg.update("Version", 1, {"created_at": created_at})
+
+    result = pysg.new_site(sg).find_columns("Version", [["id", "is", 1]], ["created_at"])
+
+    assert [np.datetime64("2000-01-01T12:00:00", "us")] == result["created_at"].tolist()
+
+
+def test_find_columns__limit(sg):
+    result = pysg.new_site(sg).find_columns("Task", [], ["content"], limit=3, page_size=2)
+
+    assert [1, 2, 3] == result["id"].tolist()
+    assert ["comp", "comp", "lighting"] == result["content"].tolist()
+
+
+def test_find_columns__no_results(sg):
+    result = pysg.new_site(sg).find_columns(
+        "Task", [["id", "is", 0]], ["duration", "sg_status_list", "entity", "content"]
+    )
+
+    assert {"id": 0, "duration": 0, "sg_status_list": 0, "entity": 0, "content": 0} == {
+        field: len(column) for field, column in result.items()
+    }
+
+
+def test_find_columns__arrow(sg):
+    pa = pytest.importorskip("pyarrow")
+    sg.update("Task", 1, {"duration": 600})
+
+    result = pysg.new_site(sg).find_columns(
+        "Task", [], ["duration", "sg_status_list", "entity", "start_date"], output="arrow"
+    )
+
+    assert isinstance(result, pa.Table)
+    assert pa.int64() == result.schema.field("duration").type
+    assert pa.types.is_dictionary(result.schema.field("sg_status_list").type)
+    assert pa.date32() == result.schema.field("start_date").type
+    assert [600, None, None, None, None] == result.column("duration").to_pylist()
+    assert {"type": "Asset", "id": 1} == result.column("entity").to_pylist()[3]
+
+
+def test_find_columns__unknown_output(sg):
+    with pytest.raises(ValueError):
+        pysg.new_site(sg).find_columns("Task", [], ["content"], output="pandas")
@@ -1,5 +1,7 @@
 """Tests for `pyshotgrid.core` module."""
 
+import threading
+import time
 import unittest.mock
 
 import pytest
@@ -36,6 +38,118 @@ def test_convert_filters_to_dict__list_of_non_entity_values(sg):
     assert [["priority", "in", [10, 20, 30]]] == result
 
 
+def test_convert_filters_to_dict__nested_groups(sg):
+    person = pysg.SGEntity(sg, entity_type="HumanUser", entity_id=1)
+    shot = pysg.SGEntity(sg, entity_type="Shot", entity_id=2)
+    filters = [
+        ["created_by", "is", person],
+        {
+            "filter_operator": "any",
+            "filters": [
+                ["entity", "in", [shot]],
+                {"filter_operator": "all", "filters": [["updated_by", "is", person]]},
+            ],
+        },
+    ]
+
+    result = pysg.core.convert_filters_to_dict(filters)
+
+    assert result == [
+        ["created_by", "is", {"type": "HumanUser", "id": 1}],
+        {
+            "filter_operator": "any",
+            "filters": [
+                ["entity", "in", [{"type": "Shot", "id": 2}]],
+                {
+                    "filter_operator": "all",
+                    "filters": [["updated_by", "is", {"type": "HumanUser", "id": 1}]],
+                },
+            ],
+        },
+    ]
+    # The given filters are not modified.
+    assert filters[0][2] is person
+    assert filters[1]["filters"][0][2] == [shot]
+    assert filters[1]["filters"][1]["filters"][0][2] is person
+
+
+def test_convert_filters_to_dict__between_values(sg):
+    result = pysg.core.convert_filters_to_dict([["id", "between", 1, 5]])
+
+    assert result == [["id", "between", 1, 5]]
+
+
+def test_compile_filters__bind(sg):
+    shot_a = pysg.new_entity(sg, 1, "Shot")
+    shot_b = pysg.new_entity(sg, 2, "Shot")
+    person = pysg.new_entity(sg, 1, "HumanUser")
+    compiled = pysg.compile_filters(
+        [
+            ["created_by", "is", person],
+            {
+                "filter_operator": "any",
+                "filters": [
+                    ["entity", "is", pysg.Param("shot")],
+                    ["code", "in", pysg.Param("codes")],
+                ],
+            },
+        ]
+    )
+
+    result_a = compiled.bind(shot=shot_a, codes=["a", "b"])
+    result_b = compiled.bind(shot=shot_b, codes=[])
+
+    assert compiled.params == {"shot", "codes"}
+    assert result_a == [
+        ["created_by", "is", {"type": "HumanUser", "id": 1}],
+        {
+            "filter_operator": "any",
+            "filters": [["entity", "is", {"type": "Shot", "id": 1}], ["code", "in", ["a", "b"]]],
+        },
+    ]
+    assert result_b[1]["filters"][0][2] == {"type": "Shot", "id": 2}
+    # Parts without placeholders are shared between bound filters.
+    assert result_a[0] is result_b[0]
+
+
+def test_compile_filters__bound_filters_are_converted_after_changes(sg):
+    sg_shot = pysg.new_entity(sg, 1, "Shot")
+    compiled = pysg.compile_filters([["code", "is", pysg.Param("code")]])
+
+    filters = compiled.bind(code="sh010")
+    filters.append(["entity", "is", sg_shot])
+
+    assert pysg.core.convert_filters_to_dict(filters) == [
+        ["code", "is", "sh010"],
+        ["entity", "is", {"type": "Shot", "id": 1}],
+    ]
+
+
+def test_compile_filters__bind_without_params(sg):
+    compiled = pysg.compile_filters([["code", "is", "sq111_sh1111"]])
+
+    assert compiled.bind() == [["code", "is", "sq111_sh1111"]]
+
+
+def test_compile_filters__bind_wrong_values(sg):
+    compiled = pysg.compile_filters([["entity", "is", pysg.Param("shot")]])
+
+    with pytest.raises(TypeError):
+        compiled.bind()
+    with pytest.raises(TypeError):
+        compiled.bind(shot=None, asset=None)
+
+
+def test_compile_filters__find(sg):
+    sg_site = pysg.new_site(sg)
+    shot_tasks = pysg.compile_filters([["entity", "is", pysg.Param("shot")]])
+
+    for sg_shot in sg_site.find("Shot", []):
+        result = sg_site.find("Task", shot_tasks.bind(shot=sg_shot))
+
+        assert result == sg_site.find("Task", [["entity", "is", sg_shot]])
+
+
 def test_convert_value_to_pysg__no_entity_value(sg):
     example_value = "some other value than an entity"
 
@@ -196,3 +310,69 @@ def test_register_sg_site_class__add_custom_class(sg):
 def test_register_sg_site_class__errors_on_invalid_class(sg):
     with pytest.raises(TypeError):
         pysg.register_sg_site_class(str)  # type: ignore
+
+
+def test_new_site__pool_size(sg):
+    sg_site = pysg.new_site(sg, pool_size=2)
+
+    sg_shot = sg_site.find_one("Shot", [["id", "is", 1]])
+    code = sg_shot["code"].get()
+
+    assert isinstance(sg_site.sg, pysg.PooledShotgun)
+    assert sg_shot.sg is sg_site.sg
+    assert code == "sq111_sh1111"
+    assert sg_site.sg.metrics["checkouts"] == 2
+    assert sg_site.sg.metrics["connections"] == 1
+    assert sg_site.sg.metrics["reuses"] == 2
+    assert pysg.new_site(sg_site.sg) == sg_site
+
+
+def test_pooled_shotgun__waits_for_idle_connection(sg):
+    pooled_sg = pysg.PooledShotgun(sg, pool_size=1)
+    results = []
+
+    def find_shots():
+        results.append(pooled_sg.find("Shot", []))
+
+    with pooled_sg.connection():
+        thread = threading.Thread(target=find_shots)
+        thread.start()
+        time.sleep(0.05)
+    thread.join()
+
+    assert len(results[0]) == 4
+    assert pooled_sg.metrics["waits"] == 1
+    assert pooled_sg.metrics["wait_time"] > 0
+
+
+def test_pooled_shotgun__wait_timeout(sg):
+    pooled_sg = pysg.PooledShotgun(sg, pool_size=1, wait_timeout=0.01)
+    errors = []
+
+    def find_shots():
+        try:
+            pooled_sg.find("Shot", [])
+        except RuntimeError as error:
+            errors.append(error)
+
+    with pooled_sg.connection():
+        thread = threading.Thread(target=find_shots)
+        thread.start()
+        thread.join()
+
+    assert len(errors) == 1
+
+
+def test_pooled_shotgun__opens_connections_when_busy(sg):
+    pooled_sg = pysg.PooledShotgun(sg, pool_size=2)
+
+    with pooled_sg.connection() as sg_a:
+        thread = threading.Thread(target=pooled_sg.find, args=("Shot", []))
+        thread.start()
+        thread.join()
+        with pooled_sg.connection() as sg_b:
+            pass
+
+    assert sg_a is sg_b
+    assert pooled_sg.metrics["connections"] == 2
+    assert pooled_sg.metrics["waits"] == 0
@@ -1,5 +1,10 @@
 """Tests for `pyshotgrid` core.Field class."""
 
+import io
+import urllib.error
+
+import pytest
+
 import pyshotgrid as pysg
 
 
@@ -155,3 +160,244 @@ def test_batch_update_dict(sg):
         "entity_id": 1,
         "data": {"name": "FooBar"},
     } == result
+
+
+def test_get__cached_value(sg):
+    sg_shot = pysg.new_site(sg).find_one("Shot", [["id", "is", 1]], fields=["code"])
+    finds_before = sg.finds
+
+    result = sg_shot["code"].get()
+
+    assert result == "sq111_sh1111"
+    assert sg.finds == finds_before
+
+
+def test_refresh(sg):
+    pysg.new_site(sg).value_cache_ttl = 60
+    sg_project = pysg.new_entity(sg, 1, "Project")
+    sg_name_field = pysg.core.Field("name", sg_project)
+    sg_name_field.get()
+    sg.update("Project", 1, {"name": "Changed Name"})
+
+    sg_name_field.refresh()
+
+    assert sg_name_field.get() == "Changed Name"
+
+
+class FakeResponse(io.BytesIO):
+    def __init__(self, url, content, status=200, headers=None):
+        super().__init__(content)
+        self.url = url
+        self.status = status
+        self.headers = {"Content-Length": str(len(content)), **(headers or {})}
+
+    def geturl(self):
+        return self.url
+
+
+class FakeOpener:
+    """Serves a file like a web server that supports range requests."""
+
+    def __init__(self, content, resolved_url=None, ranges=True):
+        self.content = content
+        self.resolved_url = resolved_url
+        self.ranges = ranges
+        self.requests = []
+        self.chunk_sizes = []
+
+    def open(self, request, timeout=None):
+        self.requests.append(request.get_header("Range"))
+        url = self.resolved_url or request.full_url
+        headers = {"Accept-Ranges": "bytes"} if self.ranges else {}
+        byte_range = request.get_header("Range")
+        if byte_range and self.ranges:
+            start = int(byte_range[len("bytes=") : -1])
+            if start >= len(self.content):
+                raise urllib.error.HTTPError(url, 416, "Range Not Satisfiable", {}, None)
+            headers["Content-Range"] = f"bytes {start}-{len(self.content) - 1}/{len(self.content)}"
+            response = FakeResponse(url, self.content[start:], 206, headers)
+        else:
+            response = FakeResponse(url, self.content, 200, headers)
+        read = response.read
+
+        def record_read(size=-1):
+            self.chunk_sizes.append(size)
+            return read(size)
+
+        response.read = record_read
+        return response
+
+
+def test_stream_url__writes_chunks(tmp_path):
+    opener = FakeOpener(b"0123456789")
+    location = str(tmp_path / "thumb.jpg")
+
+    result = pysg.core._stream_url(opener, "https://cdn/thumb.jpg", location, chunk_size=4)
+
+    assert result == location
+    assert (tmp_path / "thumb.jpg").read_bytes() == b"0123456789"
+    assert set(opener.chunk_sizes) == {4}
+    assert not (tmp_path / "thumb.jpg.part").exists()
+
+
+def test_stream_url__appends_url_extension(tmp_path):
+    opener = FakeOpener(b"0123456789", resolved_url="https://cdn/some/thumb.png?sig=1")
+
+    result = pysg.core._stream_url(
+        opener, "https://test/thumbnail/Shot/1", str(tmp_path / "thumb"), use_url_extension=True
+    )
+
+    assert result == str(tmp_path / "thumb.png")
+    assert (tmp_path / "thumb.png").read_bytes() == b"0123456789"
+
+
+def test_stream_url__skips_existing_file(tmp_path):
+    opener = FakeOpener(b"0123456789")
+    (tmp_path / "thumb.jpg").write_bytes(b"abcdefghij")
+
+    pysg.core._stream_url(opener, "https://cdn/thumb.jpg", str(tmp_path / "thumb.jpg"))
+
+    assert (tmp_path / "thumb.jpg").read_bytes() == b"abcdefghij"
+    assert opener.chunk_sizes == []
+
+
+def test_stream_url__replaces_file_with_wrong_size(tmp_path):
+    opener = FakeOpener(b"0123456789")
+    (tmp_path / "thumb.jpg").write_bytes(b"abc")
+
+    pysg.core._stream_url(opener, "https://cdn/thumb.jpg", str(tmp_path / "thumb.jpg"))
+
+    assert (tmp_path / "thumb.jpg").read_bytes() == b"0123456789"
+
+
+@pytest.mark.parametrize("use_url_extension", [False, True])
+def test_stream_url__resumes_partial_download(tmp_path, use_url_extension):
+    opener = FakeOpener(b"0123456789", resolved_url="https://cdn/thumb.jpg")
+    (tmp_path / "thumb.jpg.part").write_bytes(b"0123")
+    location = str(tmp_path / "thumb" if use_url_extension else tmp_path / "thumb.jpg")
+
+    pysg.core._stream_url(
+        opener, "https://cdn/thumb.jpg", location, use_url_extension=use_url_extension
+    )
+
+    assert (tmp_path / "thumb.jpg").read_bytes() == b"0123456789"
+    assert opener.requests[-1] == "bytes=4-"
+
+
+def test_stream_url__restarts_when_range_is_not_supported(tmp_path):
+    opener = FakeOpener(b"0123456789", ranges=False)
+    (tmp_path / "thumb.jpg.part").write_bytes(b"xxxx")
+
+    pysg.core._stream_url(opener, "https://cdn/thumb.jpg", str(tmp_path / "thumb.jpg"))
+
+    assert (tmp_path / "thumb.jpg").read_bytes() == b"0123456789"
+
+
+def test_stream_url__restarts_when_partial_file_is_too_large(tmp_path):
+    opener = FakeOpener(b"0123456789")
+    (tmp_path / "thumb.jpg.part").write_bytes(b"0123456789xx")
+
+    pysg.core._stream_url(opener, "https://cdn/thumb.jpg", str(tmp_path / "thumb.jpg"))
+
+    assert (tmp_path / "thumb.jpg").read_bytes() == b"0123456789"
+
+
+def test_stream_url__keeps_incomplete_download(tmp_path):
+    opener = FakeOpener(b"0123456789")
+    opener.open = lambda request, timeout=None: FakeResponse(
+        "https://cdn/thumb.jpg", b"01234", headers={"Content-Length": "10"}
+    )
+
+    with pytest.raises(RuntimeError):
+        pysg.core._stream_url(opener, "https://cdn/thumb.jpg", str(tmp_path / "thumb.jpg"))
+
+    assert (tmp_path / "thumb.jpg.part").read_bytes() == b"01234"
+    assert not (tmp_path / "thumb.jpg").exists()
+
+
+def test_url_opener__authenticates_server_urls(sg):
+    state = pysg.core._site_state(sg)
+    sg.get_session_token = lambda: "my_session"
+
+    server_opener = state.url_opener("https://test.shotgunstudio.com/thumbnail/Shot/1")
+    other_opener = state.url_opener("https://cdn.example.com/thumb.jpg")
+
+    assert server_opener is state.url_opener("https://test.shotgunstudio.com/file_serve/1")
+    assert other_opener is not server_opener
+    cookie_processors = [
+        handler
+        for handler in server_opener.handlers
+        if isinstance(handler, pysg.core.urllib.request.HTTPCookieProcessor)
+    ]
+    assert [cookie.value for cookie in cookie_processors[0].cookiejar] == ["my_session"]
+    assert not any(
+        isinstance(handler, pysg.core.urllib.request.HTTPCookieProcessor)
+        for handler in other_opener.handlers
+    )
+
+
+def test_stream_url__renews_rejected_session(tmp_path):
+    opener = FakeOpener(b"0123456789")
+    open_url = opener.open
+    responses = iter(
+        [urllib.error.HTTPError("https://test.shotgunstudio.com/1", 401, "", {}, None)]
+    )
+
+    def reject_once(request, timeout=None):
+        error = next(responses, None)
+        if error is not None:
+            raise error
+        return open_url(request, timeout)
+
+    opener.open = reject_once
+    renewed = []
+
+    pysg.core._stream_url(
+        opener,
+        "https://test.shotgunstudio.com/1",
+        str(tmp_path / "thumb.jpg"),
+        renew_session=lambda url: renewed.append(url) or True,
+    )
+
+    assert renewed == ["https://test.shotgunstudio.com/1"]
+    assert (tmp_path / "thumb.jpg").read_bytes() == b"0123456789"
+
+
+def test_stream_url__rejected_session_is_renewed_once(tmp_path):
+    opener = FakeOpener(b"0123456789")
+
+    def reject(request, timeout=None):
+        raise urllib.error.HTTPError(request.full_url, 403, "Forbidden", {}, None)
+
+    opener.open = reject
+    renewed = []
+
+    with pytest.raises(RuntimeError):
+        pysg.core._stream_url(
+            opener,
+            "https://test.shotgunstudio.com/1",
+            str(tmp_path / "thumb.jpg"),
+            renew_session=lambda url: renewed.append(url) or True,
+        )
+
+    assert len(renewed) == 1
+
+
+def test_renew_session_cookie(sg):
+    state = pysg.core._site_state(sg)
+    sg.config.script_name = "Unittest User"
+    sg.get_session_token = lambda: "my_session"
+    opener = state.url_opener("https://test.shotgunstudio.com/thumbnail/Shot/1")
+    sg.get_session_token = lambda: "new_session"
+
+    renewed = state.renew_session_cookie("https://test.shotgunstudio.com/thumbnail/Shot/1")
+    not_renewed = state.renew_session_cookie("https://cdn.example.com/thumb.jpg")
+
+    assert renewed
+    assert not not_renewed
+    cookie_processor = next(
+        handler
+        for handler in opener.handlers
+        if isinstance(handler, pysg.core.urllib.request.HTTPCookieProcessor)
+    )
+    assert [cookie.value for cookie in cookie_processor.cookiejar] == ["new_session"]
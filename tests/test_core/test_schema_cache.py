@@ -0,0 +1,226 @@
+"""Tests for `pyshotgrid.core.SchemaCache` class."""
+
+import gc
+import json
+import weakref
+from unittest import mock
+
+from shotgun_api3.lib import mockgun
+
+import pyshotgrid as pysg
+
+
+def test_field_schema(sg):
+    schema_cache = pysg.SchemaCache(sg)
+
+    result = schema_cache.field_schema("Project", "name")
+
+    assert result["data_type"]["value"] == "text"
+
+
+def test_field_schemas__read_once(sg):
+    schema_cache = pysg.SchemaCache(sg)
+
+    with mock.patch.object(
+        mockgun.Shotgun, "schema_field_read", wraps=sg.schema_field_read
+    ) as mock_read:
+        schema_cache.field_schemas("Shot")
+        schema_cache.field_schemas("Shot")
+        schema_cache.field_schema("Shot", "code")
+
+    assert mock_read.call_count == 1
+
+
+def test_field_schemas__ttl_expired(sg):
+    schema_cache = pysg.SchemaCache(sg, ttl=0)
+
+    with mock.patch.object(
+        mockgun.Shotgun, "schema_field_read", wraps=sg.schema_field_read
+    ) as mock_read:
+        schema_cache.field_schemas("Shot")
+        schema_cache.field_schemas("Shot")
+
+    assert mock_read.call_count == 2
+
+
+def test_invalidate(sg):
+    schema_cache = pysg.SchemaCache(sg)
+
+    with mock.patch.object(
+        mockgun.Shotgun, "schema_field_read", wraps=sg.schema_field_read
+    ) as mock_read:
+        schema_cache.field_schemas("Shot")
+        schema_cache.field_schemas("Asset")
+        schema_cache.invalidate("Shot")
+        schema_cache.field_schemas("Shot")
+        schema_cache.field_schemas("Asset")
+
+    assert mock_read.call_count == 3
+
+
+def test_site_schema__fills_field_schemas(sg):
+    schema_cache = pysg.SchemaCache(sg)
+
+    result = schema_cache.site_schema()
+
+    with mock.patch.object(mockgun.Shotgun, "schema_field_read") as mock_read:
+        schema_cache.field_schemas("Shot")
+    assert "Shot" in result
+    mock_read.assert_not_called()
+
+
+def test_entity_schemas(sg):
+    schema_cache = pysg.SchemaCache(sg)
+
+    result = schema_cache.entity_schemas()
+
+    assert result["CustomEntity01"]["name"]["value"] == "Sprint"
+
+
+def test_shared_between_pysg_objects(sg):
+    sg_site = pysg.new_site(sg)
+    sg_shot = pysg.new_entity(sg, 1, "Shot")
+
+    with mock.patch.object(
+        mockgun.Shotgun, "schema_field_read", wraps=sg.schema_field_read
+    ) as mock_read:
+        _ = sg_shot["code"].data_type
+        _ = sg_shot["code"].display_name
+        _ = pysg.FieldSchema(sg, "Shot", "sg_status_list").properties
+        _ = sg_shot.field_schemas()
+
+    assert sg_site.schema_cache is sg_shot.site.schema_cache
+    assert mock_read.call_count == 1
+
+
+def test_update_schema_invalidates_cache(sg):
+    sg_field_schema = pysg.FieldSchema(sg, "Shot", "code")
+    schema_cache = pysg.new_site(sg).schema_cache
+    schema_cache.field_schemas("Shot")
+
+    with mock.patch.object(mockgun.Shotgun, "schema_field_update", create=True):
+        sg_field_schema.description = "A new description"
+
+    assert ("Shot", None) not in schema_cache._field_schemas
+
+
+def test_site_state_does_not_keep_shotgun_alive():
+    sg = mockgun.Shotgun("https://test.shotgunstudio.com", "test_script", "$ecret")
+    pysg.new_site(sg).schema_cache.entity_schemas()
+    sg_ref = weakref.ref(sg)
+
+    del sg
+    gc.collect()
+
+    assert sg_ref() is None
+
+
+def test_save_and_load(sg, tmp_path):
+    snapshot_path = str(tmp_path / "schema.json")
+    pysg.SchemaCache(sg).save(snapshot_path)
+    schema_cache = pysg.SchemaCache(sg)
+
+    result = schema_cache.load(snapshot_path)
+
+    with mock.patch.object(mockgun.Shotgun, "schema_field_read") as mock_read:
+        field_schema = schema_cache.field_schema("Project", "name")
+    assert result
+    assert field_schema["data_type"]["value"] == "text"
+    mock_read.assert_not_called()
+
+
+def test_load__missing_file(sg, tmp_path):
+    schema_cache = pysg.SchemaCache(sg)
+
+    result = schema_cache.load(str(tmp_path / "not_existing.json"))
+
+    assert not result
+
+
+def test_load__other_site(sg, tmp_path):
+    snapshot_path = str(tmp_path / "schema.json")
+    pysg.SchemaCache(sg).save(snapshot_path)
+    other_sg = mockgun.Shotgun(
+        base_url="https://other.shotgunstudio.com",
+        script_name="Unittest User",
+        api_key="$ome_password",
+    )
+
+    result = pysg.SchemaCache(other_sg).load(snapshot_path)
+
+    assert not result
+
+
+def test_refresh(sg, tmp_path):
+    snapshot_path = str(tmp_path / "schema.json")
+    schema_cache = pysg.SchemaCache(sg)
+
+    schema_cache.refresh_in_background(snapshot_path).join()
+
+    assert pysg.SchemaCache(sg).load(snapshot_path)
+    assert "Shot" in schema_cache.site_schema()
+
+
+def test_new_site__schema_cache_dir(sg, tmp_path):
+    snapshot_path = pysg.schema_snapshot_path(str(tmp_path), sg.base_url)
+    pysg.SchemaCache(sg).save(snapshot_path)
+
+    with mock.patch.object(pysg.SchemaCache, "refresh_in_background") as mock_refresh:
+        sg_site = pysg.new_site(sg, schema_cache_dir=str(tmp_path))
+
+    assert ("Shot", None) in sg_site.schema_cache._field_schemas
+    mock_refresh.assert_not_called()
+
+
+def test_new_site__schema_cache_dir_without_snapshot(sg, tmp_path):
+    with mock.patch.object(pysg.SchemaCache, "refresh_in_background") as mock_refresh:
+        pysg.new_site(sg, schema_cache_dir=str(tmp_path))
+
+    mock_refresh.assert_called_once_with(pysg.schema_snapshot_path(str(tmp_path), sg.base_url))
+
+
+def test_schema_snapshot_path():
+    result = pysg.schema_snapshot_path("/tmp", "https://test.shotgunstudio.com")
+
+    assert result == "/tmp/https_test.shotgunstudio.com.json"
+
+
+def test_load__changed_entity_types(sg, tmp_path):
+    snapshot_path = str(tmp_path / "schema.json")
+    pysg.SchemaCache(sg).save(snapshot_path)
+    entity_schemas = dict(sg.schema_entity_read())
+    entity_schemas["NewEntityType"] = {}
+
+    with mock.patch.object(mockgun.Shotgun, "schema_entity_read", return_value=entity_schemas):
+        result = pysg.SchemaCache(sg).load(snapshot_path)
+
+    assert not result
+
+
+def test_load__signature_mismatch(sg, tmp_path):
+    snapshot_path = str(tmp_path / "schema.json")
+    pysg.SchemaCache(sg).save(snapshot_path)
+    with open(snapshot_path) as f:
+        snapshot = json.load(f)
+    snapshot["site_schema"]["Shot"].pop("code")
+    with open(snapshot_path, "w") as f:
+        json.dump(snapshot, f)
+
+    result = pysg.SchemaCache(sg).load(snapshot_path)
+
+    assert not result
+
+
+def test_refresh_in_background__error(sg, caplog):
+    schema_cache = pysg.SchemaCache(sg)
+    error = RuntimeError("Connection lost")
+
+    with mock.patch.object(pysg.SchemaCache, "refresh", side_effect=error):
+        schema_cache.refresh_in_background().join()
+
+    assert schema_cache.refresh_error is error
+    assert "Refreshing the schema" in caplog.text
+
+    schema_cache.refresh_in_background().join()
+
+    assert schema_cache.refresh_error is None
@@ -99,6 +99,37 @@ def test_name(sg):
     assert "name" == result_tag_name_field.name
 
 
+def test_name__uses_schema_and_caches_value(sg):
+    sg_asset = pysg.new_entity(sg, 1, "Asset")
+    sg_project = pysg.new_entity(sg, 1, "Project")
+    pysg.new_site(sg).schema_cache.site_schema()
+
+    with mock.patch.object(mockgun.Shotgun, "find", wraps=sg.find) as mock_find:
+        asset_name_field = sg_asset.name
+        asset_queries = mock_find.call_count
+        project_name = sg_project.name.get()
+
+    assert asset_name_field.name == "code"
+    assert asset_queries == 0
+    assert project_name == "Test Project A"
+    assert mock_find.call_count == 1
+
+
+def test_name__caches_value_without_ttl(sg):
+    sg_department = pysg.new_site(sg).create("Department", {"code": "comp"})
+    sg_department.clear_cache()
+
+    with mock.patch.object(mockgun.Shotgun, "find", wraps=sg.find) as mock_find:
+        name_field = sg_department.name
+        name = name_field.get()
+
+    assert name_field.name == "code"
+    assert name == "comp"
+    assert mock_find.call_count == 1
+    # Cleanup
+    sg.delete("Department", sg_department.id)
+
+
 def test_thumbnail(sg):
     sg_task = pysg.new_entity(sg, 1, "Task")
 
@@ -573,6 +604,50 @@ def test_publishes__latest(sg):
         assert "Rendered Image" == pub["published_file_type"].get()["code"].get()
 
 
+def test_publishes__latest__without_summarize_for_a_single_page(sg):
+    sg_project = pysg.new_entity(sg, 1, "Project")
+
+    with (
+        mock.patch.object(sg, "summarize", create=True) as mock_summarize,
+        mock.patch.object(mockgun.Shotgun, "find", wraps=sg.find) as mock_find,
+    ):
+        result = sg_project._publishes(
+            base_filter=[["project", "is", sg_project.to_dict()]], latest=True
+        )
+
+    assert [pub["code"].get() for pub in result] == ["CarA_mdl_v003.abc", "sh1111_city_v005.abc"]
+    mock_summarize.assert_not_called()
+    assert mock_find.call_count == 1
+
+
+def test_publishes__latest__one_query_per_name(sg, monkeypatch):
+    sg_project = pysg.new_entity(sg, 1, "Project")
+    expected = sg_project._publishes(
+        base_filter=[["project", "is", sg_project.to_dict()]], latest=True
+    )
+    summary = {
+        "summaries": {"id": 600},
+        "groups": [
+            {"group_name": "CarA_mdl", "group_value": "CarA_mdl", "summaries": {"id": 300}},
+            {"group_name": "sh1111_city", "group_value": "sh1111_city", "summaries": {"id": 300}},
+        ],
+    }
+
+    # The publishes do not fit on a single page.
+    monkeypatch.setattr(sg.config, "_records_per_page", 2)
+
+    with mock.patch.object(sg, "summarize", create=True, return_value=summary):
+        with mock.patch.object(mockgun.Shotgun, "find", wraps=sg.find) as mock_find:
+            result = sg_project._publishes(
+                base_filter=[["project", "is", sg_project.to_dict()]], latest=True
+            )
+
+    assert result == expected
+    assert [pub["code"].get() for pub in result] == ["CarA_mdl_v003.abc", "sh1111_city_v005.abc"]
+    # The first page and one query per name.
+    assert mock_find.call_count == 3
+
+
 def test_tasks__name(sg):
     sg_user = pysg.SGEntity(sg, 1, "HumanUser")
 
@@ -799,3 +874,176 @@ def test_versions__pipeline_step_errors_with_wrong_type(sg):
     with pytest.raises(TypeError):
         # noinspection PyTypeChecker
         sg_shot._versions(pipeline_step=1)
+
+
+def test_get__uses_cached_values(sg):
+    sg_shot = pysg.new_site(sg).find_one("Shot", [["id", "is", 1]], fields=["code"])
+    finds_before = sg.finds
+
+    result = sg_shot.get(["code"])
+
+    assert result == {"code": "sq111_sh1111"}
+    assert sg.finds == finds_before
+
+
+def test_get__queries_only_missing_fields(sg):
+    sg_shot = pysg.new_site(sg).find_one("Shot", [["id", "is", 1]], fields=["code"])
+
+    with mock.patch.object(mockgun.Shotgun, "find_one", wraps=sg.find_one) as mock_find_one:
+        result = sg_shot.get(["code", "sg_sequence"])
+
+    assert result == {"code": "sq111_sh1111", "sg_sequence": pysg.new_entity(sg, 1, "Sequence")}
+    mock_find_one.assert_called_once_with("Shot", [["id", "is", 1]], ["sg_sequence"])
+
+
+def test_get__queries_implicitly_cached_values_again(sg):
+    sg_shot = pysg.new_entity(sg, 1, "Shot")
+    sg_shot.get(["code"])
+    sg.update("Shot", 1, {"code": "changed_behind_the_back"})
+
+    result = sg_shot.get(["code"])
+
+    assert result == {"code": "changed_behind_the_back"}
+
+
+def test_get__implicitly_cached_values_with_ttl(sg):
+    pysg.new_site(sg).value_cache_ttl = 60
+    sg_shot = pysg.new_entity(sg, 1, "Shot")
+    sg_shot.get(["code"])
+    finds_before = sg.finds
+
+    result = sg_shot.get(["code"])
+
+    assert result == {"code": "sq111_sh1111"}
+    assert sg.finds == finds_before
+
+
+def test_get__value_cache_ttl(sg):
+    sg_site = pysg.new_site(sg)
+    sg_site.value_cache_ttl = 0
+    sg_shot = sg_site.find_one("Shot", [["id", "is", 1]], fields=["code"])
+    finds_before = sg.finds
+
+    sg_shot.get(["code"])
+
+    assert sg.finds == finds_before + 1
+
+
+def test_set__updates_cached_values(sg):
+    pysg.new_site(sg).value_cache_ttl = 60
+    sg_shot = pysg.new_entity(sg, 1, "Shot")
+    sg_shot.get(["code"])
+
+    sg_shot.set({"code": "new_code"})
+
+    assert sg_shot.get(["code"]) == {"code": "new_code"}
+    assert sg.find_one("Shot", [["id", "is", 1]], ["code"])["code"] == "new_code"
+
+
+def test_refresh(sg):
+    pysg.new_site(sg).value_cache_ttl = 60
+    sg_shot = pysg.new_entity(sg, 1, "Shot")
+    sg_shot.get(["code"])
+    sg.update("Shot", 1, {"code": "changed_behind_the_back"})
+
+    sg_shot.refresh()
+
+    assert sg_shot.get(["code"]) == {"code": "changed_behind_the_back"}
+
+
+def test_clear_cache(sg):
+    pysg.new_site(sg).value_cache_ttl = 60
+    sg_shot = pysg.new_entity(sg, 1, "Shot")
+    sg_shot.get(["code"])
+    sg.update("Shot", 1, {"code": "changed_behind_the_back"})
+
+    sg_shot.clear_cache(["code"])
+
+    assert sg_shot.get(["code"]) == {"code": "changed_behind_the_back"}
+
+
+def test_set__forgets_cached_field_paths(sg):
+    pysg.new_site(sg).value_cache_ttl = 60
+    sg_version = pysg.new_site(sg).find_one("Version", [["code", "is", "sh1111_city_v001"]])
+    sg_version.get(["entity.Shot.code"])
+
+    sg_version.set({"entity": {"type": "Shot", "id": 2}})
+
+    assert sg_version.get(["entity.Shot.code"]) == {"entity.Shot.code": "sq111_sh2222"}
+
+
+def test_clear_cache__forgets_cached_field_paths(sg):
+    pysg.new_site(sg).value_cache_ttl = 60
+    sg_version = pysg.new_site(sg).find_one("Version", [["code", "is", "sh1111_city_v001"]])
+    sg_version.get(["entity.Shot.code", "entity.Shot.sg_sequence.Sequence.code"])
+    sg.update("Version", sg_version.id, {"entity": {"type": "Shot", "id": 2}})
+
+    sg_version.clear_cache(["entity"])
+
+    assert sg_version.get(["entity.Shot.code"]) == {"entity.Shot.code": "sq111_sh2222"}
+
+
+def test_linked_entities_cache_additional_fields(sg):
+    pysg.new_site(sg).value_cache_ttl = 60
+    sg_task = pysg.new_entity(sg, 1, "Task")
+    with mock.patch.object(
+        mockgun.Shotgun,
+        "find_one",
+        return_value={
+            "type": "Task",
+            "id": 1,
+            "entity": {"type": "Shot", "id": 1, "name": "sq111_sh1111", "code": "sq111_sh1111"},
+        },
+    ):
+        sg_shot = sg_task["entity"].get()
+
+    with mock.patch.object(mockgun.Shotgun, "find_one") as mock_find_one:
+        result = sg_shot.get(["code"])
+
+    assert result == {"code": "sq111_sh1111"}
+    mock_find_one.assert_not_called()
+
+
+def test_hash(sg):
+    sg_shots = {pysg.new_entity(sg, 1, "Shot"), pysg.new_entity(sg, 1, "Shot")}
+
+    assert sg_shots == {pysg.new_entity(sg, 1, "Shot")}
+    assert pysg.new_entity(sg, 1, "Asset") not in sg_shots
+
+
+@pytest.mark.parametrize("entity_type", ["Shot", "PublishedFile", "CustomEntity01"])
+def test_slots(sg, entity_type):
+    sg_entity = pysg.new_entity(sg, 1, entity_type)
+
+    assert not hasattr(sg_entity, "__dict__")
+    assert not hasattr(sg_entity["code"], "__dict__")
+
+
+def test_get__single_entity_field_paths(sg):
+    sg_version = pysg.new_site(sg).find_one("Version", [["code", "is", "sh1111_city_v001"]])
+    finds = sg.finds
+
+    assert {
+        "entity.Shot.code": "sq111_sh1111",
+        "entity.Shot.sg_sequence.Sequence.code": "sq111",
+    } == sg_version.get(["entity.Shot.code", "entity.Shot.sg_sequence.Sequence.code"])
+    assert finds + 1 == sg.finds
+
+
+def test_get__multi_entity_field_paths(sg):
+    pysg.new_site(sg).value_cache_ttl = 60
+    sg_version = pysg.new_site(sg).find_one("Version", [["code", "is", "sh1111_city_v001"]])
+    finds = sg.finds
+
+    result = sg_version.get(["playlists.Playlist.code", "playlists.Playlist.project.Project.name"])
+
+    assert {
+        "playlists.Playlist.code": ["Playlist A"],
+        "playlists.Playlist.project.Project.name": ["Test Project A"],
+    } == result
+    assert finds + 2 == sg.finds
+    # The values are cached on the linked entities.
+    sg_playlist = sg_version["playlists"].get()[0]
+    assert "Playlist A" == sg_playlist["code"].get()
+    assert ["Playlist A"] == sg_version["playlists.Playlist.code"].get()
+    assert finds + 2 == sg.finds
@@ -1,8 +1,15 @@
 """Tests for `pyshotgrid` SGSite class."""
 
+import concurrent.futures
+import copy
+import datetime
+import functools
+import threading
+import time
 from unittest import mock
 
 import pytest
+import shotgun_api3
 from shotgun_api3.lib import mockgun
 
 import pyshotgrid as pysg
@@ -56,6 +63,78 @@ def test_projects(sg):
         assert project.id in [1, 2]
 
 
+def test_projects__names_or_ids(sg):
+    sg_site = pysg.SGSite(sg)
+
+    result_names = sg_site.projects(["tpb"], include_archived=True)
+    result_mixed = sg_site.projects([1, "Test Project B"], include_archived=True)
+
+    assert result_names == [pysg.new_entity(sg, 2, "Project")]
+    assert result_mixed == [pysg.new_entity(sg, 1, "Project"), pysg.new_entity(sg, 2, "Project")]
+
+
+def test_projects__empty_names_or_ids(sg):
+    sg_site = pysg.SGSite(sg)
+    finds = sg.finds
+
+    result = sg_site.projects([], include_archived=True)
+
+    assert result == []
+    assert finds == sg.finds
+
+
+def test_project__index(sg):
+    sg_site = pysg.SGSite(sg)
+    updated_at = datetime.datetime(2024, 1, 1, 12, 0, 0)
+    sg.update("Project", 1, {"updated_at": updated_at})
+    sg.update("Project", 2, {"updated_at": updated_at})
+
+    with mock.patch.object(mockgun.Shotgun, "find", wraps=sg.find) as mock_find:
+        sg_project_a = sg_site.project("tpa")
+        sg_project_b = sg_site.project("Test Project B")
+        queries_for_known_projects = mock_find.call_count
+        sg.create(
+            "Project",
+            {
+                "name": "Test Project C",
+                "tank_name": "tpc",
+                "is_template": False,
+                "updated_at": updated_at + datetime.timedelta(hours=1),
+            },
+        )
+        sg_project_c = sg_site.project("tpc")
+
+    assert sg_project_a == pysg.new_entity(sg, 1, "Project")
+    assert sg_project_b == pysg.new_entity(sg, 2, "Project")
+    assert sg_project_c["tank_name"].get() == "tpc"
+    assert queries_for_known_projects == 1
+    assert mock_find.call_count == 2
+    assert "updated_at" in str(mock_find.call_args)
+
+
+def test_project__index_forgets_deleted_projects(sg, monkeypatch):
+    sg_site = pysg.SGSite(sg)
+    updated_at = datetime.datetime(2024, 1, 1, 12, 0, 0)
+    sg.update("Project", 1, {"updated_at": updated_at})
+    sg.update("Project", 2, {"updated_at": updated_at})
+    sg_project = sg.create(
+        "Project",
+        {
+            "name": "Test Project D",
+            "tank_name": "tpd",
+            "is_template": False,
+            "updated_at": updated_at,
+        },
+    )
+    assert sg_site.project("tpd") is not None
+
+    sg.delete("Project", sg_project["id"])
+    monkeypatch.setattr(pysg.core._ProjectIndex, "MAX_AGE", -1.0)
+
+    assert sg_site.project("tpd") is None
+    assert sg_site.project("tpa") == pysg.new_entity(sg, 1, "Project")
+
+
 def test_create(sg):
     sg_site = pysg.SGSite(sg)
 
@@ -219,3 +298,612 @@ def test_comparison__wrong_type(sg):
     sg_site_a = pysg.SGSite(sg)
 
     assert sg_site_a != 1
+
+
+def test_find__fields(sg):
+    sg_site = pysg.SGSite(sg)
+
+    result = sg_site.find("Asset", [["code", "contains", "Car"]], fields=["code"])
+    finds_before = sg.finds
+
+    assert {asset["code"].get() for asset in result} == {"CarA", "CarB"}
+    assert sg.finds == finds_before
+
+
+def test_value_cache_ttl(sg):
+    sg_site = pysg.SGSite(sg)
+
+    sg_site.value_cache_ttl = 10
+
+    assert pysg.new_site(sg).value_cache_ttl == 10
+
+
+def test_load_fields(sg):
+    sg_site = pysg.SGSite(sg)
+    sg_entities = [
+        pysg.new_entity(sg, 1, "Shot"),
+        pysg.new_entity(sg, 2, "Shot"),
+        pysg.new_entity(sg, 1, "Asset"),
+    ]
+
+    with mock.patch.object(mockgun.Shotgun, "find", wraps=sg.find) as mock_find:
+        result = sg_site.load_fields(sg_entities, ["code", "project"])
+        cached_values = [sg_entity["code"].get() for sg_entity in sg_entities]
+
+    assert result == [
+        {"code": "sq111_sh1111", "project": pysg.new_entity(sg, 1, "Project")},
+        {"code": "sq111_sh2222", "project": pysg.new_entity(sg, 1, "Project")},
+        {"code": "Tree", "project": pysg.new_entity(sg, 1, "Project")},
+    ]
+    assert cached_values == ["sq111_sh1111", "sq111_sh2222", "Tree"]
+    assert mock_find.call_count == 2
+
+
+def test_load_fields__chunk_size(sg):
+    sg_site = pysg.SGSite(sg)
+    sg_shots = [pysg.new_entity(sg, shot_id, "Shot") for shot_id in range(1, 5)]
+
+    with mock.patch.object(mockgun.Shotgun, "find", wraps=sg.find) as mock_find:
+        sg_site.load_fields(sg_shots, ["code"], chunk_size=3)
+
+    assert mock_find.call_count == 2
+
+
+def test_load_fields__skips_cached_entities(sg):
+    sg_site = pysg.SGSite(sg)
+    sg_shot = sg_site.find_one("Shot", [["id", "is", 1]], fields=["code"])
+
+    with mock.patch.object(mockgun.Shotgun, "find", wraps=sg.find) as mock_find:
+        result = sg_site.load_fields([sg_shot], ["code"], raw_values=True)
+
+    assert result == [{"code": "sq111_sh1111"}]
+    mock_find.assert_not_called()
+
+
+def test_load_fields__multi_entity_field_paths(sg):
+    sg_site = pysg.SGSite(sg)
+    sg_versions = sg_site.find("Version", [["project", "is", {"type": "Project", "id": 1}]])
+
+    with mock.patch.object(mockgun.Shotgun, "find", wraps=sg.find) as mock_find:
+        result = sg_site.load_fields(sg_versions, ["playlists.Playlist.code"], raw_values=True)
+
+    assert result == [
+        {"playlists.Playlist.code": ["Playlist A"]},
+        {"playlists.Playlist.code": ["Playlist A"]},
+        {"playlists.Playlist.code": ["Playlist B"]},
+        {"playlists.Playlist.code": ["Playlist B"]},
+    ]
+    # One query for the versions and one for all of their playlists.
+    assert mock_find.call_count == 2
+
+
+def test_prefetch(sg):
+    pysg.new_site(sg).value_cache_ttl = 60
+    sg_site = pysg.SGSite(sg)
+    sg_entities = [pysg.new_entity(sg, 1, "Shot"), pysg.new_entity(sg, 1, "Asset")]
+
+    with mock.patch.object(mockgun.Shotgun, "find", wraps=sg.find) as mock_find:
+        sg_site.prefetch(sg_entities, {"tasks": ["sg_status_list"]})
+        result = [
+            [sg_task["content"].get() for sg_task in sg_entity.tasks()] for sg_entity in sg_entities
+        ]
+
+    assert result == [["comp", "lighting"], ["modeling"]]
+    # Shots and Assets are linked to their Tasks with the same field.
+    assert mock_find.call_count == 1
+
+    sg_entities[0].clear_cache()
+    with mock.patch.object(mockgun.Shotgun, "find", wraps=sg.find) as mock_find:
+        sg_entities[0].tasks()
+    assert mock_find.call_count == 1
+
+
+def test_prefetch__outdated_by_writes(sg):
+    sg_site = pysg.SGSite(sg)
+    sg_shot = pysg.new_entity(sg, 1, "Shot")
+    sg_site.prefetch([sg_shot], {"tasks": []})
+
+    sg_task = sg_site.create("Task", {"content": "prefetch_test", "entity": sg_shot})
+    created = [sg_task_["content"].get() for sg_task_ in sg_shot.tasks()]
+    sg_site.prefetch([sg_shot], {"tasks": []})
+    with sg_site.batch():
+        sg_task["entity"].set(pysg.new_entity(sg, 2, "Shot"))
+    relinked = [sg_task_["content"].get() for sg_task_ in sg_shot.tasks()]
+
+    assert created == ["comp", "lighting", "prefetch_test"]
+    assert relinked == ["comp", "lighting"]
+    # Cleanup
+    sg.delete(sg_task.type, sg_task.id)
+
+
+def test_prefetch__not_outdated_by_other_writes(sg):
+    sg_site = pysg.SGSite(sg)
+    sg_shot = pysg.new_entity(sg, 1, "Shot")
+    sg_site.prefetch([sg_shot], {"tasks": []})
+    sg_shot.tasks()[0]["content"].set("comp")
+
+    with mock.patch.object(mockgun.Shotgun, "find", wraps=sg.find) as mock_find:
+        sg_shot.tasks()
+
+    mock_find.assert_not_called()
+
+
+def test_batch__merges_updates(sg):
+    sg_site = pysg.SGSite(sg)
+    sg_shot = pysg.new_entity(sg, 1, "Shot")
+
+    with mock.patch.object(mockgun.Shotgun, "batch", wraps=sg.batch) as mock_batch:
+        with sg_site.batch() as write_buffer:
+            sg_shot["code"].set("batch_test_a")
+            sg_shot["description"].set("batch test")
+            sg_shot["code"].set("batch_test_b")
+            queued = len(write_buffer)
+        code = sg.find_one("Shot", [["id", "is", 1]], ["code"])["code"]
+
+    assert queued == 1
+    assert code == "batch_test_b"
+    assert sg_shot["code"].get() == "batch_test_b"
+    mock_batch.assert_called_once()
+    # Cleanup
+    sg_shot["code"].set("sq111_sh1111")
+
+
+def test_batch__create_resolves_ids(sg):
+    sg_site = pysg.SGSite(sg)
+
+    with sg_site.batch():
+        sg_asset = sg_site.create("Asset", {"code": "batch_test_asset"})
+        sg_task = sg_site.create("Task", {"content": "model", "entity": sg_asset})
+        temp_id = sg_asset.id
+
+    assert temp_id < 0
+    assert sg_asset.id > 0
+    assert sg_task["entity"].get() == sg_asset
+    # Cleanup
+    sg.delete(sg_task.type, sg_task.id)
+    sg.delete(sg_asset.type, sg_asset.id)
+
+
+def test_batch__does_not_merge_links_to_later_creates(sg):
+    sg_site = pysg.SGSite(sg)
+
+    with mock.patch.object(mockgun.Shotgun, "batch", wraps=sg.batch) as mock_batch:
+        with sg_site.batch() as write_buffer:
+            sg_shot = sg_site.create("Shot", {"code": "batch_test_shot"})
+            sg_asset = sg_site.create("Asset", {"code": "batch_test_asset"})
+            sg_shot["assets"].set([sg_asset])
+            queued = len(write_buffer)
+
+    assert queued == 3
+    sent_ids = [
+        link["id"]
+        for call in mock_batch.call_args_list
+        for request in call.args[0]
+        for link in request.get("data", {}).get("assets", [])
+    ]
+    assert sent_ids == [sg_asset.id]
+    assert sg.find_one("Shot", [["id", "is", sg_shot.id]], ["assets"])["assets"] == [
+        sg_asset.to_dict()
+    ]
+    # Cleanup
+    sg.delete(sg_shot.type, sg_shot.id)
+    sg.delete(sg_asset.type, sg_asset.id)
+
+
+def test_batch__delete(sg):
+    sg_site = pysg.SGSite(sg)
+    sg_asset = sg_site.create("Asset", {"code": "batch_test_asset"})
+
+    with sg_site.batch():
+        result = sg_asset.delete()
+        still_exists = sg.find_one("Asset", [["id", "is", sg_asset.id]]) is not None
+
+    assert result is True
+    assert still_exists
+    assert sg.find_one("Asset", [["id", "is", sg_asset.id]]) is None
+
+
+def test_batch__chunk_size(sg):
+    sg_site = pysg.SGSite(sg)
+    sg_shots = [pysg.new_entity(sg, shot_id, "Shot") for shot_id in range(1, 4)]
+
+    with mock.patch.object(mockgun.Shotgun, "batch", wraps=sg.batch) as mock_batch:
+        with sg_site.batch(chunk_size=2):
+            for sg_shot in sg_shots:
+                sg_shot["description"].set("batch test")
+
+    assert mock_batch.call_count == 2
+    # Cleanup
+    for sg_shot in sg_shots:
+        sg_shot["description"].set(None)
+
+
+def test_batch__nested_and_discarded_on_error(sg):
+    sg_site = pysg.SGSite(sg)
+    sg_shot = pysg.new_entity(sg, 1, "Shot")
+
+    with pytest.raises(RuntimeError):
+        with sg_site.batch() as outer:
+            with sg_site.batch() as inner:
+                sg_shot["code"].set("batch_test")
+            raise RuntimeError("abort")
+
+    assert inner is outer
+    assert sg.find_one("Shot", [["id", "is", 1]], ["code"])["code"] == "sq111_sh1111"
+
+
+def test_iter_find(sg):
+    sg_site = pysg.SGSite(sg)
+
+    with mock.patch.object(mockgun.Shotgun, "find", wraps=sg.find) as mock_find:
+        result = list(sg_site.iter_find("Shot", [], fields=["code"], page_size=3))
+
+    assert [sg_shot["code"].get() for sg_shot in result] == [
+        "sq111_sh1111",
+        "sq111_sh2222",
+        "sq222_sh3333",
+        "sq222_sh4444",
+    ]
+    assert mock_find.call_count == 2
+
+
+def test_iter_find__page_size_above_records_per_page(sg, monkeypatch):
+    sg_site = pysg.SGSite(sg)
+    monkeypatch.setattr(sg.config, "_records_per_page", 2)
+
+    with mock.patch.object(mockgun.Shotgun, "find", wraps=sg.find) as mock_find:
+        result = list(sg_site.iter_find("Shot", [], page_size=3))
+
+    assert result == sg_site.find("Shot", [])
+    assert len(result) == 4
+    assert mock_find.call_count == 3
+
+
+def test_iter_find__limit(sg):
+    sg_site = pysg.SGSite(sg)
+
+    with mock.patch.object(mockgun.Shotgun, "find", wraps=sg.find) as mock_find:
+        result = list(sg_site.iter_find("Shot", [], limit=2, page_size=2))
+
+    assert result == [pysg.new_entity(sg, 1, "Shot"), pysg.new_entity(sg, 2, "Shot")]
+    assert mock_find.call_count == 1
+
+
+def test_iter_find__prefetch(sg):
+    sg_site = pysg.SGSite(sg)
+
+    result = list(sg_site.iter_find("Shot", [], page_size=1, prefetch=True))
+
+    assert result == sg_site.find("Shot", [])
+
+
+def test_iter_find__stops_querying_when_not_consumed(sg):
+    sg_site = pysg.SGSite(sg)
+
+    with mock.patch.object(mockgun.Shotgun, "find", wraps=sg.find) as mock_find:
+        sg_shots = sg_site.iter_find("Shot", [], page_size=1)
+        next(sg_shots)
+        sg_shots.close()
+
+    assert mock_find.call_count == 1
+
+
+def test_use_identity_map(sg):
+    sg_site = pysg.SGSite(sg)
+    sg_site.use_identity_map = True
+
+    sg_shot = sg_site.find_one("Shot", [["id", "is", 1]], fields=["code"])
+
+    assert pysg.new_site(sg).use_identity_map
+    assert pysg.new_entity(sg, 1, "Shot") is sg_shot
+    assert pysg.new_entity(sg, 2, "Shot") is not sg_shot
+    sg_site.use_identity_map = False
+    assert pysg.new_entity(sg, 1, "Shot") is not sg_shot
+
+
+def test_use_identity_map__batch_create(sg):
+    sg_site = pysg.SGSite(sg)
+    sg_site.use_identity_map = True
+
+    with sg_site.batch():
+        sg_asset = sg_site.create("Asset", {"code": "identity_map_test_asset"})
+
+    assert pysg.new_entity(sg, sg_asset.id, "Asset") is sg_asset
+    # Cleanup
+    sg.delete(sg_asset.type, sg_asset.id)
+
+
+def test_parallel(sg):
+    sg_site = pysg.SGSite(sg)
+    sg_shot = pysg.new_entity(sg, 1, "Shot")
+
+    result = sg_site.parallel(
+        [
+            sg_shot.tasks,
+            (sg_site.find, "Asset", [["code", "contains", "Car"]]),
+            functools.partial(sg_site.find_one, "Shot", [["id", "is", 2]], fields=["code"]),
+        ]
+    )
+
+    assert result == [
+        sg_shot.tasks(),
+        sg_site.find("Asset", [["code", "contains", "Car"]]),
+        pysg.new_entity(sg, 2, "Shot"),
+    ]
+
+
+def test_parallel__uses_worker_connections(sg):
+    sg_site = pysg.SGSite(sg)
+    sg_shot = pysg.new_entity(sg, 1, "Shot")
+    # A second connection to the same mockgun database.
+    worker_sg = copy.copy(sg)
+    vars(worker_sg).pop("_pysg_site_state", None)
+
+    with mock.patch.object(pysg.core, "_clone_connection", return_value=worker_sg):
+        with mock.patch.object(worker_sg, "find", wraps=worker_sg.find) as worker_find:
+            result = sg_site.parallel([sg_shot.tasks], max_workers=1)
+
+    worker_find.assert_called_once()
+    assert result == [sg_shot.tasks()]
+    assert all(sg_task.sg is sg for sg_task in result[0])
+
+
+def test_parallel__max_workers(sg):
+    sg_site = pysg.SGSite(sg)
+    lock = threading.Lock()
+    running = []
+    max_running = []
+
+    def work():
+        with lock:
+            running.append(1)
+            max_running.append(len(running))
+        time.sleep(0.02)
+        with lock:
+            running.pop()
+
+    sg_site.parallel([work] * 6, max_workers=2)
+
+    assert max(max_running) == 2
+
+
+def test_parallel__shares_one_pool(sg):
+    sg_site = pysg.SGSite(sg)
+    pool = pysg.core._site_state(sg).worker_pool()
+
+    sg_site.parallel([(sg_site.find, "Shot", [])], max_workers=2)
+    sg_site.parallel([(sg_site.find, "Shot", [])], max_workers=4, timeout=10)
+    sg_site.parallel([(sg_site.find, "Shot", [])], max_workers=1)
+
+    assert pysg.core._site_state(sg).worker_pool() is pool
+    assert pool.max_workers == 4
+
+
+def test_parallel__shares_schema_cache(sg):
+    sg_site = pysg.SGSite(sg)
+    worker_sg = copy.copy(sg)
+    vars(worker_sg).pop("_pysg_site_state", None)
+
+    with mock.patch.object(pysg.core, "_clone_connection", return_value=worker_sg):
+        with mock.patch.object(
+            worker_sg, "schema_field_read", wraps=worker_sg.schema_field_read
+        ) as worker_read:
+            sg_site.parallel([lambda: pysg.new_entity(sg, 1, "Shot")["code"].data_type])
+
+    assert pysg.core._site_state(worker_sg).schema_cache is sg_site.schema_cache
+    assert ("Shot", None) in sg_site.schema_cache._field_schemas
+    worker_read.assert_called_once_with("Shot")
+
+
+def test_close(sg):
+    sg_site = pysg.SGSite(sg)
+    pool = pysg.core._site_state(sg).worker_pool()
+    sg_site.parallel([(sg_site.find, "Shot", [])], max_workers=2)
+
+    sg_site.close()
+
+    assert pool.max_workers == 0
+    assert sg_site.parallel([(sg_site.find, "Shot", [])]) == [sg_site.find("Shot", [])]
+
+
+def test_parallel__timeout(sg):
+    sg_site = pysg.SGSite(sg)
+
+    with pytest.raises(concurrent.futures.TimeoutError):
+        sg_site.parallel([(time.sleep, 0.5)], timeout=0.05)
+
+
+def test_parallel__raises_errors(sg):
+    sg_site = pysg.SGSite(sg)
+
+    with pytest.raises(ValueError):
+        sg_site.parallel([(pysg.new_entity, sg, 123)])
+
+
+def test_download(sg, tmp_path):
+    sg_site = pysg.SGSite(sg)
+    sg_shots = sg_site.find("Shot", [])
+    for sg_shot in sg_shots:
+        sg.update("Shot", sg_shot.id, {"image": f"https://cdn.example.com/{sg_shot.id}.jpg"})
+    sg.update(
+        "Version", 1, {"sg_uploaded_movie": {"id": 1, "type": "Attachment", "name": "movie.mov"}}
+    )
+    sg_version = pysg.new_entity(sg, 1, "Version")
+    site_opener = object()
+    streamed = []
+
+    def stream_url(opener, url, location, use_url_extension, chunk_size, timeout, renew_session):
+        streamed.append((opener, url, use_url_extension, chunk_size))
+        return f"{location}.jpg"
+
+    finds_before = sg.finds
+    with mock.patch.object(pysg.core._SiteState, "url_opener", return_value=site_opener):
+        with mock.patch.object(pysg.core, "_stream_url", side_effect=stream_url):
+            result = sg_site.download(
+                [(sg_shot.thumbnail, str(tmp_path / "thumbs")) for sg_shot in sg_shots]
+                + [(sg_version["sg_uploaded_movie"], str(tmp_path / "movies"))],
+                max_workers=4,
+                chunk_size=1024,
+            )
+
+    assert result == [
+        str(tmp_path / "thumbs" / f"{sg_shot['code'].get()}_image.jpg") for sg_shot in sg_shots
+    ] + [str(tmp_path / "movies" / "movie.mov")]
+    assert sorted(url for _, url, _, _ in streamed) == sorted(
+        f"https://cdn.example.com/{sg_shot.id}.jpg" for sg_shot in sg_shots
+    )
+    assert all(opener is site_opener for opener, _, _, _ in streamed)
+    assert all(
+        use_url_extension and chunk_size == 1024 for _, _, use_url_extension, chunk_size in streamed
+    )
+    # One query for the shots and one for the version.
+    assert sg.finds - finds_before == 2
+    assert (tmp_path / "movies").is_dir()
+
+
+def test_download__raises_errors(sg, tmp_path):
+    sg_site = pysg.SGSite(sg)
+    sg_shot = pysg.new_entity(sg, 1, "Shot")
+    sg.update("Shot", 1, {"image": "https://cdn.example.com/1.jpg"})
+
+    with mock.patch.object(pysg.core._SiteState, "url_opener"):
+        with mock.patch.object(pysg.core, "_stream_url", side_effect=RuntimeError("broken")):
+            with pytest.raises(RuntimeError, match="broken"):
+                sg_site.download([(sg_shot.thumbnail, str(tmp_path / "thumb.jpg"))])
+
+
+class FakeUpload:
+    """Stands in for Shotgun.upload. It fails the first attempts for every path."""
+
+    def __init__(self, failures=0, delay=0.0, error=ConnectionError):
+        self.failures = failures
+        self.error = error
+        self.delay = delay
+        self.attempts = {}
+        self.calls = []
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def __call__(self, entity_type, entity_id, path, field_name=None, display_name=None):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            self.attempts[path] = self.attempts.get(path, 0) + 1
+            attempt = self.attempts[path]
+        time.sleep(self.delay)
+        with self.lock:
+            self.running -= 1
+            if attempt <= self.failures:
+                raise self.error(f"Upload of {path} failed.")
+            self.calls.append((entity_type, entity_id, path, field_name, display_name))
+            return 1000 + len(self.calls)
+
+
+def _upload_files(tmp_path, count):
+    paths = []
+    for index in range(count):
+        path = tmp_path / f"movie_{index}.mov"
+        path.write_bytes(b"x" * (index + 1))
+        paths.append(str(path))
+    return paths
+
+
+def test_upload(sg, tmp_path):
+    sg_site = pysg.SGSite(sg)
+    sg_versions = [pysg.new_entity(sg, 1, "Version"), pysg.new_entity(sg, 2, "Version")]
+    paths = _upload_files(tmp_path, 6)
+    uploads = [
+        (sg_versions[index % 2], "sg_uploaded_movie", path) for index, path in enumerate(paths)
+    ]
+    uploads[0] += ("My Movie",)
+    statuses = []
+
+    with mock.patch.object(sg, "upload", FakeUpload(delay=0.01), create=True) as fake_upload:
+        result = sg_site.upload(uploads, max_workers=3, progress=statuses.append)
+
+    attachment_ids = {call[2]: 1000 + number for number, call in enumerate(fake_upload.calls, 1)}
+    assert [sg_attachment.type for sg_attachment in result] == ["Attachment"] * 6
+    assert [sg_attachment.id for sg_attachment in result] == [
+        attachment_ids[path] for path in paths
+    ]
+    assert ("Version", 1, paths[0], "sg_uploaded_movie", "My Movie") in fake_upload.calls
+    assert fake_upload.max_running <= 3
+    assert [status["done"] for status in statuses] == [1, 2, 3, 4, 5, 6]
+    assert sorted(status["index"] for status in statuses) == list(range(6))
+    assert sum(status["bytes"] for status in statuses) == 21
+    assert all(status["total"] == 6 and status["bytes_per_second"] > 0 for status in statuses)
+    assert all(result[status["index"]] == status["attachment"] for status in statuses)
+
+
+def test_upload__retries_failed_uploads(sg, tmp_path):
+    sg_site = pysg.SGSite(sg)
+    paths = _upload_files(tmp_path, 2)
+    statuses = []
+
+    with mock.patch.object(sg, "upload", FakeUpload(failures=2), create=True):
+        result = sg_site.upload(
+            [(pysg.new_entity(sg, 1, "Version"), "image", path) for path in paths],
+            retries=2,
+            backoff=0.0,
+            progress=statuses.append,
+        )
+
+    assert len(result) == 2
+    assert [status["attempts"] for status in statuses] == [3, 3]
+
+
+def test_upload__raises_after_retries(sg, tmp_path):
+    sg_site = pysg.SGSite(sg)
+    paths = _upload_files(tmp_path, 1)
+
+    with mock.patch.object(sg, "upload", FakeUpload(failures=3), create=True) as fake_upload:
+        with pytest.raises(ConnectionError):
+            sg_site.upload(
+                [(pysg.new_entity(sg, 1, "Version"), "image", paths[0])], retries=2, backoff=0.0
+            )
+
+    assert fake_upload.attempts == {paths[0]: 3}
+
+
+def test_upload__raises_server_errors_right_away(sg, tmp_path):
+    sg_site = pysg.SGSite(sg)
+    paths = _upload_files(tmp_path, 1)
+    fake_upload = FakeUpload(failures=1, error=shotgun_api3.Fault)
+
+    with mock.patch.object(sg, "upload", fake_upload, create=True):
+        with pytest.raises(shotgun_api3.Fault):
+            sg_site.upload([(pysg.new_entity(sg, 1, "Version"), "image", paths[0])], backoff=0.0)
+
+    assert fake_upload.attempts == {paths[0]: 1}
+
+
+@pytest.mark.parametrize("error", [FileNotFoundError, PermissionError, IsADirectoryError])
+def test_upload__raises_local_file_errors_right_away(sg, tmp_path, error):
+    sg_site = pysg.SGSite(sg)
+    paths = _upload_files(tmp_path, 1)
+    fake_upload = FakeUpload(failures=1, error=error)
+
+    with mock.patch.object(sg, "upload", fake_upload, create=True):
+        with pytest.raises(error):
+            sg_site.upload([(pysg.new_entity(sg, 1, "Version"), "image", paths[0])], backoff=10.0)
+
+    assert fake_upload.attempts == {paths[0]: 1}
+
+
+def test_upload__clears_cached_value(sg, tmp_path):
+    sg_site = pysg.SGSite(sg)
+    sg_version = sg_site.find_one("Version", [["id", "is", 1]], fields=["image"])
+    paths = _upload_files(tmp_path, 1)
+
+    with mock.patch.object(sg, "upload", FakeUpload(), create=True):
+        sg_site.upload([(sg_version, "image", paths[0])])
+
+    assert sg_version._cached_value("image") is pysg.core._MISSING
+
+
+def test_upload__missing_file(sg, tmp_path):
+    sg_site = pysg.SGSite(sg)
+
+    with pytest.raises(ValueError):
+        sg_site.upload([(pysg.new_entity(sg, 1, "Version"), "image", str(tmp_path / "nope.jpg"))])
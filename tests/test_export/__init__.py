@@ -0,0 +1 @@
+"""Tests for `pyshotgrid.export` module."""
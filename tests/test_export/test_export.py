@@ -0,0 +1,158 @@
+import json
+from unittest import mock
+
+import pytest
+import shotgun_api3
+from shotgun_api3.lib import mockgun
+
+import pyshotgrid as pysg
+from pyshotgrid import export
+
+
+def test_export__ndjson(sg, tmp_path):
+    path = tmp_path / "Version.ndjson"
+
+    result = pysg.new_site(sg).export(
+        "Version",
+        path,
+        fields=["code", "created_at", "entity"],
+        filters=[["project", "is", {"type": "Project", "id": 1}]],
+        page_size=3,
+    )
+
+    assert 4 == result
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [1, 2, 3, 4] == [row["id"] for row in rows]
+    assert ["id", "code", "created_at", "entity"] == list(rows[0])
+    assert "sh1111_city_v001" == rows[0]["code"]
+    assert "2000-01-01T12:00:00" == rows[0]["created_at"]
+    assert ("Shot", 1) == (rows[0]["entity"]["type"], rows[0]["entity"]["id"])
+    assert rows[3]["entity"] is None
+
+
+def test_export__ndjson_all_fields(sg, tmp_path):
+    path = tmp_path / "Shot.jsonl"
+
+    result = pysg.new_site(sg).export("Shot", path)
+
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(rows) == result
+    assert {"id", "code", "project", "sg_sequence"} <= set(rows[0])
+
+
+def test_export__parquet(sg, tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    sg.update("Task", 1, {"duration": 600, "sg_status_list": "ip"})
+    path = tmp_path / "Task.parquet"
+
+    result = pysg.new_site(sg).export(
+        "Task",
+        path,
+        fields=["content", "duration", "sg_status_list", "entity", "task_assignees", "start_date"],
+        page_size=2,
+        row_group_size=2,
+    )
+
+    assert 5 == result
+    assert 3 == pq.ParquetFile(path).num_row_groups
+    table = pq.read_table(path)
+    assert pa.int64() == table.schema.field("duration").type
+    assert pa.types.is_dictionary(table.schema.field("sg_status_list").type)
+    assert pa.date32() == table.schema.field("start_date").type
+    assert [1, 2, 3, 4, 5] == table.column("id").to_pylist()
+    assert [600, None, None, None, None] == table.column("duration").to_pylist()
+    assert ["ip", "wtg", "wtg", "wtg", "wtg"] == table.column("sg_status_list").to_pylist()
+    assert {"type": "Asset", "id": 1} == table.column("entity").to_pylist()[3]
+    assert [{"type": "HumanUser", "id": 1}] == table.column("task_assignees").to_pylist()[0]
+
+
+def test_export__parquet_row_groups_do_not_exceed_row_group_size(sg, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "Task.parquet"
+
+    result = pysg.new_site(sg).export(
+        "Task", path, fields=["content"], page_size=2, row_group_size=3
+    )
+
+    metadata = pq.ParquetFile(path).metadata
+    row_groups = [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+    assert [2, 3] == row_groups
+    assert 5 == result
+
+
+def test_export__unknown_format(sg, tmp_path):
+    with pytest.raises(ValueError):
+        pysg.new_site(sg).export("Shot", tmp_path / "Shot.csv", fields=["code"])
+
+    assert [] == list(tmp_path.iterdir())
+
+
+def test_export__removes_incomplete_file(sg, tmp_path):
+    path = tmp_path / "Shot.ndjson"
+    find = mockgun.Shotgun.find
+
+    def failing_find(self, *args, **kwargs):
+        if kwargs.get("page") == 2:
+            raise shotgun_api3.ShotgunError("Connection lost.")
+        return find(self, *args, **kwargs)
+
+    with mock.patch.object(mockgun.Shotgun, "find", failing_find):
+        with pytest.raises(shotgun_api3.ShotgunError):
+            pysg.new_site(sg).export("Shot", path, fields=["code"], page_size=2)
+
+    assert [] == list(tmp_path.iterdir())
+
+
+def test_export__cleanup_errors_do_not_hide_the_export_error(sg, tmp_path):
+    path = tmp_path / "Shot.ndjson"
+
+    with mock.patch.object(mockgun.Shotgun, "find", side_effect=ValueError("Bad filter.")):
+        with mock.patch.object(export._NDJSONWriter, "abort", side_effect=OSError("Disk full.")):
+            with pytest.raises(ValueError, match="Bad filter"):
+                pysg.new_site(sg).export("Shot", path, fields=["code"], page_size=2)
+
+    assert [] == list(tmp_path.iterdir())
+
+
+def test_main(sg, tmp_path, capsys):
+    with mock.patch.object(export, "new_site", return_value=pysg.new_site(sg)) as mock_new_site:
+        result = export.main(
+            [
+                "Shot",
+                "Asset",
+                "--output-dir",
+                str(tmp_path),
+                "--format",
+                "ndjson",
+                "--fields",
+                "code",
+                "--filters",
+                '[["project", "is", {"type": "Project", "id": 1}]]',
+                "--base-url",
+                "https://test.shotgunstudio.com",
+                "--script-name",
+                "test_script",
+                "--api-key",
+                "$ecret",
+            ]
+        )
+
+    assert 0 == result
+    mock_new_site.assert_called_once_with(
+        base_url="https://test.shotgunstudio.com", script_name="test_script", api_key="$ecret"
+    )
+    assert ["Asset.ndjson", "Shot.ndjson"] == sorted(path.name for path in tmp_path.iterdir())
+    shots = [json.loads(line) for line in (tmp_path / "Shot.ndjson").read_text().splitlines()]
+    assert ["sq111_sh1111", "sq111_sh2222", "sq222_sh3333", "sq222_sh4444"] == [
+        shot["code"] for shot in shots
+    ]
+    assert "Exported 4 Shot entities" in capsys.readouterr().out
+
+
+def test_main__missing_credentials(monkeypatch):
+    for variable in ("SHOTGRID_BASE_URL", "SHOTGRID_SCRIPT_NAME", "SHOTGRID_API_KEY"):
+        monkeypatch.delenv(variable, raising=False)
+
+    with pytest.raises(SystemExit):
+        export.main(["Shot"])
@@ -0,0 +1,215 @@
+"""Tests for `pyshotgrid.instrumentation` module."""
+
+import pytest
+import shotgun_api3
+from shotgun_api3.lib import mockgun
+
+import pyshotgrid as pysg
+from pyshotgrid import instrumentation
+
+
+def test_instrumented__records_calls(sg):
+    sg_project = pysg.new_entity(sg, 1, "Project")
+    calls = []
+
+    with instrumentation.instrumented(calls.append):
+        sg_shots = sg_project.shots()
+
+    assert len(calls) == 1
+    call = calls[0]
+    assert call["pysg_method"] == "SGProject.shots"
+    assert call["api_method"] == "find"
+    assert call["entity_type"] == "Shot"
+    assert call["rows"] == len(sg_shots)
+    assert call["payload_bytes"] > 0
+    assert call["seconds"] >= 0
+    assert call["error"] is None
+
+
+def test_instrumented__records_outermost_public_method(sg):
+    sg_shot = pysg.new_entity(sg, 1, "Shot")
+    calls = []
+
+    with instrumentation.instrumented(calls.append):
+        sg_shot["code"].get()
+        sg.find_one("Shot", [["id", "is", 1]])
+
+    assert [(call["pysg_method"], call["api_method"]) for call in calls] == [
+        ("Field.get", "find_one"),
+        (None, "find_one"),
+    ]
+    assert calls[0]["rows"] == 1
+
+
+def test_instrumented__records_errors(sg):
+    calls = []
+
+    with instrumentation.instrumented(calls.append):
+        with pytest.raises(shotgun_api3.ShotgunError):
+            pysg.new_site(sg).create("Shot", {"code": "new", "no_such_field": 1})
+
+    assert calls[0]["pysg_method"] == "SGSite.create"
+    assert isinstance(calls[0]["error"], shotgun_api3.ShotgunError)
+
+
+def test_instrumented__restores_api_methods(sg):
+    find = mockgun.Shotgun.find
+
+    with instrumentation.instrumented(lambda call: None):
+        assert mockgun.Shotgun.find is not find
+
+    assert mockgun.Shotgun.find is find
+    assert "follow" not in vars(mockgun.Shotgun)
+
+
+def test_instrumented__leaves_methods_replaced_by_others(sg):
+    find = mockgun.Shotgun.find
+    calls = []
+
+    with instrumentation.instrumented(calls.append):
+        wrapper = mockgun.Shotgun.find
+        mockgun.Shotgun.find = find
+    assert mockgun.Shotgun.find is find
+
+    # Someone else puts the wrapper back, but it does not record anything anymore.
+    mockgun.Shotgun.find = wrapper
+    try:
+        sg.find("Shot", [])
+    finally:
+        mockgun.Shotgun.find = find
+    assert calls == []
+
+
+def test_instrumented__logs_callback_errors(sg, caplog):
+    def failing_callback(call):
+        raise KeyError("boom")
+
+    calls = []
+    with instrumentation.instrumented(failing_callback), instrumentation.instrumented(calls.append):
+        sg_shots = sg.find("Shot", [])
+
+    assert sg_shots == sg.find("Shot", [])
+    assert len(calls) == 1
+    assert "The instrumentation callback" in caplog.text
+    assert "boom" in caplog.text
+
+
+def test_register_callback__multiple_callbacks(sg):
+    calls_a = []
+    calls_b = []
+    instrumentation.register_callback(calls_a.append)
+    instrumentation.register_callback(calls_b.append)
+    try:
+        sg.find("Shot", [])
+        instrumentation.unregister_callback(calls_a.append)
+        sg.find("Shot", [])
+    finally:
+        instrumentation.unregister_callback(calls_b.append)
+
+    assert len(calls_a) == 1
+    assert len(calls_b) == 2
+
+
+def test_unregister_callback__unknown_callback():
+    with pytest.raises(ValueError):
+        instrumentation.unregister_callback(print)
+
+
+def test_call_stats(sg):
+    sg_site = pysg.new_site(sg)
+    stats = instrumentation.CallStats()
+
+    with instrumentation.instrumented(stats):
+        for sg_shot in sg_site.find("Shot", []):
+            sg_shot["sg_status_list"].get()
+
+    result = stats.stats()
+    shot_count = result["SGSite.find"]["rows"]
+    assert result["SGSite.find"]["count"] == 1
+    assert result["Field.get"]["count"] == shot_count
+    assert result["Field.get"]["api_methods"] == {"find_one": shot_count}
+    assert result["Field.get"]["errors"] == 0
+    assert sum(result["Field.get"]["histogram"].values()) == shot_count
+    assert list(result["Field.get"]["histogram"]) == list(instrumentation.CallStats.BUCKETS)
+
+    stats.reset()
+
+    assert stats.stats() == {}
+
+
+def test_instrumented__records_call_site(sg):
+    calls = []
+
+    with instrumentation.instrumented(calls.append):
+        pysg.new_entity(sg, 1, "Shot")["code"].get()
+
+    assert calls[0]["call_site"].startswith(__file__ + ":")
+
+
+def test_query_budget__detects_queries_in_loops(sg):
+    sg_site = pysg.new_site(sg)
+    sg_shots = sg_site.find("Shot", [])
+
+    with pytest.raises(RuntimeError) as error:
+        with sg_site.query_budget(max_repeats=1):
+            for sg_shot in sg_shots:
+                sg_shot["sg_status_list"].get()
+
+    message = str(error.value)
+    assert f"{len(sg_shots)}x find_one Shot filters=(('id', 'is'),)" in message
+    assert "from Field.get" in message
+    assert __file__ in message
+    assert "SGSite.load_fields()" in message
+
+
+def test_query_budget__allows_bulk_queries(sg):
+    sg_site = pysg.new_site(sg)
+
+    with sg_site.query_budget(max_repeats=1) as budget:
+        sg_shots = sg_site.find("Shot", [])
+        sg_site.load_fields(sg_shots, ["sg_status_list"])
+        for sg_shot in sg_shots:
+            sg_shot["sg_status_list"].get()
+
+    assert budget.violations() == []
+
+
+def test_query_budget__ignores_filter_values(sg):
+    budget = instrumentation.QueryBudget(max_repeats=2)
+
+    with budget:
+        sg.find("Shot", [["code", "is", "a"]], ["code"])
+        sg.find("Shot", [["code", "is", "b"]], ["code"])
+        sg.find("Shot", [["code", "is", "c"]], ["description"])
+        sg.find("Asset", [["code", "is", "d"]], ["code"])
+
+    assert budget.violations() == []
+    budget(
+        {
+            "api_method": "find",
+            "entity_type": "Shot",
+            "args": ("Shot", [["code", "is", "e"]], ["code"]),
+            "kwargs": {},
+            "pysg_method": None,
+            "call_site": "tool.py:1",
+        }
+    )
+    violations = budget.violations()
+    assert len(violations) == 1
+    assert violations[0]["shape"] == ("find", "Shot", (("code", "is"),), ("code",))
+    assert violations[0]["count"] == 3
+    assert violations[0]["pysg_methods"] == {None: 3}
+    assert violations[0]["suggestion"] == instrumentation.QueryBudget.DEFAULT_SUGGESTION
+
+
+def test_query_budget__warns(sg):
+    sg_site = pysg.new_site(sg)
+
+    with pytest.warns(UserWarning, match="query budget of 0"):
+        with sg_site.query_budget(max_repeats=0, action="warn"):
+            sg_site.find("Shot", [])
+
+
+def test_query_budget__wrong_action(sg):
+    with pytest.raises(ValueError):
+        pysg.new_site(sg).query_budget(action="ignore")
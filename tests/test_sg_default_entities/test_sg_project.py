@@ -1,3 +1,6 @@
+import pytest
+
+import pyshotgrid as pysg
 import pyshotgrid.sg_default_entities as sde
 
 
@@ -108,3 +111,79 @@ def test_versions(sg):
     for versions in result:
         assert versions.type == "Version"
         assert versions["project"].get() == sg_project
+
+
+def test_shots__fields_and_prefetch(sg):
+    pysg.new_site(sg).value_cache_ttl = 60
+    sg_project = sde.SGProject(sg, 1)
+    finds = sg.finds
+
+    result = sg_project.shots(fields=["sg_sequence"], prefetch={"tasks": ["sg_status_list"]})
+
+    assert finds + 2 == sg.finds
+    tasks = {
+        sg_shot["code"].get(): [
+            (sg_task["content"].get(), sg_task["sg_status_list"].get())
+            for sg_task in sg_shot.tasks()
+        ]
+        for sg_shot in result
+        if sg_shot["sg_sequence"].get() is not None
+    }
+    assert finds + 2 == sg.finds
+    # Without prefetching the same tasks are returned.
+    for sg_shot in result:
+        sg_shot.clear_cache()
+    assert tasks == {
+        sg_shot["code"].get(): [
+            (sg_task["content"].get(), sg_task["sg_status_list"].get())
+            for sg_task in sg_shot.tasks(fields=["sg_status_list"])
+        ]
+        for sg_shot in result
+        if sg_shot["sg_sequence"].get() is not None
+    }
+    assert ["comp", "lighting"] == [content for content, _ in tasks["sq111_sh1111"]]
+
+
+def test_shots__nested_prefetch(sg):
+    sg_project = sde.SGProject(sg, 1)
+    finds = sg.finds
+
+    result = sg_project.shots(
+        prefetch={"tasks": {"fields": ["content"], "prefetch": {"versions": ["code"]}}}
+    )
+
+    assert finds + 3 == sg.finds
+    versions = [
+        sg_version["code"].get()
+        for sg_shot in result
+        for sg_task in sg_shot.tasks()
+        for sg_version in sg_task.versions()
+    ]
+    assert finds + 3 == sg.finds
+    assert ["sh1111_city_v002", "sh1111_city_v001"] == versions
+
+
+def test_shots__filters_ignore_prefetched_entities(sg):
+    sg_project = sde.SGProject(sg, 1)
+    sg_shot = sg_project.shots(prefetch={"tasks": []})[0]
+    finds = sg.finds
+
+    result = sg_shot.tasks(names=["lighting"])
+
+    assert finds + 1 == sg.finds
+    assert ["lighting"] == [sg_task["content"].get() for sg_task in result]
+
+
+@pytest.mark.parametrize(
+    "prefetch, error",
+    [
+        ({"notes": []}, ValueError),
+        ({"shots": []}, ValueError),
+        ({"tasks": "content"}, TypeError),
+    ],
+)
+def test_shots__invalid_prefetch(sg, prefetch, error):
+    sg_project = sde.SGProject(sg, 1)
+
+    with pytest.raises(error):
+        sg_project.shots(prefetch=prefetch)
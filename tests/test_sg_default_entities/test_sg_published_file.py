@@ -1,3 +1,9 @@
+from unittest import mock
+
+import pytest
+from shotgun_api3.lib import mockgun
+
+import pyshotgrid as pysg
 import pyshotgrid.sg_default_entities as sde
 
 
@@ -66,3 +72,92 @@ def test_get_previous_publishes(sg):
     result = sg_publish.get_previous_publishes()
 
     assert result_sg_publishes == result
+
+
+def test_load_publish_chains(sg):
+    sg_publishes = [sde.SGPublishedFile(sg, i) for i in range(1, 14)]
+
+    with mock.patch.object(mockgun.Shotgun, "find", wraps=sg.find) as mock_find:
+        result = sde.load_publish_chains(sg_publishes)
+        is_latest = [sg_publish.is_latest() for sg_publish in sg_publishes]
+
+    assert [len(chain) for chain in result] == [5] * 10 + [3] * 3
+    assert is_latest == [False] * 4 + [True] + [False] * 4 + [True] + [False] * 2 + [True]
+    # One query for the chain fields and one for the chains.
+    assert mock_find.call_count == 2
+
+
+def test_load_publish_chains__refresh(sg):
+    sg_publish = sde.SGPublishedFile(sg, 11)
+    chain = sg_publish.get_publish_chain()
+    sg_new_publish = sg.create(
+        "PublishedFile",
+        {
+            "code": "CarA_mdl_v004.abc",
+            "name": "CarA_mdl",
+            "version_number": 4,
+            "published_file_type": {"type": "PublishedFileType", "id": 1},
+            "entity": {"type": "Asset", "id": 2},
+        },
+    )
+
+    result = sg_publish.get_publish_chain(refresh=True)
+
+    assert sg_publish.get_publish_chain() is not chain
+    assert result.latest.id == sg_new_publish["id"]
+    # Cleanup
+    sg.delete("PublishedFile", sg_new_publish["id"])
+
+
+def test_is_latest__after_create(sg):
+    sg_site = pysg.new_site(sg)
+    sg_publish = sde.SGPublishedFile(sg, 13)
+    assert sg_publish.is_latest()
+
+    sg_new_publish = sg_site.create(
+        "PublishedFile",
+        {
+            "code": "CarA_mdl_v004.abc",
+            "name": "CarA_mdl",
+            "version_number": 4,
+            "published_file_type": {"type": "PublishedFileType", "id": 1},
+            "entity": {"type": "Asset", "id": 2},
+        },
+    )
+
+    assert not sg_publish.is_latest()
+    assert sg_new_publish.is_latest()
+    assert sg_publish.get_all_publishes()[-1] == sg_new_publish
+    # Cleanup
+    sg.delete("PublishedFile", sg_new_publish.id)
+
+
+def test_publish_chain__index(sg):
+    chain = sde.SGPublishedFile(sg, 3).get_publish_chain()
+
+    assert chain.index(sde.SGPublishedFile(sg, 3)) == 2
+    assert sde.SGPublishedFile(sg, 11) not in chain
+    with pytest.raises(ValueError):
+        chain.index(sde.SGPublishedFile(sg, 11))
+
+
+def test_load_publish_chains__missing_publish(sg):
+    sg_publishes = [sde.SGPublishedFile(sg, 1), sde.SGPublishedFile(sg, 999)]
+
+    result = sde.load_publish_chains(sg_publishes)
+
+    assert len(result[0]) == 5
+    assert result[1] is None
+    with pytest.raises(ValueError):
+        sg_publishes[1].get_publish_chain()
+
+
+def test_load_publish_chains__cache_size(sg):
+    sg_site = pysg.new_site(sg)
+    sg_site.publish_chains.max_size = 3
+    sg_publishes = [sde.SGPublishedFile(sg, i) for i in range(1, 14)]
+
+    result = sde.load_publish_chains(sg_publishes)
+
+    assert [len(chain) for chain in result] == [5] * 10 + [3] * 3
+    assert len(sg_site.publish_chains) == 3